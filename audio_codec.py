@@ -0,0 +1,109 @@
+"""
+Sindh Police AI Meeting Member - G.711 μ-law Codec
+Vectorized μ-law <-> 16-bit PCM transcoding with precomputed lookup tables
+(bit-exact with the deprecated audioop.lin2ulaw / audioop.ulaw2lin)
+"""
+
+import numpy as np
+
+# G.711 constants (same as CPython's audioop implementation)
+ULAW_BIAS = 0x84
+ULAW_CLIP = 8159
+_SEG_UEND = np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF], dtype=np.int32)
+
+
+def _build_ulaw_to_pcm_table() -> np.ndarray:
+    """Decode table: 256 μ-law bytes -> int16 samples."""
+    u_val = ~np.arange(256, dtype=np.int32) & 0xFF
+    exponent = (u_val >> 4) & 0x07
+    mantissa = u_val & 0x0F
+    t = ((mantissa << 3) + ULAW_BIAS) << exponent
+    return np.where(u_val & 0x80, ULAW_BIAS - t, t - ULAW_BIAS).astype(np.int16)
+
+
+def _build_pcm_to_ulaw_table() -> np.ndarray:
+    """Encode table: every int16 sample (indexed by its uint16 bit pattern) -> μ-law byte."""
+    pcm_val = np.arange(65536, dtype=np.uint16).view(np.int16).astype(np.int32) >> 2
+    mask = np.where(pcm_val < 0, 0x7F, 0xFF)
+    pcm_val = np.minimum(np.abs(pcm_val), ULAW_CLIP) + (ULAW_BIAS >> 2)
+    seg = np.searchsorted(_SEG_UEND, pcm_val, side="left")
+    uval = (np.minimum(seg, 7) << 4) | ((pcm_val >> (np.minimum(seg, 7) + 1)) & 0x0F)
+    uval = np.where(seg >= 8, 0x7F, uval)
+    return (uval ^ mask).astype(np.uint8)
+
+
+ULAW_TO_PCM = _build_ulaw_to_pcm_table()
+PCM_TO_ULAW = _build_pcm_to_ulaw_table()
+
+
+def ulaw_to_pcm16(ulaw, out: np.ndarray = None) -> np.ndarray:
+    """
+    Decode μ-law bytes to 16-bit PCM samples.
+
+    Args:
+        ulaw: μ-law encoded audio (bytes, bytearray, memoryview or uint8 array)
+        out: Optional preallocated int16 array with exactly one slot per input byte
+
+    Returns:
+        int16 array of decoded samples (``out`` when provided)
+    """
+    codes = np.frombuffer(ulaw, dtype=np.uint8) if not isinstance(ulaw, np.ndarray) else ulaw
+    return np.take(ULAW_TO_PCM, codes, out=out)
+
+
+def pcm16_to_ulaw(pcm, out: np.ndarray = None) -> np.ndarray:
+    """
+    Encode 16-bit PCM samples to μ-law bytes.
+
+    Args:
+        pcm: Native-endian 16-bit PCM (bytes-like or int16 array)
+        out: Optional preallocated uint8 array with exactly one slot per input sample
+
+    Returns:
+        uint8 array of μ-law codes (``out`` when provided)
+    """
+    if not isinstance(pcm, np.ndarray):
+        if len(pcm) % 2:
+            raise ValueError("not a whole number of frames")
+        pcm = np.frombuffer(pcm, dtype=np.int16)
+    return np.take(PCM_TO_ULAW, pcm.view(np.uint16), out=out)
+
+
+class G711Transcoder:
+    """
+    Per-stream μ-law transcoder that reuses preallocated output buffers.
+
+    The returned memoryviews alias the internal buffers and are only valid
+    until the next call in the same direction; copy with ``bytes()`` to keep them.
+    """
+
+    def __init__(self, frame_samples: int = 4096):
+        self._ulaw_out = np.empty(frame_samples, dtype=np.uint8)
+        self._pcm_out = np.empty(frame_samples, dtype=np.int16)
+
+    def encode(self, pcm_bytes) -> memoryview:
+        """Encode 16-bit PCM bytes to μ-law."""
+        if len(pcm_bytes) % 2:
+            raise ValueError("not a whole number of frames")
+        samples = np.frombuffer(pcm_bytes, dtype=np.int16)
+        if samples.size > self._ulaw_out.size:
+            self._ulaw_out = np.empty(samples.size, dtype=np.uint8)
+        out = self._ulaw_out[:samples.size]
+        pcm16_to_ulaw(samples, out=out)
+        return out.data
+
+    def decode(self, ulaw_bytes) -> memoryview:
+        """Decode μ-law bytes to 16-bit PCM."""
+        codes = np.frombuffer(ulaw_bytes, dtype=np.uint8)
+        if codes.size > self._pcm_out.size:
+            self._pcm_out = np.empty(codes.size, dtype=np.int16)
+        out = self._pcm_out[:codes.size]
+        ulaw_to_pcm16(codes, out=out)
+        return out.data.cast("B")
+
+
+__all__ = [
+    'ulaw_to_pcm16',
+    'pcm16_to_ulaw',
+    'G711Transcoder',
+]
@@ -0,0 +1,68 @@
+"""
+Micro-benchmark: audio_codec vs audioop for per-frame μ-law transcoding.
+
+Usage:
+    python benchmarks/bench_audio_codec.py [--iterations 2000]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from audio_codec import G711Transcoder, pcm16_to_ulaw, ulaw_to_pcm16  # noqa: E402
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore", DeprecationWarning)
+    try:
+        import audioop
+    except ImportError:  # Python 3.13+
+        audioop = None
+
+RATE = 8000
+CHUNK_SIZES_MS = [20, 100, 1000]
+
+
+def per_call_us(fn, iterations: int) -> float:
+    """Best-of-5 per-call time in microseconds."""
+    return min(timeit.repeat(fn, number=iterations, repeat=5)) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'chunk':>7} {'direction':>10} {'audioop (us)':>13} {'codec (us)':>11} {'reused buf (us)':>16}")
+
+    for chunk_ms in CHUNK_SIZES_MS:
+        samples = RATE * chunk_ms // 1000
+        pcm = rng.integers(-32768, 32767, samples, dtype=np.int16).tobytes()
+        ulaw = pcm16_to_ulaw(pcm).tobytes()
+        transcoder = G711Transcoder()
+
+        cases = [
+            ("encode", lambda: audioop.lin2ulaw(pcm, 2),
+             lambda: pcm16_to_ulaw(pcm).tobytes(),
+             lambda: transcoder.encode(pcm)),
+            ("decode", lambda: audioop.ulaw2lin(ulaw, 2),
+             lambda: ulaw_to_pcm16(ulaw).tobytes(),
+             lambda: transcoder.decode(ulaw)),
+        ]
+        for direction, ref_fn, codec_fn, reuse_fn in cases:
+            ref = f"{per_call_us(ref_fn, args.iterations):13.2f}" if audioop else f"{'n/a':>13}"
+            print(
+                f"{chunk_ms:>5}ms {direction:>10} {ref} "
+                f"{per_call_us(codec_fn, args.iterations):11.2f} "
+                f"{per_call_us(reuse_fn, args.iterations):16.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Load test: many simultaneous meetings on one server instance, checked for cross-talk.
+
+Usage:
+    python benchmarks/bench_concurrent_meetings.py [--meetings 20] [--observers 3]
+        [--entries 50] [--motions 3] [--interval 0.02] [--with-openai]
+
+The app is served in-process by uvicorn on a free port. Each simulated
+meeting logs in, starts its meeting, connects observer WebSockets to
+/ws/meeting/{meeting_id}, posts transcript entries and motions, then ends
+the meeting. Every observer must receive exactly its own meeting's events.
+
+Run with STATE_BACKEND=sqlite to measure the shared state store.
+Without --with-openai the background jobs that call OpenAI (motion context
+pre-fetch, rolling summaries, meeting notes) are switched off so only the
+server's own request handling and fan-out are measured.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import socket
+import sys
+import tempfile
+import time
+
+import httpx
+import uvicorn
+import websockets
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# Keep the benchmark's meetings out of data/state.db when STATE_BACKEND=sqlite
+os.environ["STATE_DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="bench-state-"), "state.db")
+
+import database  # noqa: E402
+import main  # noqa: E402
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, math.ceil(len(values) * pct) - 1)]
+
+
+async def collect(ws) -> list:
+    """Events received by one observer until its meeting ends, with receive times."""
+    events = []
+    async for raw in ws:
+        event = json.loads(raw)
+        events.append((time.perf_counter(), event))
+        if event.get("event") == "meeting_ended":
+            break
+    await ws.close()
+    return events
+
+
+async def run_meeting(client: httpx.AsyncClient, ws_base: str, token: str, index: int, args, stats: dict):
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async def post(path: str, payload: dict) -> dict:
+        started = time.perf_counter()
+        response = await client.post(path, json=payload, headers=headers)
+        stats["http_ms"].append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+        return response.json()
+
+    meeting_id = (await post("/api/meeting/start", {"agenda": f"Simulated board {index}"}))["meeting_id"]
+
+    observers = []
+    for _ in range(args.observers):
+        ws = await websockets.connect(f"{ws_base}/ws/meeting/{meeting_id}?token={token}")
+        await ws.recv()  # "subscribed"
+        observers.append(ws)
+    collectors = [asyncio.create_task(collect(ws)) for ws in observers]
+
+    motion_every = max(1, args.entries // args.motions) if args.motions else 0
+    motions_added = 0
+    for i in range(args.entries):
+        await post("/api/transcript/store", {
+            "meeting_id": meeting_id,
+            "speaker": f"Member {i % 5}",
+            "text": f"{meeting_id}|{i}|{time.perf_counter()}"
+        })
+        if motion_every and i % motion_every == 0 and motions_added < args.motions:
+            await post("/api/motion/add", {"meeting_id": meeting_id, "motion_text": f"{meeting_id} motion {i}"})
+            motions_added += 1
+        await asyncio.sleep(args.interval)
+
+    await post("/api/meeting/end", {"meeting_id": meeting_id})
+
+    for events in await asyncio.gather(*collectors):
+        entries = [e for _, e in events if e["event"] == "transcript_entry"]
+        motions = [e for _, e in events if e["event"] == "motion_added"]
+        stats["crosstalk"] += sum(1 for e in entries if not e["text"].startswith(meeting_id + "|"))
+        stats["crosstalk"] += sum(1 for e in motions if e["motion"]["meeting_id"] != meeting_id)
+        stats["missing"] += (args.entries - len(entries)) + (motions_added - len(motions))
+        for received_at, event in events:
+            if event["event"] == "transcript_entry":
+                sent_at = float(event["text"].rsplit("|", 1)[1])
+                stats["fanout_ms"].append((received_at - sent_at) * 1000)
+
+
+async def skip_notes_job(*_):
+    return {"job_id": None, "status": "skipped"}
+
+
+async def run(args):
+    workdir = tempfile.mkdtemp(prefix="bench-meetings-")
+    database.DB_PATH = os.path.join(workdir, "meetings.db")
+    main.meeting_registry.max_meetings = max(main.meeting_registry.max_meetings, args.meetings)
+    main.meeting_registry.max_subscribers = max(main.meeting_registry.max_subscribers, args.observers)
+    if not args.with_openai:
+        main.start_motion_prep = lambda motion: None
+        main.start_rolling_summarizer = lambda meeting_id: None
+        main.start_notes_job = skip_notes_job
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    stats = {"http_ms": [], "fanout_ms": [], "crosstalk": 0, "missing": 0}
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=30) as client:
+            login = await client.post("/auth/login", json={"username": "secretary", "password": "secretary123"})
+            token = login.json()["token"]
+
+            started = time.perf_counter()
+            await asyncio.gather(*(
+                run_meeting(client, f"ws://127.0.0.1:{port}", token, i, args, stats)
+                for i in range(args.meetings)
+            ))
+            elapsed = time.perf_counter() - started
+    finally:
+        server.should_exit = True
+        await server_task
+
+    print(f"\n{args.meetings} meetings x {args.observers} observers, "
+          f"{args.entries} entries + {args.motions} motions each, {elapsed:.2f}s wall")
+    print(f"  HTTP requests   {len(stats['http_ms']):>7}  p50 {percentile(stats['http_ms'], 0.5):7.2f} ms"
+          f"  p95 {percentile(stats['http_ms'], 0.95):7.2f} ms")
+    print(f"  Fan-out events  {len(stats['fanout_ms']):>7}  p50 {percentile(stats['fanout_ms'], 0.5):7.2f} ms"
+          f"  p95 {percentile(stats['fanout_ms'], 0.95):7.2f} ms")
+    print(f"  Cross-talk events: {stats['crosstalk']}   Missing events: {stats['missing']}")
+    if stats["crosstalk"] or stats["missing"]:
+        print("❌ Meetings were not isolated")
+        sys.exit(1)
+    print("✅ Every observer received exactly its own meeting's events")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--meetings", type=int, default=20)
+    parser.add_argument("--observers", type=int, default=3)
+    parser.add_argument("--entries", type=int, default=50)
+    parser.add_argument("--motions", type=int, default=3)
+    parser.add_argument("--interval", type=float, default=0.02, help="Seconds between a meeting's transcript entries")
+    parser.add_argument("--with-openai", action="store_true", help="Keep the background jobs that call OpenAI")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,188 @@
+"""
+Acceptance check: event-loop lag while large meeting minutes are loaded.
+
+Usage:
+    python benchmarks/bench_db_event_loop.py [--entries 50000] [--meetings 2000]
+        [--clients 4] [--requests 20] [--max-p99-ms 100]
+
+The app is served in-process by uvicorn. A probe task on the server's event
+loop wakes every --tick ms and records how late it was woken; that lateness
+is what every audio WebSocket on the worker would see. Clients fetch
+/api/meetings/{id}/minutes, /api/meetings and /api/meeting/status (state
+store) concurrently, first with the database calls made inline on the event
+loop (as before), then through database.run_db.
+
+/minutes returns the first MINUTES_TRANSCRIPT_PAGE entries of the large
+meeting, so each request's work is bounded however long the meeting was.
+
+This script is the check for the async data-access layer: it exits non-zero
+when the run_db loop lag p99 is over --max-p99-ms.
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import socket
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+import uvicorn
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ["STATE_DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="bench-state-"), "state.db")
+
+import database  # noqa: E402
+import main  # noqa: E402
+
+BIG_MEETING = "MEETING-BIG"
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, math.ceil(len(values) * pct) - 1)]
+
+
+def minutes_events(meeting_id: str, session: dict, duration_minutes: int) -> list:
+    """A finished meeting as the events the minutes writer records while it runs."""
+    start = session["start_time"]
+    events = [("meeting_started", {"meeting_id": meeting_id, "start_time": start,
+                                   "agenda": session["agenda"], "started_by": ""})]
+    events += [("transcript", {"meeting_id": meeting_id, **entry}) for entry in session["transcript"]]
+    events += [("motion", {"meeting_id": meeting_id, "proposed_by": "", "status": "pending",
+                           "timestamp": start, **m}) for m in session["motions"]]
+    events += [("vote", {"meeting_id": meeting_id, "reasoning": "", "regulatory_reference": "",
+                         "risk_assessment": "", "voter": "", "timestamp": start, **v}) for v in session["votes"]]
+    events.append(("meeting_ended", {"meeting_id": meeting_id, "end_time": session["end_time"],
+                                     "duration_minutes": duration_minutes}))
+    return events
+
+
+def build_database(args):
+    database.DB_PATH = os.path.join(tempfile.mkdtemp(prefix="bench-loop-"), "meetings.db")
+    database.init_db()
+    session = {
+        "start_time": "2026-01-01T10:00:00+05:00",
+        "end_time": "2026-01-01T12:00:00+05:00",
+        "agenda": "Long board meeting",
+        "transcript": [
+            {"speaker": f"Member {i % 7}", "text": f"Remark {i} on deployment of additional patrol units",
+             "timestamp": "2026-01-01T10:00:00+05:00"}
+            for i in range(args.entries)
+        ],
+        "motions": [], "votes": [],
+    }
+    database.write_minutes_events(minutes_events(BIG_MEETING, session, 120))
+    small = {**session, "transcript": session["transcript"][:10]}
+    for i in range(args.meetings):
+        database.write_minutes_events(minutes_events(f"MEETING-{i:05d}", small, 30))
+
+
+async def inline_db(func, *args, **kwargs):
+    """The previous behaviour: the query runs on the event loop."""
+    return func(*args, **kwargs)
+
+
+async def probe(tick: float, lags: list, stop: asyncio.Event):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(tick)
+        lags.append((time.perf_counter() - started - tick) * 1000)
+
+
+def client(base_url: str, token: str, index: int, requests: int) -> list:
+    """One client's request latencies; runs in its own process so only the server shares the loop."""
+    latencies = []
+    with httpx.Client(base_url=base_url, headers={"Authorization": f"Bearer {token}"}, timeout=120) as http:
+        for i in range(requests):
+            path = (f"/api/meetings/{BIG_MEETING}/minutes", "/api/meetings",
+                    "/api/meeting/status")[(index + i) % 3]
+            started = time.perf_counter()
+            http.get(path).raise_for_status()
+            latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+async def measure(pool: ProcessPoolExecutor, base_url: str, token: str, args) -> dict:
+    loop = asyncio.get_running_loop()
+    lags = []
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(args.tick / 1000, lags, stop))
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(
+        loop.run_in_executor(pool, client, base_url, token, i, args.requests) for i in range(args.clients)
+    ))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe_task
+    return {"lags": lags, "latencies": [ms for result in results for ms in result], "elapsed": elapsed}
+
+
+async def run(args) -> int:
+    build_database(args)
+    main.start_rolling_summarizer = lambda meeting_id: None
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    base_url = f"http://127.0.0.1:{port}"
+    results = {}
+    try:
+        async with httpx.AsyncClient(base_url=base_url) as http:
+            login = await http.post("/auth/login", json={"username": "secretary", "password": "secretary123"})
+            token = login.json()["token"]
+        executor_db = main.run_db
+        with ProcessPoolExecutor(args.clients) as pool:
+            for label, db_call in (("inline", inline_db), ("run_db", executor_db)):
+                main.run_db = db_call
+                results[label] = await measure(pool, base_url, token, args)
+        main.run_db = executor_db
+    finally:
+        server.should_exit = True
+        await server_task
+
+    print(f"\nMinutes of {args.entries:,} transcript entries + list of {args.meetings:,} meetings, "
+          f"{args.clients} clients x {args.requests} requests, {args.tick:g} ms probe tick")
+    for label, result in results.items():
+        lags, latencies = result["lags"], result["latencies"]
+        print(f"  {label:<7} loop lag p50 {percentile(lags, 0.5):7.2f} ms  p99 {percentile(lags, 0.99):7.2f} ms"
+              f"  max {max(lags, default=0):7.2f} ms   request p50 {percentile(latencies, 0.5):7.1f} ms"
+              f"  ({result['elapsed']:.2f}s wall)")
+
+    p99 = percentile(results["run_db"]["lags"], 0.99)
+    if p99 > args.max_p99_ms:
+        print(f"FAIL run_db loop lag p99 {p99:.2f} ms is over {args.max_p99_ms:g} ms")
+        return 1
+    print(f"PASS run_db loop lag p99 {p99:.2f} ms is under {args.max_p99_ms:g} ms")
+    return 0
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, default=50000, help="Transcript entries in the large meeting")
+    parser.add_argument("--meetings", type=int, default=2000, help="Other meetings in the listing")
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=20, help="Requests per client")
+    parser.add_argument("--tick", type=float, default=5.0, help="Probe interval in ms")
+    parser.add_argument("--max-p99-ms", type=float, default=100.0, help="Largest acceptable run_db loop lag p99")
+    sys.exit(asyncio.run(run(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,80 @@
+"""
+Check: per-file extraction timeouts when files queue for a worker.
+
+Usage:
+    python benchmarks/bench_document_extraction.py [--workers 1] [--timeout 1.2]
+        [--durations 0.5,0.5,0.5,5,0.2]
+
+Each "file" is a worker that sleeps for its duration and returns a few
+chunks. With fewer workers than files, later files wait for a slot; only a
+file whose own run exceeds --timeout may time out, however long it waited.
+Exits non-zero if a healthy file fails, the slow file doesn't time out, or
+a hung worker holds up the files behind it.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import document_extraction  # noqa: E402
+
+
+def sleepy_extract(path: str, filename: str):
+    """Stand-in parser: ``filename`` is 'name:seconds'."""
+    time.sleep(float(filename.split(":")[1]))
+    for i in range(3):
+        yield f"{filename} chunk {i}"
+
+
+async def run(args) -> int:
+    durations = [float(d) for d in args.durations.split(",")]
+    files = [(os.devnull, f"file{i}:{d}") for i, d in enumerate(durations)]
+    results = {}
+    started = time.perf_counter()
+    async for filename, chunks, error in document_extraction.extract_files(files, args.timeout, sleepy_extract):
+        count = len(list(chunks)) if chunks is not None else 0
+        if chunks is not None:
+            chunks.close()
+        results[filename] = (error, count, time.perf_counter() - started)
+
+    failures = 0
+    print(f"\n{len(files)} files, {args.workers} worker(s), {args.timeout:g}s timeout")
+    for filename, seconds in ((f, d) for (_, f), d in zip(files, durations)):
+        error, count, finished = results[filename]
+        expect_timeout = seconds > args.timeout
+        ok = bool(error) == expect_timeout and (expect_timeout or count == 3)
+        failures += not ok
+        print(f"  {'ok  ' if ok else 'FAIL'} {filename:<10} done at {finished:5.2f}s   "
+              f"{error or f'{count} chunks'}")
+
+    # Files are admitted in order, so the whole run is bounded by the healthy
+    # files' own time plus at most one timeout per hung file
+    budget = sum(min(d, args.timeout) for d in durations) / args.workers + args.timeout + 2.0
+    elapsed = time.perf_counter() - started
+    if elapsed > budget:
+        failures += 1
+        print(f"  FAIL took {elapsed:.2f}s, expected under {budget:.2f}s")
+    leftovers = len(document_extraction._processes)
+    if leftovers:
+        failures += 1
+        print(f"  FAIL {leftovers} worker process(es) left running")
+    print("PASS" if not failures else f"{failures} check(s) failed")
+    return 1 if failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=1, help="EXTRACT_WORKERS")
+    parser.add_argument("--timeout", type=float, default=1.2, help="Per-file timeout in seconds")
+    parser.add_argument("--durations", default="0.5,0.5,0.5,5,0.2", help="Comma-separated parse times")
+    args = parser.parse_args()
+    document_extraction.EXTRACT_WORKERS = args.workers
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
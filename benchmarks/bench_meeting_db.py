@@ -0,0 +1,190 @@
+"""
+Benchmark: meeting minutes persistence and reads on a large meetings.db.
+
+Usage:
+    python benchmarks/bench_meeting_db.py [--meetings 1000] [--entries 5000] [--reads 200]
+
+Builds a database of --meetings saved meetings with --entries transcript rows
+each, then measures:
+  - writing a meeting's minutes with write_minutes_events (batched) vs one
+    INSERT per row
+  - get_meeting_minutes and get_meetings_page (first page and a deep page)
+    before and after the index migration
+  - opening a fresh connection per call vs borrowing one from the pool
+The default size writes about 5 million transcript rows (~1 GB on disk).
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import database  # noqa: E402
+
+def make_session(index: int, entries: int) -> dict:
+    return {
+        "start_time": f"2026-01-01T{index % 24:02d}:00:00+05:00",
+        "end_time": f"2026-01-01T{index % 24:02d}:59:00+05:00",
+        "agenda": f"Board meeting {index}",
+        "transcript": [
+            {"speaker": f"Member {i % 7}", "text": f"Meeting {index} remark {i} on licensing conditions",
+             "timestamp": f"2026-01-01T00:00:{i % 60:02d}+05:00"}
+            for i in range(entries)
+        ],
+        "motions": [{"motion_id": f"M{index}-{m}", "motion_text": f"Motion {m}", "status": "voted"} for m in range(3)],
+        "votes": [{"vote_id": f"V{index}-{m}", "motion": f"Motion {m}", "vote": "FOR"} for m in range(3)],
+    }
+
+
+def minutes_events(meeting_id: str, session: dict, duration_minutes: int) -> list:
+    """A finished meeting as the events the minutes writer records while it runs."""
+    start = session["start_time"]
+    events = [("meeting_started", {"meeting_id": meeting_id, "start_time": start,
+                                   "agenda": session["agenda"], "started_by": ""})]
+    events += [("transcript", {"meeting_id": meeting_id, **entry}) for entry in session["transcript"]]
+    events += [("motion", {"meeting_id": meeting_id, "proposed_by": "", "status": "pending",
+                           "timestamp": start, **m}) for m in session["motions"]]
+    events += [("vote", {"meeting_id": meeting_id, "reasoning": "", "regulatory_reference": "",
+                         "risk_assessment": "", "voter": "", "timestamp": start, **v}) for v in session["votes"]]
+    events.append(("meeting_ended", {"meeting_id": meeting_id, "end_time": session["end_time"],
+                                     "duration_minutes": duration_minutes}))
+    return events
+
+
+def save_row_by_row(meeting_id: str, session: dict):
+    """The original minutes save: a fresh connection and one INSERT per row."""
+    conn = sqlite3.connect(database.DB_PATH)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "INSERT OR REPLACE INTO meetings (meeting_id, start_time, end_time, agenda, status, created_at) "
+        "VALUES (?, ?, ?, ?, 'ended', ?)",
+        (meeting_id, session["start_time"], session["end_time"], session["agenda"], session["start_time"])
+    )
+    for entry in session["transcript"]:
+        conn.execute(
+            "INSERT INTO transcript_entries (meeting_id, speaker, text, timestamp) VALUES (?, ?, ?, ?)",
+            (meeting_id, entry["speaker"], entry["text"], entry["timestamp"])
+        )
+    for m in session["motions"]:
+        conn.execute(
+            "INSERT INTO motions (motion_id, meeting_id, motion_text, proposed_by, status, timestamp) "
+            "VALUES (?, ?, ?, '', ?, '')", (m["motion_id"], meeting_id, m["motion_text"], m["status"])
+        )
+    for v in session["votes"]:
+        conn.execute(
+            "INSERT INTO votes (vote_id, meeting_id, motion, vote, timestamp) VALUES (?, ?, ?, ?, '')",
+            (v["vote_id"], meeting_id, v["motion"], v["vote"])
+        )
+    conn.commit()
+    conn.close()
+
+
+def time_per_call(fn, calls: int) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - started) / calls * 1000
+
+
+def drop_indexes() -> list:
+    """Drop the migrations' indexes; returns their CREATE statements."""
+    conn = sqlite3.connect(database.DB_PATH)
+    indexes = conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'").fetchall()
+    for name, _ in indexes:
+        conn.execute(f"DROP INDEX {name}")
+    conn.commit()
+    conn.close()
+    return [sql for _, sql in indexes]
+
+
+def create_indexes(statements: list):
+    conn = sqlite3.connect(database.DB_PATH)
+    for sql in statements:
+        conn.execute(sql)
+    conn.commit()
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--meetings", type=int, default=1000)
+    parser.add_argument("--entries", type=int, default=5000, help="Transcript rows per meeting")
+    parser.add_argument("--reads", type=int, default=200, help="get_meeting_minutes calls per measurement")
+    parser.add_argument("--row-by-row", type=int, default=10, help="Meetings saved with the per-row inserts")
+    args = parser.parse_args()
+
+    database.DB_PATH = os.path.join(tempfile.mkdtemp(prefix="bench-meetingdb-"), "meetings.db")
+    database.init_db()
+    session = make_session(0, args.entries)
+
+    # Writes: per-row vs batched, on the same session size
+    started = time.perf_counter()
+    for i in range(args.row_by_row):
+        save_row_by_row(f"ROW-{i}", session)
+    row_ms = (time.perf_counter() - started) / max(1, args.row_by_row) * 1000
+
+    batch_s = 0.0
+    for i in range(args.meetings):
+        events = minutes_events(f"MEETING-{i:05d}", make_session(i, args.entries), 60)
+        started = time.perf_counter()
+        database.write_minutes_events(events)
+        batch_s += time.perf_counter() - started
+    batch_ms = batch_s / args.meetings * 1000
+    total_rows = (args.meetings + args.row_by_row) * args.entries
+
+    print(f"\n{args.meetings} meetings x {args.entries} transcript rows ({total_rows:,} rows, "
+          f"{os.path.getsize(database.DB_PATH) / 1e6:,.0f} MB), built in {batch_s:.1f}s")
+    print(f"  write minutes          row-by-row {row_ms:9.2f} ms   batched {batch_ms:9.2f} ms   "
+          f"({row_ms / batch_ms:.1f}x)")
+
+    # Reads: same database without and with the migration's indexes
+    rng = random.Random(7)
+    ids = [f"MEETING-{rng.randrange(args.meetings):05d}" for _ in range(args.reads)]
+    results = {}
+    indexes = []
+    # Cursor of the page halfway through the history
+    conn = sqlite3.connect(database.DB_PATH)
+    deep_after = conn.execute(
+        "SELECT created_at, meeting_id FROM meetings ORDER BY created_at DESC, meeting_id DESC LIMIT 1 OFFSET ?",
+        ((args.meetings + args.row_by_row) // 2,)
+    ).fetchone()
+    conn.close()
+    for label in ("unindexed", "indexed"):
+        if label == "unindexed":
+            indexes = drop_indexes()
+        else:
+            create_indexes(indexes)
+        picks = iter(ids * 2)
+        reads = min(args.reads, 20) if label == "unindexed" else args.reads
+        minutes_ms = time_per_call(lambda: database.get_meeting_minutes(next(picks)), reads)
+        first_page_ms = time_per_call(lambda: database.get_meetings_page(50), 20)
+        deep_page_ms = time_per_call(lambda: database.get_meetings_page(50, deep_after), 20)
+        results[label] = (minutes_ms, first_page_ms, deep_page_ms)
+    for name, column in (("get_meeting_minutes", 0), ("meetings page 1", 1), ("meetings deep page", 2)):
+        before, after = results["unindexed"][column], results["indexed"][column]
+        print(f"  {name:<22} unindexed {before:9.2f} ms   indexed {after:9.2f} ms   ({before / after:.1f}x)")
+
+    # Connections: fresh connect + PRAGMAs vs pooled
+    def fresh():
+        conn = sqlite3.connect(database.DB_PATH)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.execute("SELECT 1 FROM meetings WHERE meeting_id = ?", ("MEETING-00000",)).fetchone()
+        conn.close()
+
+    def pooled():
+        with database.get_connection() as conn:
+            conn.execute("SELECT 1 FROM meetings WHERE meeting_id = ?", ("MEETING-00000",)).fetchone()
+
+    fresh_ms, pooled_ms = time_per_call(fresh, 2000), time_per_call(pooled, 2000)
+    print(f"  point lookup           new conn   {fresh_ms:9.3f} ms   pooled  {pooled_ms:9.3f} ms   "
+          f"({fresh_ms / pooled_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
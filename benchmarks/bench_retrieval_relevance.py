@@ -0,0 +1,144 @@
+"""
+Benchmark: offline relevance of vector, BM25 and hybrid retrieval over the documents/ corpus.
+
+Usage:
+    python benchmarks/bench_retrieval_relevance.py [--docs documents] [--queries FILE]
+        [--samples 100] [--alphas 0 0.25 0.5 0.75 1] [--k 5]
+
+The corpus is chunked and ingested into a temporary local vector store and
+lexical index (embeddings come from OpenAI and are cached in
+data/embeddings.db, so re-runs are cheap).
+
+Without --queries, known-item queries are generated from sampled chunks:
+section numbers, acronyms and the rarest words of each chunk, which is the
+shape of a policy citation ("FIR Section 154 cognizable"). A JSONL file of
+{"query": ..., "relevant": ["text that must appear in a relevant chunk", ...]}
+can be supplied instead for hand-written judgments.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import database  # noqa: E402
+import ingestion  # noqa: E402
+import vector_store  # noqa: E402
+from document_extraction import is_supported, iter_document_text, iter_chunks  # noqa: E402
+from ingestion import get_text_splitter, get_embeddings, ingest_chunks  # noqa: E402
+from retrieval import retrieve_context, STOPWORDS  # noqa: E402
+
+WORD = re.compile(r"[A-Za-z][A-Za-z\-]{3,}")
+CITATION = re.compile(r"\b(?:[A-Z]{2,6}|\d+(?:[-./]\w+)*)\b")
+
+
+def load_corpus(docs_folder: str) -> dict:
+    splitter = get_text_splitter()
+    corpus = {}
+    for filename in sorted(os.listdir(docs_folder)):
+        if is_supported(filename):
+            path = os.path.join(docs_folder, filename)
+            corpus[filename] = [c for c in iter_chunks(iter_document_text(path, filename), splitter) if c.strip()]
+    return corpus
+
+
+def generate_queries(corpus: dict, samples: int, seed: int = 0) -> list:
+    """Known-item queries: citation tokens plus the rarest words of a sampled chunk."""
+    chunks = [chunk for doc_chunks in corpus.values() for chunk in doc_chunks]
+    df = Counter(word for chunk in chunks for word in {w.lower() for w in WORD.findall(chunk)})
+    rng = random.Random(seed)
+    queries = []
+    for chunk in rng.sample(chunks, min(samples, len(chunks))):
+        citations = list(dict.fromkeys(CITATION.findall(chunk)))[:2]
+        words = sorted(
+            {w.lower() for w in WORD.findall(chunk)} - STOPWORDS,
+            key=lambda w: (df[w], w)
+        )[:4]
+        if len(citations) + len(words) < 3:
+            continue
+        queries.append({"query": " ".join(citations + words), "relevant_chunks": [chunk]})
+    return queries
+
+
+def load_queries(path: str, corpus: dict) -> list:
+    chunks = [chunk for doc_chunks in corpus.values() for chunk in doc_chunks]
+    queries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                item = json.loads(line)
+                relevant = [c for c in chunks if any(snippet in c for snippet in item["relevant"])]
+                queries.append({"query": item["query"], "relevant_chunks": relevant})
+    return queries
+
+
+async def evaluate(queries: list, alpha: float, k: int) -> dict:
+    hits, reciprocal_ranks, latencies = 0, [], []
+    for item in queries:
+        relevant = set(item["relevant_chunks"])
+        started = time.perf_counter()
+        result = await retrieve_context(item["query"], top_k=max(k, 10), alpha=alpha, use_cache=False)
+        latencies.append((time.perf_counter() - started) * 1000)
+        ranks = [i for i, m in enumerate(result["matches"], 1) if m["text"] in relevant]
+        if ranks and ranks[0] <= k:
+            hits += 1
+        reciprocal_ranks.append(1 / ranks[0] if ranks else 0.0)
+    latencies.sort()
+    return {
+        "recall": hits / len(queries),
+        "mrr": sum(reciprocal_ranks) / len(queries),
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[min(len(latencies) - 1, math.ceil(len(latencies) * 0.95) - 1)],
+    }
+
+
+async def run(args):
+    corpus = load_corpus(args.docs)
+    if not corpus:
+        print(f"❌ No .pdf/.docx files in {args.docs}")
+        return
+
+    # Isolated registry, lexical index and vector store; the embedding cache is shared
+    workdir = tempfile.mkdtemp(prefix="bench-retrieval-")
+    database.DB_PATH = os.path.join(workdir, "meetings.db")
+    database.init_db()
+    ingestion.VECTOR_BACKEND = "local"
+    vector_store._store = vector_store.LocalVectorStore(os.path.join(workdir, "vector_store"))
+
+    embeddings = get_embeddings()
+    index = ingestion.get_vector_index()
+    for source, chunks in corpus.items():
+        await ingest_chunks(index, source, chunks, "benchmark", embeddings)
+
+    queries = load_queries(args.queries, corpus) if args.queries else generate_queries(corpus, args.samples)
+    queries = [q for q in queries if q["relevant_chunks"]]
+    print(f"\n{sum(len(c) for c in corpus.values())} chunks from {len(corpus)} documents, {len(queries)} queries\n")
+    print(f"{'alpha':>6} {f'recall@{args.k}':>10} {'MRR@10':>8} {'p50 (ms)':>9} {'p95 (ms)':>9}")
+
+    for alpha in args.alphas:
+        metrics = await evaluate(queries, alpha, args.k)
+        print(f"{alpha:>6.2f} {metrics['recall']:>10.3f} {metrics['mrr']:>8.3f} "
+              f"{metrics['p50_ms']:>9.2f} {metrics['p95_ms']:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--docs", default="documents")
+    parser.add_argument("--queries", help="JSONL file of {query, relevant} judgments")
+    parser.add_argument("--samples", type=int, default=100)
+    parser.add_argument("--alphas", type=float, nargs="+", default=[0.0, 0.25, 0.5, 0.75, 1.0])
+    parser.add_argument("--k", type=int, default=5)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark: utils.mix_timeline_pcm on 1, 10 and 120 minutes of 8 kHz μ-law events.
+
+Usage:
+    python benchmarks/bench_timeline_mixer.py [--overlay]
+
+--overlay also times the previous AudioSegment.overlay loop (quadratic; only
+run for the shorter timelines).
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from pydub import AudioSegment  # noqa: E402
+
+from audio_codec import ulaw_to_pcm16  # noqa: E402
+from utils import CHUNK, RATE, get_total_duration_ms, mix_timeline_pcm  # noqa: E402
+
+DURATIONS_MIN = [1, 10, 120]
+OVERLAY_MAX_MIN = 10
+
+
+def make_events(minutes: int, rng) -> list:
+    """Back-to-back CHUNK-sized μ-law events covering ``minutes`` of audio."""
+    step = CHUNK / RATE
+    count = int(minutes * 60 / step)
+    codes = rng.integers(0, 256, (count, CHUNK), dtype=np.uint8)
+    return [(i * step, codes[i].tobytes()) for i in range(count)]
+
+
+def overlay_merge(events, total_duration_ms):
+    """The original AudioSegment.overlay implementation, for comparison."""
+    base = AudioSegment.silent(duration=total_duration_ms, frame_rate=RATE)
+    for offset, audio_data in sorted(events, key=lambda x: x[0]):
+        seg = AudioSegment.from_raw(
+            io.BytesIO(ulaw_to_pcm16(audio_data).tobytes()),
+            frame_rate=RATE,
+            channels=1,
+            sample_width=2
+        )
+        base = base.overlay(seg, position=int(offset * 1000))
+    return base
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--overlay", action="store_true", help="also time the overlay loop")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'minutes':>8} {'events':>8} {'mixer (s)':>10} {'overlay (s)':>12}")
+
+    for minutes in DURATIONS_MIN:
+        events = make_events(minutes, rng)
+        total_ms = get_total_duration_ms(events)
+
+        started = time.perf_counter()
+        mix_timeline_pcm(events, total_ms)
+        mixer_s = time.perf_counter() - started
+
+        overlay = f"{'-':>12}"
+        if args.overlay and minutes <= OVERLAY_MAX_MIN:
+            started = time.perf_counter()
+            overlay_merge(events, total_ms)
+            overlay = f"{time.perf_counter() - started:12.2f}"
+
+        print(f"{minutes:>8} {len(events):>8} {mixer_s:10.3f} {overlay}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark: minutes response vs streamed NDJSON transcript for a long meeting.
+
+Usage:
+    python benchmarks/bench_transcript_stream.py [--entries 200000]
+
+The app is served in-process by uvicorn; the client runs in another process.
+For /api/meetings/{id}/minutes (first page of the transcript) and
+/api/meetings/{id}/transcript (all of it) it reports time to the first
+transcript row, total time, bytes received and the peak memory the server
+allocated (tracemalloc) while answering.
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+import uvicorn
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ["STATE_DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="bench-state-"), "state.db")
+
+import database  # noqa: E402
+import main  # noqa: E402
+
+MEETING = "MEETING-LONG"
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def minutes_events(meeting_id: str, session: dict, duration_minutes: int) -> list:
+    """A finished meeting as the events the minutes writer records while it runs."""
+    start = session["start_time"]
+    events = [("meeting_started", {"meeting_id": meeting_id, "start_time": start,
+                                   "agenda": session["agenda"], "started_by": ""})]
+    events += [("transcript", {"meeting_id": meeting_id, **entry}) for entry in session["transcript"]]
+    events += [("motion", {"meeting_id": meeting_id, "proposed_by": "", "status": "pending",
+                           "timestamp": start, **m}) for m in session["motions"]]
+    events += [("vote", {"meeting_id": meeting_id, "reasoning": "", "regulatory_reference": "",
+                         "risk_assessment": "", "voter": "", "timestamp": start, **v}) for v in session["votes"]]
+    events.append(("meeting_ended", {"meeting_id": meeting_id, "end_time": session["end_time"],
+                                     "duration_minutes": duration_minutes}))
+    return events
+
+
+def build_database(entries: int):
+    database.DB_PATH = os.path.join(tempfile.mkdtemp(prefix="bench-stream-"), "meetings.db")
+    database.init_db()
+    database.write_minutes_events(minutes_events(MEETING, {
+        "start_time": "2026-01-01T09:00:00+05:00",
+        "end_time": "2026-01-01T17:00:00+05:00",
+        "agenda": "All-day session",
+        "transcript": [
+            {"speaker": f"Member {i % 9}",
+             "text": f"Entry {i}: review of station-level crime statistics and patrol allocation for the district",
+             "timestamp": f"2026-01-01T{9 + i * 8 // entries:02d}:00:00+05:00"}
+            for i in range(entries)
+        ],
+        "motions": [], "votes": [],
+    }, 480))
+
+
+def fetch(url: str, token: str) -> dict:
+    """Time to the first transcript row and to the end of the body."""
+    first_row = None
+    received = 0
+    started = time.perf_counter()
+    with httpx.Client(timeout=300) as http:
+        with http.stream("GET", url, headers={"Authorization": f"Bearer {token}"}) as response:
+            response.raise_for_status()
+            for chunk in response.iter_bytes():
+                received += len(chunk)
+                if first_row is None and b'"speaker"' in chunk:
+                    first_row = time.perf_counter() - started
+    return {"first_row_s": first_row or 0.0, "total_s": time.perf_counter() - started, "bytes": received}
+
+
+async def run(args):
+    build_database(args.entries)
+    main.start_rolling_summarizer = lambda meeting_id: None
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    base_url = f"http://127.0.0.1:{port}"
+    results = {}
+    loop = asyncio.get_running_loop()
+    try:
+        async with httpx.AsyncClient(base_url=base_url) as http:
+            login = await http.post("/auth/login", json={"username": "secretary", "password": "secretary123"})
+            token = login.json()["token"]
+        with ProcessPoolExecutor(1) as pool:
+            for label, path in (("minutes", "minutes"), ("stream", "transcript")):
+                tracemalloc.start()
+                result = await loop.run_in_executor(pool, fetch, f"{base_url}/api/meetings/{MEETING}/{path}", token)
+                result["peak_mb"] = tracemalloc.get_traced_memory()[1] / 1e6
+                tracemalloc.stop()
+                results[label] = result
+    finally:
+        server.should_exit = True
+        await server_task
+
+    print(f"\nTranscript of {args.entries:,} entries "
+          f"(tracemalloc slows the server, compare the rows rather than absolute times)")
+    for label, r in results.items():
+        print(f"  {label:<8} first row {r['first_row_s'] * 1000:8.1f} ms   total {r['total_s']:6.2f} s   "
+              f"{r['bytes'] / 1e6:6.1f} MB sent   server peak {r['peak_mb']:7.1f} MB")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, default=200000, help="Transcript entries in the meeting")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,86 @@
+"""
+Benchmark: LocalVectorStore.query latency, flat scan vs IVF, on clustered 1536-d vectors.
+
+Usage:
+    python benchmarks/bench_vector_store.py [--sizes 5000 50000 200000] [--queries 200]
+
+Recall@5 of the IVF search is measured against the flat scan. The last
+column is a query filtered to one document ({"source": name}), as the
+retrieval cache and delete-by-document paths issue.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import vector_store  # noqa: E402
+from vector_store import LocalVectorStore  # noqa: E402
+
+DIMENSION = 1536
+TOP_K = 5
+TOPICS = 500  # chunks about the same policy area embed close together
+CHUNKS_PER_DOCUMENT = 100
+
+
+def make_vectors(count: int, centers: np.ndarray, rng) -> np.ndarray:
+    topics = rng.integers(0, len(centers), count)
+    noise = rng.standard_normal((count, DIMENSION)).astype(np.float32)
+    return centers[topics] + 0.7 * noise
+
+
+def build_store(size: int, centers: np.ndarray, seed: int, ivf: bool) -> LocalVectorStore:
+    vector_store.LOCAL_IVF_MIN_VECTORS = 1 if ivf else 0
+    rng = np.random.default_rng(seed)
+    store = LocalVectorStore(tempfile.mkdtemp(prefix="bench-vectors-"))
+    for start in range(0, size, 10000):
+        count = min(10000, size - start)
+        values = make_vectors(count, centers, rng)
+        store.upsert([
+            {"id": str(start + i), "values": values[i], "metadata": {"source": f"doc-{(start + i) // CHUNKS_PER_DOCUMENT}", "text": ""}}
+            for i in range(count)
+        ])
+    store.persist()
+    return store
+
+
+def time_queries(store: LocalVectorStore, queries: np.ndarray, filter: dict = None) -> tuple:
+    results = []
+    started = time.perf_counter()
+    for q in queries:
+        results.append({m.id for m in store.query(q, TOP_K, filter=filter).matches})
+    return (time.perf_counter() - started) / len(queries) * 1000, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5000, 50000])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((TOPICS, DIMENSION)).astype(np.float32)
+    print(f"{'vectors':>8} {'flat (ms)':>10} {'ivf (ms)':>9} {'recall@5':>9} {'one doc (ms)':>13}")
+
+    for size in args.sizes:
+        flat = build_store(size, centers, seed=size, ivf=False)
+        ivf = build_store(size, centers, seed=size, ivf=True)
+        queries = make_vectors(args.queries, centers, rng)
+
+        flat_ms, expected = time_queries(flat, queries)
+        ivf_ms, found = time_queries(ivf, queries)
+        recall = np.mean([len(e & f) / TOP_K for e, f in zip(expected, found)])
+        document = f"doc-{size // CHUNKS_PER_DOCUMENT // 2}"
+        doc_ms, in_doc = time_queries(ivf, queries, filter={"source": document})
+        assert all(len(ids) == TOP_K and all(ivf.fetch(list(ids)).vectors[i].metadata["source"] == document
+                                              for i in ids) for ids in in_doc)
+        print(f"{size:>8} {flat_ms:>10.2f} {ivf_ms:>9.2f} {recall:>9.3f} {doc_ms:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
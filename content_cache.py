@@ -0,0 +1,119 @@
+"""
+Sindh Police AI Meeting Member - Content-Addressed Cache
+Two-tier (in-memory LRU + SQLite) cache for generated notes and DOCX exports
+"""
+
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+from database import cache_get, cache_put
+
+load_dotenv(override=True)
+
+CONTENT_CACHE_MEMORY_ENTRIES = int(os.getenv("CONTENT_CACHE_MEMORY_ENTRIES", 64))
+CONTENT_CACHE_DISK_ENTRIES = int(os.getenv("CONTENT_CACHE_DISK_ENTRIES", 1000))
+
+
+def content_key(*parts) -> str:
+    """
+    Hash arbitrary JSON-serializable parts into a stable cache key.
+
+    Args:
+        parts: Values that fully determine the cached content
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ContentCache:
+    """
+    Content-addressed byte cache with an in-memory LRU tier in front of
+    the ``content_cache`` SQLite table.
+
+    Methods are synchronous and thread-safe; call them through
+    ``asyncio.to_thread`` from async code when the disk tier may be hit.
+    """
+
+    def __init__(self, namespace: str, memory_entries: int = CONTENT_CACHE_MEMORY_ENTRIES,
+                 disk_entries: int = CONTENT_CACHE_DISK_ENTRIES):
+        self.namespace = namespace
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _remember(self, key: str, value: bytes):
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, key: str) -> bytes:
+        """Return cached bytes for ``key`` or None."""
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return value
+
+        try:
+            value = cache_get(self.namespace, key)
+        except Exception as e:
+            print(f"⚠️ Cache read failed ({self.namespace}): {e}")
+            value = None
+
+        if value is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.disk_hits += 1
+        self._remember(key, value)
+        return value
+
+    def put(self, key: str, value: bytes):
+        """Store ``value`` under ``key`` in both tiers."""
+        self._remember(key, value)
+        try:
+            cache_put(self.namespace, key, value, max_entries=self.disk_entries)
+        except Exception as e:
+            print(f"⚠️ Cache write failed ({self.namespace}): {e}")
+
+    def stats(self) -> dict:
+        """Hit/miss counters and memory-tier size."""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "namespace": self.namespace,
+                "memory_entries": len(self._memory),
+                "memory_capacity": self.memory_entries,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+            }
+
+
+notes_cache = ContentCache("meeting_notes")
+docx_cache = ContentCache("notes_docx")
+
+
+__all__ = [
+    'content_key',
+    'ContentCache',
+    'notes_cache',
+    'docx_cache',
+]
@@ -1,6 +1,11 @@
 import sqlite3
 import json
 import os
+import asyncio
+import functools
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
@@ -8,186 +13,424 @@ DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
 os.makedirs(DATA_DIR, exist_ok=True)
 DB_PATH = os.path.join(DATA_DIR, "meetings.db")
 
+# At most DB_POOL_SIZE connections, reused with their prepared statements cached;
+# async callers run queries on a DB_POOL_SIZE-thread executor (see run_db)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 8))
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", 30))
+DB_STATEMENT_CACHE = int(os.getenv("DB_STATEMENT_CACHE", 256))
+
+
+class ConnectionPool:
+    """
+    Up to ``size`` reusable connections to one database file.
+
+    connection() lends one for a with block and always takes it back, rolling
+    back anything left uncommitted, so PRAGMAs and the statement cache
+    survive between calls. It waits for a free connection when all of them
+    are borrowed and raises sqlite3.OperationalError after
+    DB_POOL_TIMEOUT_SECONDS.
+    """
+
+    def __init__(self, path, size=DB_POOL_SIZE):
+        self.path = path
+        self.size = size
+        self.closed = False
+        self._idle = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, cached_statements=DB_STATEMENT_CACHE, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        if not self._slots.acquire(timeout=DB_POOL_TIMEOUT_SECONDS):
+            raise sqlite3.OperationalError(f"No database connection free after {DB_POOL_TIMEOUT_SECONDS}s")
+        conn = None
+        try:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            conn = conn or self._connect()
+            yield conn
+        finally:
+            if conn is not None:
+                self._release(conn)
+            self._slots.release()
+
+    def _release(self, conn):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn.close()
+            return
+        with self._lock:
+            if not self.closed:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close_all(self):
+        with self._lock:
+            self.closed = True
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
 
 def get_connection():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA foreign_keys=ON")
-    return conn
+    """
+    Borrow a connection from the pool for DB_PATH for a with block:
+    ``with get_connection() as conn: ...``. It goes back to the pool when
+    the block exits, whether or not it raised.
+    """
+    global _pool
+    pool = _pool
+    if pool is None or pool.path != DB_PATH:
+        with _pool_lock:
+            if _pool is None or _pool.path != DB_PATH:
+                if _pool is not None:
+                    _pool.close_all()
+                _pool = ConnectionPool(DB_PATH)
+            pool = _pool
+    return pool.connection()
+
+
+_executor = ThreadPoolExecutor(max_workers=DB_POOL_SIZE, thread_name_prefix="db")
+
+
+async def run_db(func, *args, **kwargs):
+    """
+    Await a blocking database call without blocking the event loop.
+
+    Async code calls database functions through this, e.g.
+    ``await run_db(get_meeting_minutes, meeting_id)``; they run on a
+    dedicated executor sized to the connection pool.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+
+def shutdown_db_executor():
+    _executor.shutdown(wait=True, cancel_futures=True)
+
+
+# Schema changes after the base tables, applied in order and tracked in PRAGMA user_version
+MIGRATIONS = [
+    (1, "index child tables by meeting and meetings by creation time", """
+        CREATE INDEX IF NOT EXISTS idx_transcript_entries_meeting ON transcript_entries(meeting_id);
+        CREATE INDEX IF NOT EXISTS idx_votes_meeting ON votes(meeting_id);
+        CREATE INDEX IF NOT EXISTS idx_motions_meeting ON motions(meeting_id);
+        CREATE INDEX IF NOT EXISTS idx_meetings_created_at ON meetings(created_at);
+    """),
+    (2, "record who started each meeting", """
+        ALTER TABLE meetings ADD COLUMN started_by TEXT DEFAULT '';
+    """),
+    (3, "index meetings by the history page's keyset (created_at, meeting_id)", """
+        DROP INDEX IF EXISTS idx_meetings_created_at;
+        CREATE INDEX IF NOT EXISTS idx_meetings_created_at_id ON meetings(created_at, meeting_id);
+    """),
+]
+
+
+def migrate(conn):
+    """Apply pending MIGRATIONS; returns the schema version."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for target, description, script in MIGRATIONS:
+        if target <= version:
+            continue
+        # executescript commits first, so wrap each migration in its own transaction
+        conn.executescript(f"BEGIN; {script} PRAGMA user_version = {target}; COMMIT;")
+        print(f"✅ Database migrated to v{target}: {description}")
+        version = target
+    return version
 
 
 def init_db():
-    conn = get_connection()
-    conn.executescript("""
-        CREATE TABLE IF NOT EXISTS meetings (
-            meeting_id   TEXT PRIMARY KEY,
-            start_time   TEXT NOT NULL,
-            end_time     TEXT,
-            duration_minutes INTEGER DEFAULT 0,
-            agenda       TEXT DEFAULT '',
-            status       TEXT DEFAULT 'active',
-            total_votes  INTEGER DEFAULT 0,
-            total_motions INTEGER DEFAULT 0,
-            meeting_notes TEXT,
-            created_at   TEXT NOT NULL
-        );
-
-        CREATE TABLE IF NOT EXISTS transcript_entries (
-            id           INTEGER PRIMARY KEY AUTOINCREMENT,
-            meeting_id   TEXT NOT NULL,
-            speaker      TEXT NOT NULL,
-            text         TEXT NOT NULL,
-            timestamp    TEXT NOT NULL,
-            FOREIGN KEY (meeting_id) REFERENCES meetings(meeting_id)
-        );
-
-        CREATE TABLE IF NOT EXISTS votes (
-            id                   INTEGER PRIMARY KEY AUTOINCREMENT,
-            vote_id              TEXT NOT NULL,
-            meeting_id           TEXT NOT NULL,
-            motion               TEXT NOT NULL,
-            vote                 TEXT NOT NULL,
-            reasoning            TEXT DEFAULT '',
-            regulatory_reference TEXT DEFAULT '',
-            risk_assessment      TEXT DEFAULT '',
-            voter                TEXT DEFAULT '',
-            timestamp            TEXT NOT NULL,
-            FOREIGN KEY (meeting_id) REFERENCES meetings(meeting_id)
-        );
-
-        CREATE TABLE IF NOT EXISTS motions (
-            id           INTEGER PRIMARY KEY AUTOINCREMENT,
-            motion_id    TEXT NOT NULL,
-            meeting_id   TEXT NOT NULL,
-            motion_text  TEXT NOT NULL,
-            proposed_by  TEXT DEFAULT '',
-            status       TEXT DEFAULT 'pending',
-            timestamp    TEXT NOT NULL,
-            FOREIGN KEY (meeting_id) REFERENCES meetings(meeting_id)
-        );
-    """)
-    conn.commit()
-    conn.close()
+    with get_connection() as conn:
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meetings (
+                meeting_id   TEXT PRIMARY KEY,
+                start_time   TEXT NOT NULL,
+                end_time     TEXT,
+                duration_minutes INTEGER DEFAULT 0,
+                agenda       TEXT DEFAULT '',
+                status       TEXT DEFAULT 'active',
+                total_votes  INTEGER DEFAULT 0,
+                total_motions INTEGER DEFAULT 0,
+                meeting_notes TEXT,
+                created_at   TEXT NOT NULL
+            );
+
+            CREATE TABLE IF NOT EXISTS transcript_entries (
+                id           INTEGER PRIMARY KEY AUTOINCREMENT,
+                meeting_id   TEXT NOT NULL,
+                speaker      TEXT NOT NULL,
+                text         TEXT NOT NULL,
+                timestamp    TEXT NOT NULL,
+                FOREIGN KEY (meeting_id) REFERENCES meetings(meeting_id)
+            );
+
+            CREATE TABLE IF NOT EXISTS votes (
+                id                   INTEGER PRIMARY KEY AUTOINCREMENT,
+                vote_id              TEXT NOT NULL,
+                meeting_id           TEXT NOT NULL,
+                motion               TEXT NOT NULL,
+                vote                 TEXT NOT NULL,
+                reasoning            TEXT DEFAULT '',
+                regulatory_reference TEXT DEFAULT '',
+                risk_assessment      TEXT DEFAULT '',
+                voter                TEXT DEFAULT '',
+                timestamp            TEXT NOT NULL,
+                FOREIGN KEY (meeting_id) REFERENCES meetings(meeting_id)
+            );
+
+            CREATE TABLE IF NOT EXISTS motions (
+                id           INTEGER PRIMARY KEY AUTOINCREMENT,
+                motion_id    TEXT NOT NULL,
+                meeting_id   TEXT NOT NULL,
+                motion_text  TEXT NOT NULL,
+                proposed_by  TEXT DEFAULT '',
+                status       TEXT DEFAULT 'pending',
+                timestamp    TEXT NOT NULL,
+                FOREIGN KEY (meeting_id) REFERENCES meetings(meeting_id)
+            );
+
+            CREATE TABLE IF NOT EXISTS content_cache (
+                namespace    TEXT NOT NULL,
+                cache_key    TEXT NOT NULL,
+                value        BLOB NOT NULL,
+                created_at   TEXT NOT NULL,
+                PRIMARY KEY (namespace, cache_key)
+            );
+
+            CREATE TABLE IF NOT EXISTS documents (
+                name         TEXT PRIMARY KEY,
+                chunk_count  INTEGER NOT NULL DEFAULT 0,
+                content_hash TEXT NOT NULL DEFAULT '',
+                uploaded_at  TEXT NOT NULL,
+                uploaded_by  TEXT DEFAULT ''
+            );
+
+            CREATE TABLE IF NOT EXISTS document_chunks (
+                document_name TEXT NOT NULL,
+                chunk_id      TEXT NOT NULL,
+                content_hash  TEXT NOT NULL,
+                PRIMARY KEY (document_name, chunk_id),
+                FOREIGN KEY (document_name) REFERENCES documents(name) ON DELETE CASCADE
+            );
+
+            -- BM25 lexical index over the same chunks as the vector index
+            CREATE VIRTUAL TABLE IF NOT EXISTS chunk_fts USING fts5(
+                chunk_id UNINDEXED,
+                source UNINDEXED,
+                chunk_index UNINDEXED,
+                text
+            );
+        """)
+        conn.commit()
+        migrate(conn)
     print("✅ Database initialized")
 
 
-def save_meeting_minutes(meeting_id, session_data, meeting_notes=None, duration_minutes=0):
-    conn = get_connection()
-    karachi_tz = ZoneInfo("Asia/Karachi")
-    now = datetime.now(karachi_tz).isoformat()
-
-    conn.execute("""
-        INSERT OR REPLACE INTO meetings
-        (meeting_id, start_time, end_time, duration_minutes, agenda, status,
-         total_votes, total_motions, meeting_notes, created_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
-        meeting_id,
-        session_data.get("start_time", now),
-        session_data.get("end_time", now),
-        duration_minutes,
-        session_data.get("agenda", ""),
-        "ended",
-        len(session_data.get("votes", [])),
-        len(session_data.get("motions", [])),
-        meeting_notes,
-        now,
-    ))
-
-    # Save transcript entries
-    for entry in session_data.get("transcript", []):
-        conn.execute("""
-            INSERT INTO transcript_entries (meeting_id, speaker, text, timestamp)
-            VALUES (?, ?, ?, ?)
-        """, (
-            meeting_id,
-            entry.get("speaker", "Unknown"),
-            entry.get("text", ""),
-            entry.get("timestamp", now),
-        ))
-
-    # Save votes
-    for v in session_data.get("votes", []):
-        conn.execute("""
-            INSERT INTO votes
-            (vote_id, meeting_id, motion, vote, reasoning,
-             regulatory_reference, risk_assessment, voter, timestamp)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            v.get("vote_id", ""),
-            meeting_id,
-            v.get("motion", ""),
-            v.get("vote", ""),
-            v.get("reasoning", ""),
-            v.get("regulatory_reference", ""),
-            v.get("risk_assessment", ""),
-            v.get("voter", ""),
-            v.get("timestamp", now),
-        ))
-
-    # Save motions
-    for m in session_data.get("motions", []):
-        conn.execute("""
-            INSERT INTO motions
-            (motion_id, meeting_id, motion_text, proposed_by, status, timestamp)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (
-            m.get("motion_id", ""),
-            meeting_id,
-            m.get("motion_text", ""),
-            m.get("proposed_by", ""),
-            m.get("status", "pending"),
-            m.get("timestamp", now),
-        ))
-
-    conn.commit()
-    conn.close()
-    print(f"✅ Meeting minutes saved to database: {meeting_id}")
-
-
-def get_all_meetings():
-    conn = get_connection()
-    rows = conn.execute("""
-        SELECT meeting_id, start_time, end_time, duration_minutes, agenda,
-               status, total_votes, total_motions, created_at
-        FROM meetings
-        ORDER BY created_at DESC
-    """).fetchall()
-    conn.close()
+# Live meeting events written while the meeting runs: kind -> statements run with executemany.
+# Each event's params is a dict of the named parameters below.
+MINUTES_EVENT_SQL = {
+    # A reused meeting ID starts over
+    "meeting_started": [
+        # Meeting IDs are never reused (open_meeting rejects archived ones), so an
+        # existing row is a replay of this same event and is left untouched
+        """INSERT INTO meetings (meeting_id, start_time, agenda, status, started_by, created_at)
+           VALUES (:meeting_id, :start_time, :agenda, 'active', :started_by, :start_time)
+           ON CONFLICT(meeting_id) DO NOTHING""",
+    ],
+    "transcript": [
+        """INSERT INTO transcript_entries (meeting_id, speaker, text, timestamp)
+           VALUES (:meeting_id, :speaker, :text, :timestamp)""",
+    ],
+    "motion": [
+        """INSERT INTO motions (motion_id, meeting_id, motion_text, proposed_by, status, timestamp)
+           VALUES (:motion_id, :meeting_id, :motion_text, :proposed_by, :status, :timestamp)""",
+        # Another worker's writer may land it after meeting_ended
+        """UPDATE meetings SET total_motions = (SELECT COUNT(*) FROM motions WHERE meeting_id = :meeting_id)
+           WHERE meeting_id = :meeting_id AND status = 'ended'""",
+    ],
+    "motion_status": [
+        "UPDATE motions SET status = :status WHERE meeting_id = :meeting_id AND motion_id = :motion_id",
+    ],
+    "vote": [
+        """INSERT INTO votes
+           (vote_id, meeting_id, motion, vote, reasoning,
+            regulatory_reference, risk_assessment, voter, timestamp)
+           VALUES (:vote_id, :meeting_id, :motion, :vote, :reasoning,
+                   :regulatory_reference, :risk_assessment, :voter, :timestamp)""",
+        """UPDATE meetings SET total_votes = (SELECT COUNT(*) FROM votes WHERE meeting_id = :meeting_id)
+           WHERE meeting_id = :meeting_id AND status = 'ended'""",
+    ],
+    "meeting_ended": [
+        """UPDATE meetings SET
+               status = 'ended', end_time = :end_time, duration_minutes = :duration_minutes,
+               total_votes = (SELECT COUNT(*) FROM votes WHERE meeting_id = :meeting_id),
+               total_motions = (SELECT COUNT(*) FROM motions WHERE meeting_id = :meeting_id)
+           WHERE meeting_id = :meeting_id""",
+    ],
+}
+
+
+def write_minutes_events(events):
+    """
+    Write live meeting events in one transaction.
+
+    ``events`` is an ordered list of ``(kind, params)`` pairs, ``kind`` being a
+    key of MINUTES_EVENT_SQL. Runs of the same kind are written together with
+    executemany; order between kinds is preserved.
+    """
+    with get_connection() as conn, conn:
+        i = 0
+        while i < len(events):
+            kind = events[i][0]
+            j = i
+            while j < len(events) and events[j][0] == kind:
+                j += 1
+            rows = [params for _, params in events[i:j]]
+            for sql in MINUTES_EVENT_SQL[kind]:
+                conn.executemany(sql, rows)
+            i = j
+
+
+def get_active_meetings():
+    """Meetings whose end was never recorded, oldest first"""
+    with get_connection() as conn:
+        rows = conn.execute("""
+            SELECT meeting_id, start_time, agenda, started_by, created_at
+            FROM meetings
+            WHERE status = 'active'
+            ORDER BY created_at
+        """).fetchall()
     return [dict(r) for r in rows]
 
 
-def get_meeting_minutes(meeting_id):
-    conn = get_connection()
+def _meeting_filters(status=None, created_from=None, created_before=None, has_votes=None):
+    clauses, params = [], []
+    if status:
+        clauses.append("status = ?")
+        params.append(status)
+    if created_from:
+        clauses.append("created_at >= ?")
+        params.append(created_from)
+    if created_before:
+        clauses.append("created_at < ?")
+        params.append(created_before)
+    if has_votes is not None:
+        clauses.append(("" if has_votes else "NOT ") +
+                       "EXISTS (SELECT 1 FROM votes WHERE votes.meeting_id = meetings.meeting_id)")
+    return clauses, params
+
+
+def get_meetings_page(limit=50, after=None, **filters):
+    """
+    One page of meetings, newest first, using keyset pagination.
+
+    ``after`` is the ``(created_at, meeting_id)`` of the last meeting on the
+    previous page. The (created_at, meeting_id) index gives the order and
+    the seek to ``after``; the index does not cover the selected columns, so
+    each returned row is then read from the table. A page costs limit + 1
+    row lookups however deep it is.
+    ``filters`` are status, created_from/created_before (ISO bounds on
+    created_at) and has_votes. Returns ``(meetings, next_after)``;
+    ``next_after`` is None on the last page.
+    """
+    clauses, params = _meeting_filters(**filters)
+    if after:
+        clauses.append("(created_at, meeting_id) < (?, ?)")
+        params.extend(after)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    with get_connection() as conn:
+        rows = conn.execute(f"""
+            SELECT meeting_id, start_time, end_time, duration_minutes, agenda,
+                   status, total_votes, total_motions, created_at
+            FROM meetings
+            {where}
+            ORDER BY created_at DESC, meeting_id DESC
+            LIMIT ?
+        """, params + [limit + 1]).fetchall()
+    meetings = [dict(r) for r in rows[:limit]]
+    next_after = None
+    if len(rows) > limit:
+        next_after = (meetings[-1]["created_at"], meetings[-1]["meeting_id"])
+    return meetings, next_after
 
-    meeting = conn.execute(
-        "SELECT * FROM meetings WHERE meeting_id = ?", (meeting_id,)
-    ).fetchone()
-    if not meeting:
-        conn.close()
-        return None
 
-    transcript = conn.execute(
-        "SELECT speaker, text, timestamp FROM transcript_entries WHERE meeting_id = ? ORDER BY id",
-        (meeting_id,)
-    ).fetchall()
+def count_meetings(**filters):
+    """Number of meetings matching the get_meetings_page filters"""
+    clauses, params = _meeting_filters(**filters)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    with get_connection() as conn:
+        count = conn.execute(f"SELECT COUNT(*) FROM meetings {where}", params).fetchone()[0]
+    return count
 
-    votes = conn.execute(
-        "SELECT vote_id, motion, vote, reasoning, regulatory_reference, risk_assessment, voter, timestamp "
-        "FROM votes WHERE meeting_id = ? ORDER BY id",
-        (meeting_id,)
-    ).fetchall()
 
-    motions = conn.execute(
-        "SELECT motion_id, motion_text, proposed_by, status, timestamp "
-        "FROM motions WHERE meeting_id = ? ORDER BY id",
-        (meeting_id,)
-    ).fetchall()
+def meeting_exists(meeting_id):
+    with get_connection() as conn:
+        row = conn.execute("SELECT 1 FROM meetings WHERE meeting_id = ?", (meeting_id,)).fetchone()
+    return row is not None
 
-    conn.close()
 
-    return {
+def get_meeting_minutes(meeting_id, transcript_limit=None):
+    """
+    A meeting with its transcript, votes and motions.
+
+    With ``transcript_limit`` only the first that many transcript entries
+    are read (with their ``id``; 0 reads none), and ``transcript_count``,
+    ``speakers`` and ``transcript_next_after_id`` are returned with them.
+    Read the rest with get_transcript_page from ``transcript_next_after_id``,
+    which is None once the page holds the whole transcript.
+    """
+    with get_connection() as conn:
+        meeting = conn.execute(
+            "SELECT * FROM meetings WHERE meeting_id = ?", (meeting_id,)
+        ).fetchone()
+        if not meeting:
+            return None
+
+        if transcript_limit is None:
+            transcript = conn.execute(
+                "SELECT speaker, text, timestamp FROM transcript_entries WHERE meeting_id = ? ORDER BY id",
+                (meeting_id,)
+            ).fetchall()
+        else:
+            transcript = conn.execute(
+                "SELECT id, speaker, text, timestamp FROM transcript_entries WHERE meeting_id = ? ORDER BY id LIMIT ?",
+                (meeting_id, transcript_limit)
+            ).fetchall()
+            speakers = conn.execute(
+                "SELECT speaker, COUNT(*) AS entries FROM transcript_entries WHERE meeting_id = ? "
+                "GROUP BY speaker ORDER BY MIN(id)",
+                (meeting_id,)
+            ).fetchall()
+
+        votes = conn.execute(
+            "SELECT vote_id, motion, vote, reasoning, regulatory_reference, risk_assessment, voter, timestamp "
+            "FROM votes WHERE meeting_id = ? ORDER BY id",
+            (meeting_id,)
+        ).fetchall()
+
+        motions = conn.execute(
+            "SELECT motion_id, motion_text, proposed_by, status, timestamp "
+            "FROM motions WHERE meeting_id = ? ORDER BY id",
+            (meeting_id,)
+        ).fetchall()
+
+    minutes = {
         "meeting_id": meeting["meeting_id"],
         "start_time": meeting["start_time"],
         "end_time": meeting["end_time"],
@@ -201,3 +444,200 @@ def get_meeting_minutes(meeting_id):
         "votes": [dict(r) for r in votes],
         "motions": [dict(r) for r in motions],
     }
+    if transcript_limit is not None:
+        count = sum(r["entries"] for r in speakers)
+        minutes["transcript_count"] = count
+        minutes["speakers"] = [r["speaker"] for r in speakers]
+        if count > len(transcript):
+            minutes["transcript_next_after_id"] = transcript[-1]["id"] if transcript else 0
+        else:
+            minutes["transcript_next_after_id"] = None
+    return minutes
+
+
+def get_transcript_page(meeting_id, after_id=0, limit=500, before_id=None, since=None, until=None):
+    """
+    Transcript entries of a meeting in order, ``limit`` at a time.
+
+    Entries come with their ``id``; pass the last one back as ``after_id``
+    for the next page. ``before_id`` (exclusive) and ``since``/``until``
+    (ISO timestamps, inclusive/exclusive) narrow the range.
+    """
+    sql = "SELECT id, speaker, text, timestamp FROM transcript_entries WHERE meeting_id = ? AND id > ?"
+    params = [meeting_id, after_id]
+    if before_id is not None:
+        sql += " AND id < ?"
+        params.append(before_id)
+    if since:
+        sql += " AND timestamp >= ?"
+        params.append(since)
+    if until:
+        sql += " AND timestamp < ?"
+        params.append(until)
+    sql += " ORDER BY id LIMIT ?"
+    params.append(limit)
+    with get_connection() as conn:
+        rows = conn.execute(sql, params).fetchall()
+    return [dict(r) for r in rows]
+
+
+def update_meeting_notes(meeting_id, meeting_notes):
+    with get_connection() as conn:
+        conn.execute(
+            "UPDATE meetings SET meeting_notes = ? WHERE meeting_id = ?",
+            (meeting_notes, meeting_id)
+        )
+        conn.commit()
+
+
+def cache_get(namespace, cache_key):
+    with get_connection() as conn:
+        row = conn.execute(
+            "SELECT value FROM content_cache WHERE namespace = ? AND cache_key = ?",
+            (namespace, cache_key)
+        ).fetchone()
+    return bytes(row["value"]) if row else None
+
+
+def cache_put(namespace, cache_key, value, max_entries=1000):
+    with get_connection() as conn:
+        now = datetime.now(ZoneInfo("Asia/Karachi")).isoformat()
+        conn.execute(
+            "INSERT OR REPLACE INTO content_cache (namespace, cache_key, value, created_at) VALUES (?, ?, ?, ?)",
+            (namespace, cache_key, value, now)
+        )
+        # Keep the newest max_entries rows per namespace
+        conn.execute("""
+            DELETE FROM content_cache
+            WHERE namespace = ? AND cache_key NOT IN (
+                SELECT cache_key FROM content_cache WHERE namespace = ?
+                ORDER BY created_at DESC LIMIT ?
+            )
+        """, (namespace, namespace, max_entries))
+        conn.commit()
+
+
+def get_all_documents():
+    with get_connection() as conn:
+        rows = conn.execute("""
+            SELECT name, chunk_count, content_hash, uploaded_at, uploaded_by
+            FROM documents
+            ORDER BY name
+        """).fetchall()
+    return [dict(r) for r in rows]
+
+
+def get_document_chunks(name):
+    """Vector IDs (-> chunk content hash) currently indexed for a document."""
+    with get_connection() as conn:
+        rows = conn.execute(
+            "SELECT chunk_id, content_hash FROM document_chunks WHERE document_name = ?", (name,)
+        ).fetchall()
+    return {r["chunk_id"]: r["content_hash"] for r in rows}
+
+
+def get_all_document_chunk_ids():
+    with get_connection() as conn:
+        rows = conn.execute("SELECT document_name, chunk_id FROM document_chunks").fetchall()
+    return {r["chunk_id"]: r["document_name"] for r in rows}
+
+
+def save_document(name, chunks, content_hash, uploaded_by=""):
+    """Record a document and the vector IDs now indexed for it (chunks: chunk_id -> hash)."""
+    with get_connection() as conn:
+        now = datetime.now(ZoneInfo("Asia/Karachi")).isoformat()
+        conn.execute("""
+            INSERT INTO documents (name, chunk_count, content_hash, uploaded_at, uploaded_by)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET
+                chunk_count = excluded.chunk_count,
+                content_hash = excluded.content_hash,
+                uploaded_at = excluded.uploaded_at,
+                uploaded_by = excluded.uploaded_by
+        """, (name, len(chunks), content_hash, now, uploaded_by))
+        conn.execute("DELETE FROM document_chunks WHERE document_name = ?", (name,))
+        conn.executemany(
+            "INSERT INTO document_chunks (document_name, chunk_id, content_hash) VALUES (?, ?, ?)",
+            [(name, chunk_id, chunk_hash) for chunk_id, chunk_hash in chunks.items()]
+        )
+        conn.commit()
+
+
+def remove_document_chunks(name, chunk_ids):
+    with get_connection() as conn:
+        conn.executemany(
+            "DELETE FROM document_chunks WHERE document_name = ? AND chunk_id = ?",
+            [(name, chunk_id) for chunk_id in chunk_ids]
+        )
+        conn.executemany("DELETE FROM chunk_fts WHERE chunk_id = ?", [(chunk_id,) for chunk_id in chunk_ids])
+        conn.execute("""
+            UPDATE documents SET chunk_count =
+                (SELECT COUNT(*) FROM document_chunks WHERE document_name = ?)
+            WHERE name = ?
+        """, (name, name))
+        conn.commit()
+
+
+def delete_document_record(name):
+    """
+    Remove a document from the registry and the BM25 index; returns its
+    vector IDs, or None if it was not registered (its BM25 rows are removed
+    either way).
+    """
+    with get_connection() as conn:
+        row = conn.execute("SELECT 1 FROM documents WHERE name = ?", (name,)).fetchone()
+        chunk_ids = None
+        if row:
+            chunk_ids = [r["chunk_id"] for r in conn.execute(
+                "SELECT chunk_id FROM document_chunks WHERE document_name = ?", (name,)
+            ).fetchall()]
+            conn.execute("DELETE FROM documents WHERE name = ?", (name,))
+        conn.execute("DELETE FROM chunk_fts WHERE source = ?", (name,))
+        conn.commit()
+    return chunk_ids
+
+
+def clear_documents():
+    with get_connection() as conn:
+        conn.execute("DELETE FROM documents")
+        conn.execute("DELETE FROM chunk_fts")
+        conn.commit()
+
+
+def lexical_chunk_ids(source):
+    with get_connection() as conn:
+        rows = conn.execute("SELECT chunk_id FROM chunk_fts WHERE source = ?", (source,)).fetchall()
+    return {r["chunk_id"] for r in rows}
+
+
+def lexical_index_chunks(rows):
+    """Add chunks to the lexical index (rows: chunk_id, source, chunk_index, text)."""
+    with get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO chunk_fts (chunk_id, source, chunk_index, text) VALUES (?, ?, ?, ?)", rows
+        )
+        conn.commit()
+
+
+def lexical_remove_chunks(chunk_ids):
+    with get_connection() as conn:
+        conn.executemany("DELETE FROM chunk_fts WHERE chunk_id = ?", [(chunk_id,) for chunk_id in chunk_ids])
+        conn.commit()
+
+
+def lexical_search(match_query, limit=20, source=None):
+    """BM25 search; ``match_query`` is an FTS5 MATCH expression. Higher score is better."""
+    with get_connection() as conn:
+        sql = """
+            SELECT chunk_id, source, chunk_index, text, -bm25(chunk_fts) AS score
+            FROM chunk_fts
+            WHERE chunk_fts MATCH ?
+        """
+        params = [match_query]
+        if source:
+            sql += " AND source = ?"
+            params.append(source)
+        sql += " ORDER BY bm25(chunk_fts) LIMIT ?"
+        params.append(limit)
+        rows = conn.execute(sql, params).fetchall()
+    return [dict(r) for r in rows]
@@ -0,0 +1,275 @@
+"""
+Sindh Police AI Meeting Member - Streaming Document Extraction
+Spools uploads to disk and yields document text and chunks incrementally
+so peak memory stays bounded regardless of document size. Multi-file
+uploads are extracted and chunked in parallel worker processes.
+"""
+
+import os
+import sys
+import json
+import shutil
+import asyncio
+import tempfile
+import multiprocessing
+from contextlib import suppress
+from dotenv import load_dotenv
+
+load_dotenv(override=True)
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx')
+
+# Text buffered before the splitter runs; the last chunk is carried over
+STREAM_SPLIT_CHARS = int(os.getenv("STREAM_SPLIT_CHARS", 50000))
+DOCX_BLOCK_CHARS = 20000
+
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", min(4, os.cpu_count() or 1)))
+EXTRACT_TIMEOUT_SECONDS = float(os.getenv("EXTRACT_TIMEOUT_SECONDS", 120))
+
+# Live extraction worker processes, and the asyncio.Semaphore limiting them to EXTRACT_WORKERS
+_processes = set()
+_slots = None
+
+
+def is_supported(filename: str) -> bool:
+    """Whether the file type can be ingested."""
+    return filename.lower().endswith(SUPPORTED_EXTENSIONS)
+
+
+async def spool_upload(upload) -> str:
+    """
+    Copy an uploaded file to a temporary file on disk without reading it into memory.
+
+    Args:
+        upload: FastAPI UploadFile
+
+    Returns:
+        Path of the temporary file (caller removes it)
+    """
+    suffix = os.path.splitext(upload.filename or "")[1]
+
+    def _copy():
+        upload.file.seek(0)
+        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+            shutil.copyfileobj(upload.file, tmp, 1024 * 1024)
+            return tmp.name
+
+    return await asyncio.to_thread(_copy)
+
+
+def iter_document_text(path: str, filename: str):
+    """
+    Yield a document's text piece by piece.
+
+    PDFs are yielded page by page. python-docx has to parse the whole
+    document, but paragraphs are still yielded in blocks instead of being
+    concatenated into one string.
+
+    Args:
+        path: File path on disk
+        filename: Original file name (used for the file type)
+    """
+    name = filename.lower()
+    if name.endswith('.pdf'):
+        from pypdf import PdfReader
+
+        with open(path, "rb") as f:
+            reader = PdfReader(f)
+            for page in reader.pages:
+                yield page.extract_text() or ""
+    elif name.endswith('.docx'):
+        from docx import Document
+
+        doc = Document(path)
+        block = []
+        size = 0
+        for para in doc.paragraphs:
+            block.append(para.text + "\n")
+            size += len(para.text) + 1
+            if size >= DOCX_BLOCK_CHARS:
+                yield "".join(block)
+                block, size = [], 0
+        if block:
+            yield "".join(block)
+
+
+def iter_chunks(pieces, text_splitter, split_chars: int = STREAM_SPLIT_CHARS):
+    """
+    Split streamed text into chunks as it arrives.
+
+    Text is buffered until ``split_chars`` accumulate; every chunk except
+    the last is emitted and the last one is carried into the next round so
+    chunk boundaries and overlap match splitting the full text.
+
+    Args:
+        pieces: Iterable of text pieces (e.g. iter_document_text())
+        text_splitter: LangChain text splitter
+        split_chars: Buffered characters that trigger a split
+    """
+    buffer = ""
+    for piece in pieces:
+        buffer += piece
+        if len(buffer) < split_chars:
+            continue
+        chunks = text_splitter.split_text(buffer)
+        if not chunks:
+            buffer = ""
+            continue
+        yield from chunks[:-1]
+        buffer = chunks[-1]
+    if buffer.strip():
+        yield from text_splitter.split_text(buffer)
+
+
+def extract_chunks(path: str, filename: str):
+    """
+    Extract and chunk one file lazily.
+
+    Args:
+        path: File path on disk
+        filename: Original file name (used for the file type)
+
+    Yields:
+        Text chunks in document order
+    """
+    from ingestion import get_text_splitter
+
+    yield from iter_chunks(iter_document_text(path, filename), get_text_splitter())
+
+
+class SpooledChunks:
+    """
+    Chunks an extraction worker wrote to disk, one JSON string per line.
+
+    Iterating reads them back one at a time, so the server never holds a
+    whole document's chunks; close() deletes the file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __iter__(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+
+    def close(self):
+        with suppress(FileNotFoundError):
+            os.remove(self.path)
+
+
+def _run_extraction(extract, path: str, filename: str, out_path: str):
+    """Extraction worker process: spool ``extract``'s chunks to ``out_path``, errors to ``out_path.error``."""
+    try:
+        with open(out_path, "w", encoding="utf-8") as out:
+            for chunk in extract(path, filename):
+                out.write(json.dumps(chunk) + "\n")
+    except Exception as e:
+        with open(out_path + ".error", "w", encoding="utf-8") as f:
+            f.write(str(e) or type(e).__name__)
+        sys.exit(1)
+
+
+def _extraction_slots() -> asyncio.Semaphore:
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(EXTRACT_WORKERS)
+    return _slots
+
+
+def _stop(process):
+    if process.is_alive():
+        process.terminate()
+    process.join()
+
+
+async def _extract_one(path: str, filename: str, timeout: float, extract):
+    # The timeout starts when this file gets a worker, not while it waits for one
+    async with _extraction_slots():
+        fd, out_path = tempfile.mkstemp(suffix=".chunks")
+        os.close(fd)
+        # spawn: forking the server process would copy its threads' locks
+        process = multiprocessing.get_context("spawn").Process(
+            target=_run_extraction, args=(extract, path, filename, out_path), daemon=True
+        )
+        process.start()
+        _processes.add(process)
+        try:
+            await asyncio.to_thread(process.join, timeout)
+            if process.is_alive():
+                # Only this file's worker is stopped; other files keep parsing
+                await asyncio.to_thread(_stop, process)
+                error = f"extraction timed out after {timeout:g}s"
+            elif process.exitcode != 0:
+                try:
+                    with open(out_path + ".error", "r", encoding="utf-8") as f:
+                        error = f.read()
+                except FileNotFoundError:
+                    error = f"extraction worker crashed (exit code {process.exitcode})"
+            else:
+                return filename, SpooledChunks(out_path), None
+        except BaseException:
+            await asyncio.shield(asyncio.to_thread(_stop, process))
+            SpooledChunks(out_path).close()
+            raise
+        finally:
+            _processes.discard(process)
+            with suppress(FileNotFoundError):
+                os.remove(out_path + ".error")
+        SpooledChunks(out_path).close()
+        return filename, None, error
+
+
+def shutdown_extraction_pool():
+    """Stop running extraction workers (application shutdown)."""
+    for process in list(_processes):
+        process.terminate()
+
+
+async def extract_files(files: list, timeout: float = EXTRACT_TIMEOUT_SECONDS, extract=extract_chunks):
+    """
+    Extract and chunk files in parallel, yielding each as soon as it finishes.
+
+    Each file is parsed in its own worker process, at most EXTRACT_WORKERS
+    at a time. Its chunks are spooled to a temporary file rather than sent
+    back, so memory stays bounded however many large files finish before
+    they are ingested.
+
+    Args:
+        files: (path, filename) pairs
+        timeout: Per-file limit in seconds, counted from when the file's
+            worker starts; a file that exceeds it is reported as failed and
+            only its worker is terminated
+        extract: Top-level function (path, filename) -> iterable of chunks,
+            run in the worker
+
+    Yields:
+        (filename, chunks, error) tuples in completion order; ``chunks`` is
+        a SpooledChunks (iterate it, then close() it) or None when ``error``
+        is set
+    """
+    tasks = [asyncio.create_task(_extract_one(path, filename, timeout, extract)) for path, filename in files]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Chunks of files the caller never got to
+        for task in tasks:
+            if task.done() and not task.cancelled() and task.exception() is None:
+                _, chunks, _ = task.result()
+                if chunks is not None:
+                    chunks.close()
+
+
+__all__ = [
+    'is_supported',
+    'spool_upload',
+    'iter_document_text',
+    'iter_chunks',
+    'extract_chunks',
+    'SpooledChunks',
+    'extract_files',
+    'shutdown_extraction_pool',
+]
@@ -0,0 +1,99 @@
+"""
+Sindh Police AI Meeting Member - Embedding Cache
+SQLite cache of chunk embeddings keyed by content hash and model
+"""
+
+import os
+import sqlite3
+import hashlib
+from array import array
+from datetime import datetime, timezone
+
+from database import DATA_DIR
+
+EMBEDDINGS_DB_PATH = os.path.join(DATA_DIR, "embeddings.db")
+
+
+_schema_ready = False
+
+
+def get_connection():
+    global _schema_ready
+    conn = sqlite3.connect(EMBEDDINGS_DB_PATH)
+    conn.row_factory = sqlite3.Row
+    if not _schema_ready:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                cache_key    TEXT PRIMARY KEY,
+                model        TEXT NOT NULL,
+                dimensions   INTEGER NOT NULL,
+                vector       BLOB NOT NULL,
+                created_at   TEXT NOT NULL
+            );
+        """)
+        _schema_ready = True
+    return conn
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 of the full chunk text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def embedding_key(text: str, model: str) -> str:
+    """Cache key for a chunk embedded with a given model."""
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+def chunk_id_for(source: str, chunk_hash: str) -> str:
+    """Stable vector ID: unchanged chunks keep their ID when text is inserted elsewhere."""
+    return hashlib.md5(f"{source}:{chunk_hash}".encode()).hexdigest()
+
+
+def get_cached_embeddings(keys: list) -> dict:
+    """
+    Look up cached embeddings.
+
+    Args:
+        keys: Keys from embedding_key()
+
+    Returns:
+        Mapping of key -> embedding (list of floats) for the keys found
+    """
+    if not keys:
+        return {}
+    conn = get_connection()
+    found = {}
+    # Stay under SQLite's host parameter limit
+    for i in range(0, len(keys), 500):
+        batch = keys[i:i + 500]
+        rows = conn.execute(
+            f"SELECT cache_key, vector FROM embeddings WHERE cache_key IN ({','.join('?' * len(batch))})",
+            batch
+        ).fetchall()
+        for row in rows:
+            found[row["cache_key"]] = array("f", row["vector"]).tolist()
+    conn.close()
+    return found
+
+
+def put_cached_embeddings(items: list, model: str):
+    """
+    Store embeddings in the cache.
+
+    Args:
+        items: (key, embedding) pairs
+        model: Embedding model name
+    """
+    if not items:
+        return
+    now = datetime.now(timezone.utc).isoformat()
+    conn = get_connection()
+    conn.executemany(
+        "INSERT OR REPLACE INTO embeddings (cache_key, model, dimensions, vector, created_at) VALUES (?, ?, ?, ?, ?)",
+        [(key, model, len(vector), array("f", vector).tobytes(), now) for key, vector in items]
+    )
+    conn.commit()
+    conn.close()
+
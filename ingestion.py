@@ -0,0 +1,438 @@
+"""
+Sindh Police AI Meeting Member - Document Ingestion Engine
+Batched, concurrent embedding and vector index upserts shared by the
+upload endpoint and reset_and_ingest.py
+"""
+
+import os
+import random
+import hashlib
+import asyncio
+import itertools
+import threading
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+
+from embedding_cache import (
+    content_hash,
+    embedding_key,
+    chunk_id_for,
+    get_cached_embeddings,
+    put_cached_embeddings,
+)
+from retrieval_cache import invalidate_retrieval_cache
+from database import (
+    run_db,
+    get_document_chunks,
+    get_all_document_chunk_ids,
+    save_document,
+    remove_document_chunks,
+    delete_document_record,
+    lexical_chunk_ids,
+    lexical_index_chunks,
+    lexical_remove_chunks,
+)
+
+load_dotenv(override=True)
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBED_BATCH_TOKENS = int(os.getenv("EMBED_BATCH_TOKENS", 60000))
+EMBED_BATCH_MAX_INPUTS = int(os.getenv("EMBED_BATCH_MAX_INPUTS", 256))
+EMBED_MAX_CONCURRENCY = int(os.getenv("EMBED_MAX_CONCURRENCY", 4))
+EMBED_MAX_RETRIES = int(os.getenv("EMBED_MAX_RETRIES", 6))
+PINECONE_UPSERT_BATCH = 100  # Pinecone limit per upsert request
+PINECONE_DELETE_BATCH = 1000  # Pinecone limit per delete-by-ID request
+PINECONE_FETCH_BATCH = 100
+# "local" or "pinecone"; unset means Pinecone when PINECONE_API_KEY is configured
+VECTOR_BACKEND = (os.getenv("VECTOR_BACKEND") or ("pinecone" if os.getenv("PINECONE_API_KEY") else "local")).lower()
+if VECTOR_BACKEND not in ("local", "pinecone"):
+    raise ValueError(f"VECTOR_BACKEND must be 'local' or 'pinecone', not {VECTOR_BACKEND!r}")
+INGEST_STREAM_BATCH = int(os.getenv("INGEST_STREAM_BATCH", 512))
+
+
+def get_embeddings():
+    """Create the OpenAI embeddings client used for ingestion."""
+    from langchain_openai import OpenAIEmbeddings
+
+    return OpenAIEmbeddings(
+        model=EMBEDDING_MODEL,
+        openai_api_key=os.getenv("OPENAI_API_KEY")
+    )
+
+
+def get_text_splitter():
+    """Create the text splitter used for document chunks."""
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    return RecursiveCharacterTextSplitter(
+        chunk_size=1000,
+        chunk_overlap=200,
+        length_function=len
+    )
+
+
+_pinecone_index = None
+_pinecone_lock = threading.Lock()
+
+
+def get_pinecone_index():
+    """The configured Pinecone index, connected once per process and reused."""
+    global _pinecone_index
+    if _pinecone_index is None:
+        with _pinecone_lock:
+            if _pinecone_index is None:
+                api_key = os.getenv("PINECONE_API_KEY")
+                if not api_key:
+                    raise RuntimeError("VECTOR_BACKEND=pinecone but PINECONE_API_KEY is not set")
+                from pinecone import Pinecone
+
+                pc = Pinecone(api_key=api_key)
+                _pinecone_index = pc.Index(os.getenv("INDEX_NAME", "sindh-police-docs"))
+    return _pinecone_index
+
+
+def get_vector_index():
+    """The configured vector index: the in-process store (default) or Pinecone."""
+    if VECTOR_BACKEND == "pinecone":
+        return get_pinecone_index()
+    from vector_store import get_local_store
+
+    return get_local_store()
+
+
+async def persist_index(index):
+    """Apply buffered writes for backends that buffer them (the local store)."""
+    persist = getattr(index, "persist", None)
+    if persist:
+        await asyncio.to_thread(persist)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)."""
+    return (len(text) + 3) // 4
+
+
+def batch_by_tokens(texts: list, max_tokens: int = EMBED_BATCH_TOKENS,
+                    max_inputs: int = EMBED_BATCH_MAX_INPUTS) -> list:
+    """
+    Group texts into embedding batches under a token and input-count budget.
+
+    Args:
+        texts: Texts to embed
+        max_tokens: Estimated token budget per request
+        max_inputs: Maximum inputs per request
+
+    Returns:
+        List of (start, end) index ranges into ``texts``
+    """
+    batches = []
+    start = 0
+    tokens = 0
+    for i, text in enumerate(texts):
+        text_tokens = estimate_tokens(text)
+        if i > start and (tokens + text_tokens > max_tokens or i - start >= max_inputs):
+            batches.append((start, i))
+            start, tokens = i, 0
+        tokens += text_tokens
+    if start < len(texts):
+        batches.append((start, len(texts)))
+    return batches
+
+
+def _is_rate_limit(error: Exception) -> bool:
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429 or type(error).__name__ == "RateLimitError" or "rate limit" in str(error).lower()
+
+
+async def _embed_batch(embeddings, texts: list, semaphore: asyncio.Semaphore) -> list:
+    """Embed one batch off the event loop, retrying rate limits with exponential backoff."""
+    async with semaphore:
+        for attempt in range(EMBED_MAX_RETRIES + 1):
+            try:
+                return await asyncio.to_thread(embeddings.embed_documents, texts)
+            except Exception as e:
+                if not _is_rate_limit(e) or attempt == EMBED_MAX_RETRIES:
+                    raise
+                delay = min(60, 2 ** attempt) + random.uniform(0, 1)
+                print(f"⏳ Embedding rate limited, retrying in {delay:.1f}s ({attempt + 1}/{EMBED_MAX_RETRIES})")
+                await asyncio.sleep(delay)
+
+
+async def embed_texts(texts: list, embeddings=None, max_concurrency: int = EMBED_MAX_CONCURRENCY) -> list:
+    """
+    Embed texts with batched embed_documents calls running concurrently.
+
+    Args:
+        texts: Texts to embed
+        embeddings: Optional embeddings client (defaults to get_embeddings())
+        max_concurrency: Maximum embedding requests in flight
+
+    Returns:
+        Embedding vectors in the same order as ``texts``
+    """
+    if not texts:
+        return []
+    embeddings = embeddings or get_embeddings()
+    semaphore = asyncio.Semaphore(max_concurrency)
+    ranges = batch_by_tokens(texts)
+    results = await asyncio.gather(*(
+        _embed_batch(embeddings, texts[start:end], semaphore) for start, end in ranges
+    ))
+    return [vector for batch in results for vector in batch]
+
+
+async def embed_texts_cached(texts: list, embeddings=None) -> list:
+    """
+    Embed texts, reusing cached embeddings keyed by content hash and model.
+
+    Args:
+        texts: Texts to embed
+        embeddings: Optional embeddings client
+
+    Returns:
+        Embedding vectors in the same order as ``texts``
+    """
+    embeddings = embeddings or get_embeddings()
+    model = getattr(embeddings, "model", EMBEDDING_MODEL)
+    keys = [embedding_key(text, model) for text in texts]
+    cached = await asyncio.to_thread(get_cached_embeddings, keys)
+
+    missing = [i for i, key in enumerate(keys) if key not in cached]
+    if missing:
+        fresh = await embed_texts([texts[i] for i in missing], embeddings)
+        new_items = [(keys[i], vector) for i, vector in zip(missing, fresh)]
+        await asyncio.to_thread(put_cached_embeddings, new_items, model)
+        cached.update(new_items)
+
+    return [cached[key] for key in keys]
+
+
+async def upsert_vectors(index, vectors: list, batch_size: int = PINECONE_UPSERT_BATCH):
+    """Upsert vectors to the vector index in batches, off the event loop."""
+    for i in range(0, len(vectors), batch_size):
+        await asyncio.to_thread(index.upsert, vectors=vectors[i:i + batch_size])
+
+
+async def delete_vectors(index, ids: list, batch_size: int = PINECONE_DELETE_BATCH):
+    """Delete vectors from the vector index by ID in batches, off the event loop."""
+    for i in range(0, len(ids), batch_size):
+        await asyncio.to_thread(index.delete, ids=ids[i:i + batch_size])
+
+
+def _take(iterator, count: int) -> list:
+    """Pull up to ``count`` items from an iterator (run in a worker thread)."""
+    return list(itertools.islice(iterator, count))
+
+
+async def ingest_chunks(index, source: str, chunks, uploaded_by: str, embeddings=None,
+                        batch_size: int = INGEST_STREAM_BATCH) -> dict:
+    """
+    Sync a document's chunks to the vector index incrementally.
+
+    Chunk IDs are derived from the document name and the full chunk text
+    and recorded in the ``documents`` registry (database.py),
+    so only chunks that are new since the last ingestion are embedded
+    (cache misses only) and upserted, and only chunks that disappeared are
+    deleted.
+
+    The same chunks are added to the BM25 lexical index (``chunk_fts``)
+    used by hybrid retrieval.
+
+    ``chunks`` may be a lazy iterator (see document_extraction.iter_chunks);
+    it is consumed ``batch_size`` chunks at a time in a worker thread, and
+    each batch is embedded and upserted before the next one is extracted,
+    so only chunk IDs are kept for the whole document.
+
+    Args:
+        index: Vector index (see get_vector_index)
+        source: Document name (stored as the ``source`` metadata field)
+        chunks: Text chunks in document order (list or iterator)
+        uploaded_by: Username recorded in metadata
+        embeddings: Optional embeddings client
+        batch_size: Chunks extracted and embedded per round
+
+    Returns:
+        Counts of chunks, upserted, deleted and unchanged vectors
+    """
+    previous = await run_db(get_document_chunks, source)
+    if not previous:
+        # Unknown to the registry: clear vectors written under the old positional IDs
+        try:
+            await asyncio.to_thread(index.delete, filter={"source": source})
+        except Exception as e:
+            print(f"⚠️ Could not clear legacy vectors for {source}: {e}")
+
+    # Chunks already in the BM25 index (may lag the registry for documents ingested before it existed)
+    lexical_ids = await run_db(lexical_chunk_ids, source)
+
+    chunk_iter = iter(chunks)
+    uploaded_at = datetime.now(timezone.utc).isoformat()
+    current = {}
+    document_hash = hashlib.sha256()
+    position = 0
+    upserted = 0
+
+    while True:
+        batch = await asyncio.to_thread(_take, chunk_iter, batch_size)
+        if not batch:
+            break
+
+        new_items = []
+        lexical_rows = []
+        for chunk in batch:
+            i = position
+            position += 1
+            if not chunk.strip():
+                continue
+            chunk_hash = content_hash(chunk)
+            document_hash.update(chunk_hash.encode())
+            chunk_id = chunk_id_for(source, chunk_hash)
+            if chunk_id in current:
+                continue
+            current[chunk_id] = chunk_hash
+            if chunk_id not in previous:
+                new_items.append((chunk_id, i, chunk))
+            if chunk_id not in lexical_ids:
+                lexical_rows.append((chunk_id, source, i, chunk))
+
+        if lexical_rows:
+            await run_db(lexical_index_chunks, lexical_rows)
+        if not new_items:
+            continue
+
+        values = await embed_texts_cached([chunk for _, _, chunk in new_items], embeddings)
+        vectors = [
+            {
+                "id": chunk_id,
+                "values": vector,
+                "metadata": {
+                    "text": chunk,
+                    "source": source,
+                    "chunk_index": i,
+                    "uploaded_at": uploaded_at,
+                    "uploaded_by": uploaded_by
+                }
+            }
+            for (chunk_id, i, chunk), vector in zip(new_items, values)
+        ]
+        await upsert_vectors(index, vectors)
+        upserted += len(vectors)
+
+    stale_ids = [chunk_id for chunk_id in previous if chunk_id not in current]
+    await delete_vectors(index, stale_ids)
+    await persist_index(index)
+    stale_lexical = [chunk_id for chunk_id in lexical_ids if chunk_id not in current]
+    if stale_lexical:
+        await run_db(lexical_remove_chunks, stale_lexical)
+    if current:
+        await run_db(save_document, source, current, document_hash.hexdigest(), uploaded_by)
+    else:
+        await run_db(delete_document_record, source)
+    if upserted or stale_ids or stale_lexical or not previous:
+        await run_db(invalidate_retrieval_cache)
+
+    return {
+        "chunks": len(current),
+        "upserted": upserted,
+        "deleted": len(stale_ids),
+        "unchanged": len(current) - upserted,
+    }
+
+
+def ingest_chunks_sync(index, source: str, chunks, uploaded_by: str, embeddings=None) -> dict:
+    """Blocking wrapper around ingest_chunks for scripts."""
+    return asyncio.run(ingest_chunks(index, source, chunks, uploaded_by, embeddings))
+
+
+async def delete_document_vectors(index, source: str) -> int:
+    """
+    Delete a document's vectors and its registry entry.
+
+    Args:
+        index: Vector index (see get_vector_index)
+        source: Document name
+
+    Returns:
+        Number of vectors deleted (0 when the document was not registered
+        and had to be deleted by metadata filter)
+    """
+    chunk_ids = list(await run_db(get_document_chunks, source))
+    if chunk_ids:
+        await delete_vectors(index, chunk_ids)
+    else:
+        await asyncio.to_thread(index.delete, filter={"source": source})
+    await persist_index(index)
+    await run_db(delete_document_record, source)
+    await run_db(invalidate_retrieval_cache)
+    return len(chunk_ids)
+
+
+def _list_index_ids(index):
+    """All vector IDs in the index, or None if listing is unsupported (pod-based indexes)."""
+    try:
+        return {vector_id for page in index.list() for vector_id in page}
+    except Exception as e:
+        print(f"⚠️ Index ID listing unavailable: {e}")
+        return None
+
+
+async def reconcile_documents(index, prune: bool = False) -> dict:
+    """
+    Compare the document registry with the vector index.
+
+    Args:
+        index: Vector index (see get_vector_index)
+        prune: Drop registered IDs missing from the index and delete
+            indexed vectors no document owns
+
+    Returns:
+        Missing IDs per document and orphaned vector IDs (None when the
+        index cannot list its IDs)
+    """
+    registered = await run_db(get_all_document_chunk_ids)
+    ids = list(registered)
+
+    present = set()
+    for i in range(0, len(ids), PINECONE_FETCH_BATCH):
+        response = await asyncio.to_thread(index.fetch, ids=ids[i:i + PINECONE_FETCH_BATCH])
+        present.update(response.vectors.keys())
+
+    missing = {}
+    for chunk_id, source in registered.items():
+        if chunk_id not in present:
+            missing.setdefault(source, []).append(chunk_id)
+
+    index_ids = await asyncio.to_thread(_list_index_ids, index)
+    orphaned = None if index_ids is None else sorted(index_ids - set(registered))
+
+    if prune:
+        for source, chunk_ids in missing.items():
+            await run_db(remove_document_chunks, source, chunk_ids)
+        if orphaned:
+            await delete_vectors(index, orphaned)
+            await persist_index(index)
+        if missing or orphaned:
+            await run_db(invalidate_retrieval_cache)
+
+    return {
+        "registered_vectors": len(registered),
+        "missing": missing,
+        "orphaned": orphaned,
+        "pruned": prune,
+    }
+
+
+__all__ = [
+    'get_embeddings',
+    'get_text_splitter',
+    'get_pinecone_index',
+    'get_vector_index',
+    'persist_index',
+    'batch_by_tokens',
+    'embed_texts',
+    'embed_texts_cached',
+    'ingest_chunks',
+    'ingest_chunks_sync',
+    'delete_document_vectors',
+    'reconcile_documents',
+]
@@ -21,19 +21,38 @@ import io
 import hashlib
 import re
 from fastapi import FastAPI, WebSocket, Request, HTTPException, Body, UploadFile, File
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.websockets import WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from datetime import datetime as dt, timedelta, timezone
+from datetime import date, datetime as dt, timedelta, timezone
 from typing import List
 import jwt
 from dotenv import load_dotenv
 from pydub import AudioSegment
-import audioop
 from contextlib import suppress
 
+from audio_codec import G711Transcoder
+from recording import WavRecordingSink, run_retention_sweeper, CALL_RECORD, RECORDING_SWEEP_INTERVAL_SECONDS
+from utils import make_filenames, is_valid_call_id
+
 from prompts import function_call_tools, build_system_message
-from database import init_db, save_meeting_minutes, get_all_meetings, get_meeting_minutes as db_get_meeting_minutes
+from database import (
+    init_db, run_db, shutdown_db_executor,
+    get_meetings_page, count_meetings, get_all_documents, get_meeting_minutes as db_get_meeting_minutes,
+    get_transcript_page, meeting_exists,
+)
+from content_cache import content_key, notes_cache, docx_cache
+from ingestion import get_embeddings, get_vector_index, ingest_chunks, delete_document_vectors, reconcile_documents
+from document_extraction import is_supported, spool_upload, extract_files, shutdown_extraction_pool
+from retrieval import HYBRID_ALPHA, RAG_TOP_K_MAX
+from retrieval_cache import retrieval_cache
+from motion_prep import start_motion_prep, get_motion_context
+from meeting_registry import meeting_registry, MeetingLimitError, LiveMeeting
+from state_store import get_state_store, prune_ended_meetings, STATE_BACKEND
+from minutes_writer import minutes_writer, recover_active_meetings
+from meeting_notes import (
+    start_notes_job, get_notes_job, prune_notes_jobs, start_rolling_summarizer, stop_rolling_summarizer
+)
 from tools import (
     start_meeting_session,
     end_meeting_session,
@@ -42,10 +61,11 @@ from tools import (
     get_meeting_status,
     get_vote_history,
     add_transcript_entry,
+    TranscriptAccumulator,
     get_transcript,
-    request_regulatory_context,
-    meeting_sessions,
-    vote_history
+    get_meeting_session,
+    get_state_counts,
+    request_regulatory_context
 )
 
 load_dotenv(override=True)
@@ -53,6 +73,8 @@ load_dotenv(override=True)
 # --- Configuration ---
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 PORT = int(os.getenv("PORT", 8000))
+# More than one worker needs state shared between processes (STATE_BACKEND=sqlite)
+WORKERS = int(os.getenv("WORKERS", 1))
 
 VOICE = 'sage'
 
@@ -62,7 +84,21 @@ LOG_EVENT_TYPES = [
 ]
 
 SHOW_TIMING_MATH = False
-call_recordings = {}
+
+# Regulatory context loaded into the system prompt when a call starts
+SESSION_CONTEXT_QUERY = "Sindh Police operational policies, procedures and standing orders"
+SESSION_CONTEXT_TIMEOUT_SECONDS = float(os.getenv("SESSION_CONTEXT_TIMEOUT_SECONDS", 2.0))
+
+# Meeting history page size for /api/meetings (default and largest allowed)
+MEETINGS_PAGE_SIZE = int(os.getenv("MEETINGS_PAGE_SIZE", 50))
+MEETINGS_PAGE_SIZE_MAX = int(os.getenv("MEETINGS_PAGE_SIZE_MAX", 200))
+# Transcript rows read from the database per step of a streamed transcript
+TRANSCRIPT_STREAM_BATCH = int(os.getenv("TRANSCRIPT_STREAM_BATCH", 500))
+# Transcript entries returned with /api/meetings/{id}/minutes; the rest is read from /transcript
+MINUTES_TRANSCRIPT_PAGE = int(os.getenv("MINUTES_TRANSCRIPT_PAGE", 500))
+
+# Live meetings, transcripts, votes and voice call records (shared by all workers)
+state = get_state_store()
 
 app = FastAPI(
     title="Sindh Police AI Meeting Member",
@@ -115,17 +151,35 @@ USERS_DB = {
 from fastapi.staticfiles import StaticFiles
 app.mount("/client", StaticFiles(directory="static", html=True), name="client")
 
+async def run_state_sweeper(interval_seconds: int = RECORDING_SWEEP_INTERVAL_SECONDS):
+    """Periodically drop ended meetings and old notes jobs from the state store (STATE_RETENTION_SECONDS)"""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        meetings = await run_db(prune_ended_meetings, state)
+        jobs = await run_db(prune_notes_jobs, state)
+        if meetings or jobs:
+            print(f"🧹 Pruned {len(meetings)} ended meetings and {len(jobs)} notes jobs from the state store")
+
+
 @app.on_event("startup")
 async def startup_event():
     init_db()
+    minutes_writer.start()
+    for meeting_id in await run_db(recover_active_meetings, state):
+        start_rolling_summarizer(meeting_id)
+    asyncio.create_task(run_retention_sweeper(state))
+    asyncio.create_task(run_state_sweeper())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    shutdown_extraction_pool()
+    minutes_writer.stop()
+    shutdown_db_executor()
 
 CHANNELS = 1
 RATE = 8000
 
-# Meeting metadata storage
-meeting_metadata: dict[str, dict] = {}
-active_meeting_id: str = None
-
 
 @app.get("/", response_class=HTMLResponse)
 async def index_page():
@@ -201,11 +255,42 @@ async def login(credentials: dict = Body(...)):
 # MEETING MANAGEMENT ENDPOINTS
 # =============================================================================
 
+def new_meeting_id() -> str:
+    """Meeting ID that stays unique when several boards start in the same second"""
+    return f"MEETING-{dt.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6].upper()}"
+
+
+async def open_meeting(meeting_id: str, agenda: str, user_data: dict) -> dict:
+    """Start a meeting session and its rolling summarizer"""
+    # Archived minutes belong to their meeting; an ID is never started twice
+    if await run_db(meeting_exists, meeting_id):
+        raise HTTPException(status_code=409, detail=f"Meeting {meeting_id} already exists")
+    try:
+        # The limit is checked in the same state store transaction that creates the meeting
+        result = await run_db(start_meeting_session, meeting_id, agenda, user_data["username"],
+                              max_active=meeting_registry.max_meetings)
+    except MeetingLimitError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    if not result["success"]:
+        raise HTTPException(status_code=409, detail=result["error"])
+    result["meeting_id"] = meeting_id
+    start_rolling_summarizer(meeting_id)
+    return result
+
+
+async def get_live_meeting(meeting_id: str) -> LiveMeeting:
+    """Look up a live meeting named by the request, or raise 400/404"""
+    if not meeting_id:
+        raise HTTPException(status_code=400, detail="meeting_id is required")
+    meeting = await meeting_registry.get(meeting_id)
+    if not meeting:
+        raise HTTPException(status_code=404, detail=f"Meeting {meeting_id} is not active")
+    return meeting
+
+
 @app.post("/api/meeting/start")
 async def api_start_meeting(request: Request, payload: dict = Body(...)):
     """Start a new board meeting session"""
-    global active_meeting_id
-    
     token = get_token_from_request(request)
     user_data = verify_jwt_token(token)
     
@@ -213,174 +298,46 @@ async def api_start_meeting(request: Request, payload: dict = Body(...)):
     if user_data.get("role") not in ["secretary", "admin"]:
         raise HTTPException(status_code=403, detail="Only Secretary or Admin can start meetings")
     
-    meeting_id = payload.get("meeting_id", f"MEETING-{dt.now().strftime('%Y%m%d%H%M%S')}")
+    meeting_id = payload.get("meeting_id") or new_meeting_id()
     agenda = payload.get("agenda", "")
     
-    result = start_meeting_session(meeting_id, agenda)
-    active_meeting_id = meeting_id
-    
-    meeting_metadata[meeting_id] = {
-        "started_by": user_data["username"],
-        "agenda": agenda
-    }
-    
-    return result
+    return await open_meeting(meeting_id, agenda, user_data)
 
 
 @app.post("/api/meeting/end")
 async def api_end_meeting(request: Request, payload: dict = Body(...)):
-    """End the current board meeting session and automatically generate meeting notes"""
-    global active_meeting_id
-    
+    """End a board meeting session and start meeting notes generation in the background"""
     token = get_token_from_request(request)
     user_data = verify_jwt_token(token)
     
     if user_data.get("role") not in ["secretary", "admin"]:
         raise HTTPException(status_code=403, detail="Only Secretary or Admin can end meetings")
     
-    meeting_id = payload.get("meeting_id", active_meeting_id)
-    
-    if not meeting_id:
-        raise HTTPException(status_code=400, detail="No active meeting to end")
-    
-    result = end_meeting_session(meeting_id)
+    meeting = await get_live_meeting(payload.get("meeting_id"))
+    meeting_id = meeting.meeting_id
     
-    if meeting_id == active_meeting_id:
-        active_meeting_id = None
-    
-    # Automatically generate meeting notes
-    meeting_notes = None
-    try:
-        # Get transcript
-        transcript = get_transcript(meeting_id)
-        if transcript:
-            # Get meeting details
-            meeting_info = {}
-            if meeting_id in meeting_sessions:
-                meeting_info = meeting_sessions[meeting_id]
-            
-            # Format transcript for AI processing
-            transcript_text = ""
-            for entry in transcript:
-                speaker = entry.get("speaker", "Unknown")
-                text = entry.get("text", "")
-                timestamp = entry.get("timestamp", "")
-                transcript_text += f"[{timestamp}] {speaker}: {text}\n"
-            
-            # Get votes for context
-            votes = get_vote_history(meeting_id)
-            votes_text = ""
-            if votes:
-                votes_text = "\n\nVOTES CAST:\n"
-                for vote in votes:
-                    votes_text += f"- Motion: {vote.get('motion_description', 'N/A')}\n"
-                    votes_text += f"  Vote: {vote.get('vote', 'N/A')}\n"
-                    votes_text += f"  Reasoning: {vote.get('reasoning', 'N/A')}\n\n"
-            
-            # Generate meeting notes using OpenAI
-            import openai
-            client = openai.OpenAI(api_key=OPENAI_API_KEY)
-            
-            meeting_date = meeting_info.get("start_time", "")
-            if meeting_date:
-                try:
-                    from zoneinfo import ZoneInfo
-                    karachi_tz = ZoneInfo("Asia/Karachi")
-                    dt_obj = dt.fromisoformat(meeting_date.replace('Z', '+00:00'))
-                    dt_obj = dt_obj.astimezone(karachi_tz)
-                    meeting_date = dt_obj.strftime("%B %d, %Y at %I:%M %p")
-                except:
-                    pass
-            
-            notes_prompt = f"""You are a professional meeting secretary for the Sindh Police Department Meeting.
-
-Generate comprehensive, well-formatted meeting notes from the following transcript.
-
-MEETING INFORMATION:
-- Meeting ID: {meeting_id}
-- Date: {meeting_date}
-- Status: {meeting_info.get('status', 'Unknown')}
-
-TRANSCRIPT:
-{transcript_text}
-
-{votes_text}
-
-Please generate professional meeting notes in the following format:
-
-# SINDH POLICE DEPARTMENT MEETING NOTES
-
-**Meeting ID:** {meeting_id}
-**Date:** {meeting_date}
-**Status:** {meeting_info.get('status', 'Unknown')}
-
-## Meeting Summary
-[Provide a concise 2-3 sentence summary of the meeting]
-
-## Discussion Points
-[Organize the discussion into clear topics/agenda items]
-
-## User Insights and Discussion Summary
-[Provide a comprehensive summary of the board members' (users') insights, perspectives, concerns, and key points raised during the discussion. Focus on:
-- Main concerns and viewpoints expressed by board members
-- Different perspectives or opinions shared
-- Important insights or observations made
-- Questions raised and clarifications sought
-- Areas of agreement or disagreement among members
-- Any suggestions or recommendations put forward by board members]
-
-## Key Decisions
-[List any decisions made during the meeting]
-
-## Votes Cast
-[Include all votes with motion, vote (FOR/AGAINST/ABSTAIN), and reasoning]
-
-## Action Items
-[Extract any action items or follow-ups mentioned]
-
-## Attendees
-[Based on speakers in transcript, list attendees]
-
-## Next Steps
-[Any next steps or future agenda items mentioned]
-
----
-
-*Generated automatically by Sindh Police AI Meeting Member System*
-
-Make the notes professional, clear, and well-organized. Use proper formatting with markdown."""
-            
-            notes_response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": "You are a professional meeting secretary. Generate clear, well-formatted meeting notes from transcripts."},
-                    {"role": "user", "content": notes_prompt}
-                ],
-                temperature=0.7,
-                max_tokens=2000
-            )
-            
-            meeting_notes = notes_response.choices[0].message.content.strip()
-            print(f"✅ Meeting notes generated for {meeting_id}")
-        else:
-            print(f"⚠️ No transcript found for {meeting_id}, skipping notes generation")
-    except Exception as e:
-        print(f"⚠️ Error generating meeting notes: {e}")
-        import traceback
-        traceback.print_exc()
-        # Don't fail the meeting end if notes generation fails
-        meeting_notes = None
+    async with meeting.lock:
+        if meeting.closed:
+            raise HTTPException(status_code=404, detail=f"Meeting {meeting_id} is not active")
+        result = await run_db(end_meeting_session, meeting_id)
+        if not result["success"]:
+            # Ended by another worker in the meantime
+            meeting_registry.close(meeting_id)
+            raise HTTPException(status_code=404, detail=result["error"])
+        stop_rolling_summarizer(meeting_id)
+        await meeting_registry.publish(meeting_id, {
+            "event": "meeting_ended",
+            "meeting_id": meeting_id,
+            "duration_minutes": result.get("duration_minutes", 0)
+        })
+        meeting_registry.close(meeting_id)
     
-    # Add meeting notes to result
-    if meeting_notes:
-        result["meeting_notes"] = meeting_notes
-        result["notes_generated"] = True
-    else:
-        result["notes_generated"] = False
+    # Meeting notes are generated by a background job; poll /api/meeting/notes/jobs/{job_id}
+    result["notes_generated"] = False
     
     # Add full meeting minutes data for the frontend popup
-    if meeting_id in meeting_sessions:
-        session = meeting_sessions[meeting_id]
+    session = await run_db(get_meeting_session, meeting_id)
+    if session:
         result["minutes"] = {
             "meeting_id": meeting_id,
             "start_time": session.get("start_time", ""),
@@ -391,33 +348,34 @@ Make the notes professional, clear, and well-organized. Use proper formatting wi
             "motions": session.get("motions", []),
         }
 
-        # Persist meeting minutes to database
-        try:
-            save_meeting_minutes(
-                meeting_id,
-                session,
-                meeting_notes=meeting_notes,
-                duration_minutes=result.get("duration_minutes", 0),
-            )
-        except Exception as e:
-            print(f"⚠️ Failed to save meeting minutes to DB: {e}")
+        # The job writes this worker's queued minutes, then reads the transcript
+        # and votes, in the background; votes and motions still queued on other
+        # workers update the meeting's totals when they land
+        job = await start_notes_job(meeting_id, session)
+        result["notes_job_id"] = job["job_id"]
+        result["notes_status"] = job["status"]
     
     return result
 
 
 @app.get("/api/meeting/status")
-async def api_meeting_status(request: Request):
-    """Get current meeting status"""
+async def api_meeting_status(request: Request, meeting_id: str = None):
+    """Get the status of a live meeting, or list the live meetings when no meeting_id is given"""
     token = get_token_from_request(request)
     verify_jwt_token(token)
     
-    if not active_meeting_id:
-        return {"active": False, "message": "No active meeting"}
+    if not meeting_id:
+        meetings = await meeting_registry.active_meetings()
+        return {"active": bool(meetings), "meetings": meetings}
+    
+    meeting = await meeting_registry.get(meeting_id)
+    if not meeting:
+        return {"active": False, "meeting_id": meeting_id, "message": "Meeting is not active"}
     
     return {
         "active": True,
-        "meeting_id": active_meeting_id,
-        **get_meeting_status(active_meeting_id)
+        **meeting.describe(),
+        **(await run_db(get_meeting_status, meeting_id))
     }
 
 
@@ -430,14 +388,22 @@ async def api_add_motion(request: Request, payload: dict = Body(...)):
     if user_data.get("role") not in ["secretary", "admin"]:
         raise HTTPException(status_code=403, detail="Only Secretary or Admin can add motions")
     
-    if not active_meeting_id:
-        raise HTTPException(status_code=400, detail="No active meeting")
+    meeting = await get_live_meeting(payload.get("meeting_id"))
     
     motion_text = payload.get("motion_text", "")
     if not motion_text:
         raise HTTPException(status_code=400, detail="Motion text is required")
     
-    result = add_motion(active_meeting_id, motion_text, user_data["username"])
+    async with meeting.lock:
+        if meeting.closed:
+            raise HTTPException(status_code=404, detail=f"Meeting {meeting.meeting_id} is not active")
+        result = await run_db(add_motion, meeting.meeting_id, motion_text, user_data["username"])
+    if not result["success"]:
+        raise HTTPException(status_code=404, detail=result["error"])
+    
+    # Retrieve the motion's regulatory context now so the vote doesn't wait for it
+    start_motion_prep(result["motion_record"])
+    await meeting_registry.publish(meeting.meeting_id, {"event": "motion_added", "motion": result["motion_record"]})
     return result
 
 
@@ -447,7 +413,7 @@ async def api_vote_history(request: Request, meeting_id: str = None):
     token = get_token_from_request(request)
     verify_jwt_token(token)
     
-    votes = get_vote_history(meeting_id)
+    votes = await run_db(get_vote_history, meeting_id)
     return {"votes": votes}
 
 
@@ -457,13 +423,13 @@ async def api_get_transcript(meeting_id: str, request: Request):
     token = get_token_from_request(request)
     verify_jwt_token(token)
     
-    transcript = get_transcript(meeting_id)
+    transcript = await run_db(get_transcript, meeting_id)
     return {"transcript": transcript}
 
 
 @app.post("/api/meeting/notes/generate")
-async def generate_meeting_notes(request: Request, payload: dict = Body(...)):
-    """Generate formatted meeting notes from transcript using AI"""
+async def api_generate_meeting_notes(request: Request, payload: dict = Body(...)):
+    """Start a background job that generates formatted meeting notes from the transcript"""
     token = get_token_from_request(request)
     user_data = verify_jwt_token(token)
     
@@ -474,133 +440,32 @@ async def generate_meeting_notes(request: Request, payload: dict = Body(...)):
     if not meeting_id:
         raise HTTPException(status_code=400, detail="meeting_id is required")
     
-    try:
-        import openai
-        
-        # Get transcript
-        transcript = get_transcript(meeting_id)
-        if not transcript:
-            raise HTTPException(status_code=404, detail="No transcript found for this meeting")
-        
-        # Get meeting details
-        meeting_info = {}
-        if meeting_id in meeting_sessions:
-            meeting_info = meeting_sessions[meeting_id]
-        
-        # Format transcript for AI processing
-        transcript_text = ""
-        for entry in transcript:
-            speaker = entry.get("speaker", "Unknown")
-            text = entry.get("text", "")
-            timestamp = entry.get("timestamp", "")
-            transcript_text += f"[{timestamp}] {speaker}: {text}\n"
-        
-        # Get votes for context
-        votes = get_vote_history(meeting_id)
-        votes_text = ""
-        if votes:
-            votes_text = "\n\nVOTES CAST:\n"
-            for vote in votes:
-                votes_text += f"- Motion: {vote.get('motion_description', 'N/A')}\n"
-                votes_text += f"  Vote: {vote.get('vote', 'N/A')}\n"
-                votes_text += f"  Reasoning: {vote.get('reasoning', 'N/A')}\n\n"
-        
-        # Generate meeting notes using OpenAI
-        client = openai.OpenAI(api_key=OPENAI_API_KEY)
-        
-        meeting_date = meeting_info.get("start_time", "")
-        if meeting_date:
-            try:
-                from zoneinfo import ZoneInfo
-                karachi_tz = ZoneInfo("Asia/Karachi")
-                dt_obj = dt.fromisoformat(meeting_date.replace('Z', '+00:00'))
-                dt_obj = dt_obj.astimezone(karachi_tz)
-                meeting_date = dt_obj.strftime("%B %d, %Y at %I:%M %p")
-            except:
-                pass
-        
-        notes_prompt = f"""You are a professional meeting secretary for the Sindh Police Department Meeting.
-
-Generate comprehensive, well-formatted meeting notes from the following transcript.
-
-MEETING INFORMATION:
-- Meeting ID: {meeting_id}
-- Date: {meeting_date}
-- Status: {meeting_info.get('status', 'Unknown')}
-
-TRANSCRIPT:
-{transcript_text}
-
-{votes_text}
-
-Please generate professional meeting notes in the following format:
-
-# SINDH POLICE DEPARTMENT MEETING NOTES
-
-**Meeting ID:** {meeting_id}
-**Date:** {meeting_date}
-**Status:** {meeting_info.get('status', 'Unknown')}
-
-## Meeting Summary
-[Provide a concise 2-3 sentence summary of the meeting]
-
-## Discussion Points
-[Organize the discussion into clear topics/agenda items]
-
-## User Insights and Discussion Summary
-[Provide a comprehensive summary of the board members' (users') insights, perspectives, concerns, and key points raised during the discussion. Focus on:
-- Main concerns and viewpoints expressed by board members
-- Different perspectives or opinions shared
-- Important insights or observations made
-- Questions raised and clarifications sought
-- Areas of agreement or disagreement among members
-- Any suggestions or recommendations put forward by board members]
-
-## Key Decisions
-[List any decisions made during the meeting]
-
-## Votes Cast
-[Include all votes with motion, vote (FOR/AGAINST/ABSTAIN), and reasoning]
-
-## Action Items
-[Extract any action items or follow-ups mentioned]
-
-## Attendees
-[Based on speakers in transcript, list attendees]
-
-## Next Steps
-[Any next steps or future agenda items mentioned]
-
----
+    transcript = await run_db(get_transcript, meeting_id)
+    if not transcript:
+        raise HTTPException(status_code=404, detail="No transcript found for this meeting")
+    
+    meeting_info = await run_db(get_meeting_session, meeting_id) or {}
+    votes = await run_db(get_vote_history, meeting_id)
+    job = await start_notes_job(meeting_id, meeting_info, transcript, votes)
+    
+    return {
+        "success": True,
+        "meeting_id": meeting_id,
+        "job_id": job["job_id"],
+        "status": job["status"]
+    }
 
-*Generated automatically by Sindh Police AI Meeting Member System*
 
-Make the notes professional, clear, and well-organized. Use proper formatting with markdown."""
-        
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are a professional meeting secretary. Generate clear, well-formatted meeting notes from transcripts."},
-                {"role": "user", "content": notes_prompt}
-            ],
-            temperature=0.7,
-            max_tokens=2000
-        )
-        
-        meeting_notes = response.choices[0].message.content.strip()
-        
-        return {
-            "success": True,
-            "meeting_id": meeting_id,
-            "notes": meeting_notes,
-            "generated_at": dt.now(timezone.utc).isoformat()
-        }
-        
-    except Exception as e:
-        print(f"❌ Meeting notes generation error: {e}")
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Failed to generate meeting notes: {str(e)}")
+@app.get("/api/meeting/notes/jobs/{job_id}")
+async def api_get_notes_job(job_id: str, request: Request):
+    """Poll a meeting notes generation job"""
+    token = get_token_from_request(request)
+    verify_jwt_token(token)
+    
+    job = await get_notes_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Notes job not found")
+    return job
 
 
 @app.post("/api/meeting/notes/download-docx")
@@ -656,71 +521,19 @@ async def download_meeting_notes_docx(request: Request):
         raise HTTPException(status_code=400, detail=f"Invalid request: {str(e)}")
     
     try:
-        from docx import Document
-        from docx.shared import Pt, RGBColor, Inches
-        from docx.enum.text import WD_ALIGN_PARAGRAPH
-        import re
-        from io import BytesIO
-        
-        # Create a new Document
-        doc = Document()
-        
-        # Set default font
-        style = doc.styles['Normal']
-        font = style.font
-        font.name = 'Calibri'
-        font.size = Pt(11)
-        
-        # Parse markdown and convert to DOCX
-        lines = notes.split('\n')
-        i = 0
-        
-        while i < len(lines):
-            line = lines[i].strip()
-            
-            # Handle headers
-            if line.startswith('# '):
-                # H1
-                p = doc.add_heading(line[2:].strip(), level=1)
-                p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            elif line.startswith('## '):
-                # H2
-                doc.add_heading(line[3:].strip(), level=2)
-            elif line.startswith('### '):
-                # H3
-                doc.add_heading(line[4:].strip(), level=3)
-            elif line.startswith('**') and line.endswith('**'):
-                # Bold text (metadata)
-                text = line.replace('**', '')
-                p = doc.add_paragraph()
-                run = p.add_run(text)
-                run.bold = True
-            elif line.startswith('- '):
-                # Bullet point
-                doc.add_paragraph(line[2:].strip(), style='List Bullet')
-            elif line.startswith('---'):
-                # Horizontal rule
-                doc.add_paragraph('_' * 50)
-            elif line.strip():
-                # Regular paragraph
-                # Handle inline markdown (bold, italic)
-                paragraph = doc.add_paragraph()
-                add_formatted_text(paragraph, line)
-            else:
-                # Empty line
-                doc.add_paragraph()
-            
-            i += 1
-        
-        # Save to BytesIO
-        docx_buffer = BytesIO()
-        doc.save(docx_buffer)
-        docx_buffer.seek(0)
-        
         from fastapi.responses import Response
         
+        # Same notes text always renders to the same document
+        cache_key = content_key(notes, DOCX_RENDER_VERSION)
+        docx_bytes = await run_db(docx_cache.get, cache_key)
+        if docx_bytes is None:
+            docx_bytes = await asyncio.to_thread(render_notes_docx, notes)
+            await run_db(docx_cache.put, cache_key, docx_bytes)
+        else:
+            print(f"♻️ Serving cached DOCX for meeting: {meeting_id}")
+        
         return Response(
-            content=docx_buffer.getvalue(),
+            content=docx_bytes,
             media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
             headers={
                 "Content-Disposition": f'attachment; filename="meeting-notes-{meeting_id}.docx"'
@@ -739,6 +552,73 @@ async def download_meeting_notes_docx(request: Request):
         raise HTTPException(status_code=500, detail=f"Failed to convert notes to DOCX: {str(e)}")
 
 
+# Bump when render_notes_docx output changes so cached documents are not reused
+DOCX_RENDER_VERSION = "1"
+
+
+def render_notes_docx(notes: str) -> bytes:
+    """Render meeting notes markdown as a DOCX document"""
+    from docx import Document
+    from docx.shared import Pt
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from io import BytesIO
+    
+    # Create a new Document
+    doc = Document()
+    
+    # Set default font
+    style = doc.styles['Normal']
+    font = style.font
+    font.name = 'Calibri'
+    font.size = Pt(11)
+    
+    # Parse markdown and convert to DOCX
+    lines = notes.split('\n')
+    i = 0
+    
+    while i < len(lines):
+        line = lines[i].strip()
+        
+        # Handle headers
+        if line.startswith('# '):
+            # H1
+            p = doc.add_heading(line[2:].strip(), level=1)
+            p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        elif line.startswith('## '):
+            # H2
+            doc.add_heading(line[3:].strip(), level=2)
+        elif line.startswith('### '):
+            # H3
+            doc.add_heading(line[4:].strip(), level=3)
+        elif line.startswith('**') and line.endswith('**'):
+            # Bold text (metadata)
+            text = line.replace('**', '')
+            p = doc.add_paragraph()
+            run = p.add_run(text)
+            run.bold = True
+        elif line.startswith('- '):
+            # Bullet point
+            doc.add_paragraph(line[2:].strip(), style='List Bullet')
+        elif line.startswith('---'):
+            # Horizontal rule
+            doc.add_paragraph('_' * 50)
+        elif line.strip():
+            # Regular paragraph
+            # Handle inline markdown (bold, italic)
+            paragraph = doc.add_paragraph()
+            add_formatted_text(paragraph, line)
+        else:
+            # Empty line
+            doc.add_paragraph()
+        
+        i += 1
+    
+    # Save to BytesIO
+    docx_buffer = BytesIO()
+    doc.save(docx_buffer)
+    return docx_buffer.getvalue()
+
+
 def add_formatted_text(paragraph, text):
     """Add text with markdown formatting to a paragraph"""
     # Simple markdown parsing for bold and italic
@@ -769,7 +649,18 @@ async def api_query_context(request: Request, payload: dict = Body(...)):
     if not query:
         raise HTTPException(status_code=400, detail="Query is required")
     
-    result = request_regulatory_context(query)
+    try:
+        top_k = int(payload.get("top_k", 5))
+        # Hybrid weight: 1 = vector only, 0 = BM25 only
+        alpha = float(payload.get("alpha", HYBRID_ALPHA))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="top_k must be an integer and alpha a number")
+    if not 1 <= top_k <= RAG_TOP_K_MAX:
+        raise HTTPException(status_code=400, detail=f"top_k must be between 1 and {RAG_TOP_K_MAX}")
+    if not 0 <= alpha <= 1:
+        raise HTTPException(status_code=400, detail="alpha must be between 0 and 1")
+    
+    result = await request_regulatory_context(query, top_k=top_k, source=payload.get("source"), alpha=alpha)
     return result
 
 
@@ -786,7 +677,8 @@ async def store_transcript_entry(request: Request, payload: dict = Body(...)):
     if not all([meeting_id, speaker, text]):
         raise HTTPException(status_code=400, detail="meeting_id, speaker, and text are required")
     
-    result = add_transcript_entry(meeting_id, speaker, text)
+    result = await run_db(add_transcript_entry, meeting_id, speaker, text)
+    await meeting_registry.publish(meeting_id, {"event": "transcript_entry", **result["entry"]})
     return result
 
 
@@ -805,30 +697,34 @@ async def store_transcript_entry(request: Request, payload: dict = Body(...)):
 @app.post("/start-browser-call")
 async def start_browser_call(request: Request, payload: dict = Body(...)):
     """Start a browser-based voice session for the meeting"""
-    global active_meeting_id
-    
     token = get_token_from_request(request)
     user_data = verify_jwt_token(token)
     
     if user_data.get("role") not in ["secretary", "admin"]:
         raise HTTPException(status_code=403, detail="Only Secretary or Admin can start voice sessions")
     
-    meeting_id = payload.get("meeting_id", active_meeting_id)
+    meeting_id = payload.get("meeting_id")
     
     if not meeting_id:
-        # Auto-start a meeting if none exists
-        meeting_id = f"MEETING-{dt.now().strftime('%Y%m%d%H%M%S')}"
-        start_meeting_session(meeting_id)
-        active_meeting_id = meeting_id
+        # Auto-start a meeting if the client didn't name one
+        meeting_id = new_meeting_id()
+        await open_meeting(meeting_id, "", user_data)
     
-    call_id = str(uuid.uuid4())
-    call_recordings[call_id] = {"incoming": [], "outgoing": [], "start_time": time.time()}
+    meeting = await get_live_meeting(meeting_id)
+    if len(meeting.voice_sessions) >= meeting_registry.max_voice_sessions:
+        raise HTTPException(status_code=429, detail=f"Meeting {meeting_id} already has a voice session")
     
-    meeting_metadata[call_id] = {
+    call_id = str(uuid.uuid4())
+    await run_db(state.put_record, CALL_RECORD, call_id, {
+        "start_time": time.time(),
+        "ended_at": None,
+        "live": False,
+        "incoming_path": None,
+        "outgoing_path": None,
         "meeting_id": meeting_id,
         "user": user_data["username"],
         "role": user_data["role"]
-    }
+    })
     
     print(f"🎙️ Voice session started for meeting: {meeting_id}")
     
@@ -857,17 +753,108 @@ async def media_stream_browser(websocket: WebSocket):
         session_initialized = False
         call_id = None
         meeting_id = None
+        meeting = None
+        # Negotiated in the "start" event; older clients keep base64-in-JSON media
+        binary_audio = False
+
+        # Call audio is streamed to WAV files once the "start" event names the call
+        user_sink = None
+        agent_sink = None
+        
+        # AI transcript deltas are stored once per response, not per delta
+        ai_turn = TranscriptAccumulator("Sindh Police AI")
+
+        # One transcoder per direction so their reusable buffers never alias
+        inbound_codec = G711Transcoder()
+        outbound_codec = G711Transcoder()
+
+        # Motions put to a vote run beside the audio loop, one at a time in arrival order
+        motion_tasks = set()
+        motion_lock = asyncio.Lock()
+
+        async def forward_user_audio(pcm_bytes: bytes):
+            if user_sink:
+                await user_sink.write(pcm_bytes)
+            
+            # Send audio to OpenAI
+            mulaw_bytes = inbound_codec.encode(pcm_bytes)
+            audio_append = {
+                "type": "input_audio_buffer.append",
+                "audio": base64.b64encode(mulaw_bytes).decode('utf-8')
+            }
+            await openai_ws.send(json.dumps(audio_append))
+
+        def motion_done(task: asyncio.Task):
+            motion_tasks.discard(task)
+            if not task.cancelled() and task.exception():
+                print(f"❌ Motion submission failed: {task.exception()!r}")
+
+        async def submit_motion(data: dict):
+            """Put motions to the AI one at a time; asyncio.Lock is FIFO, so they reach it in arrival order"""
+            async with motion_lock:
+                await send_motion(data)
+
+        async def send_motion(data: dict):
+            """Put a motion to the AI for a vote, with its pre-fetched regulatory context"""
+            motion_text = data.get("motion_text", "")
+            regulatory_context = data.get("regulatory_context", "")
+            draft_analysis = ""
+            
+            print(f"📋 Motion received for voting: {motion_text[:50]}...")
+            
+            # Use the context prepared when the motion was added (client-supplied context wins)
+            if not regulatory_context:
+                prepared = await get_motion_context(meeting_id, motion_text, data.get("motion_id"))
+                regulatory_context = prepared["regulatory_context"]
+                draft_analysis = prepared["draft_analysis"]
+            draft_section = f"\nPrepared Analysis:\n{draft_analysis}\n" if draft_analysis else ""
+            
+            # Send motion to AI as a text message for voting
+            motion_message = {
+                "type": "conversation.item.create",
+                "item": {
+                    "type": "message",
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "input_text",
+                            "text": f"""VOTING ITEM SUBMITTED:
+
+Motion: {motion_text}
 
-        user_pcm_buffer = io.BytesIO()
-        agent_pcm_buffer = io.BytesIO()
+Relevant Operational Context:
+{regulatory_context if regulatory_context else 'No specific context found.'}
+{draft_section}
+Please analyze this motion against Sindh Police policies and operational realities and cast your vote using the cast_vote function. Provide your vote (FOR/AGAINST/ABSTAIN), reasoning, policy reference, and risk assessment."""
+                        }
+                    ]
+                }
+            }
+            await openai_ws.send(json.dumps(motion_message))
+            await openai_ws.send(json.dumps({"type": "response.create"}))
 
         async def receive_from_browser():
-            nonlocal session_initialized, call_id, meeting_id
+            nonlocal session_initialized, call_id, meeting_id, meeting, binary_audio, user_sink, agent_sink
             
-            async for msg in websocket.iter_text():
-                data = json.loads(msg)
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+
+                # Binary frames carry raw 16-bit PCM (binary audio protocol)
+                if message.get("bytes") is not None:
+                    if session_initialized:
+                        await forward_user_audio(message["bytes"])
+                    continue
+
+                data = json.loads(message["text"])
 
                 if data.get("event") == "start":
+                    if session_initialized or user_sink:
+                        # The recordings and registry entries belong to the first start
+                        print(f"⚠️ Ignoring repeated start event for call {call_id}")
+                        continue
+
                     # Verify JWT token
                     token = data["start"]["customParameters"].get("token")
                     if not token:
@@ -884,57 +871,82 @@ async def media_stream_browser(websocket: WebSocket):
                         return
                     
                     call_id = data["start"]["customParameters"].get("call_id")
-                    meeting_id = data["start"]["customParameters"].get("meeting_id", active_meeting_id)
+                    if call_id and not is_valid_call_id(call_id):
+                        print(f"⚠️ Rejected call ID {str(call_id)[:80]!r}, using a generated one")
+                        call_id = None
+                    # The meeting is named by the client (a proxy can route on the ?meeting_id= query
+                    # parameter) or by the call started for it
+                    meeting_id = (data["start"]["customParameters"].get("meeting_id")
+                                  or websocket.query_params.get("meeting_id")
+                                  or (await run_db(state.get_record, CALL_RECORD, call_id) or {}).get("meeting_id"))
+                    meeting = await meeting_registry.get(meeting_id)
+                    if not meeting:
+                        print(f"❌ Meeting not active: {meeting_id}")
+                        await websocket.close(code=1008, reason="Meeting is not active")
+                        return
+                    
+                    binary_audio = bool(data["start"].get("binaryAudio", False))
+                    
+                    if not call_id:
+                        call_id = str(uuid.uuid4())
+                    # Opening the recordings first refuses a call ID that was already used
+                    # before it touches that call's registry entry or record
+                    incoming_name, outgoing_name, _ = make_filenames(call_id)
+                    try:
+                        user_sink = await WavRecordingSink.create(incoming_name, sample_rate=RATE, channels=CHANNELS)
+                        agent_sink = await WavRecordingSink.create(outgoing_name, sample_rate=RATE, channels=CHANNELS)
+                    except FileExistsError:
+                        print(f"❌ Recording for call {call_id} already exists")
+                        if user_sink:
+                            await user_sink.discard()
+                            user_sink = None
+                        call_id = None
+                        await websocket.close(code=1008, reason="Call ID already used")
+                        return
+                    try:
+                        meeting_registry.attach_call(meeting, call_id)
+                        meeting_registry.subscribe(meeting, websocket, viewer=False)
+                    except MeetingLimitError as e:
+                        print(f"❌ {e}")
+                        meeting_registry.detach_call(meeting, call_id)
+                        meeting = None
+                        for sink in (user_sink, agent_sink):
+                            await sink.discard()
+                        user_sink = agent_sink = None
+                        await websocket.close(code=1013, reason=str(e))
+                        return
+                    call_record = (await run_db(state.get_record, CALL_RECORD, call_id)
+                                   or {"start_time": time.time(), "meeting_id": meeting_id})
+                    call_record.update({
+                        "live": True,
+                        "incoming_path": user_sink.path,
+                        "outgoing_path": agent_sink.path,
+                    })
+                    await run_db(state.put_record, CALL_RECORD, call_id, call_record)
                     
                     # Initialize OpenAI session with Sindh Police context
                     await initialize_session(openai_ws, call_id, meeting_id)
                     await send_initial_conversation_item(openai_ws)
                     session_initialized = True
+                    
+                    # Acknowledge the negotiated media format before any audio flows
+                    await websocket.send_json({
+                        "event": "started",
+                        "binaryAudio": binary_audio
+                    })
                     continue
 
+                # Legacy JSON media frames (clients without binaryAudio support)
                 if data.get("event") == "media" and session_initialized:
                     payload_b64 = data["media"]["payload"]
-                    pcm_bytes = base64.b64decode(payload_b64)
-                    user_pcm_buffer.write(pcm_bytes)
-                    
-                    # Send audio to OpenAI
-                    mulaw_bytes = audioop.lin2ulaw(pcm_bytes, 2)
-                    audio_append = {
-                        "type": "input_audio_buffer.append",
-                        "audio": base64.b64encode(mulaw_bytes).decode('utf-8')
-                    }
-                    await openai_ws.send(json.dumps(audio_append))
+                    await forward_user_audio(base64.b64decode(payload_b64))
 
                 # Handle motion submission for voting
                 if data.get("event") == "motion" and session_initialized:
-                    motion_text = data.get("motion_text", "")
-                    regulatory_context = data.get("regulatory_context", "")
-                    
-                    print(f"📋 Motion received for voting: {motion_text[:50]}...")
-                    
-                    # Send motion to AI as a text message for voting
-                    motion_message = {
-                        "type": "conversation.item.create",
-                        "item": {
-                            "type": "message",
-                            "role": "user",
-                            "content": [
-                                {
-                                    "type": "input_text",
-                                    "text": f"""VOTING ITEM SUBMITTED:
-
-Motion: {motion_text}
-
-Relevant Operational Context:
-{regulatory_context if regulatory_context else 'No specific context found.'}
-
-Please analyze this motion against Sindh Police policies and operational realities and cast your vote using the cast_vote function. Provide your vote (FOR/AGAINST/ABSTAIN), reasoning, policy reference, and risk assessment."""
-                                }
-                            ]
-                        }
-                    }
-                    await openai_ws.send(json.dumps(motion_message))
-                    await openai_ws.send(json.dumps({"type": "response.create"}))
+                    # Runs alongside the audio loop: waiting for context must not stall inbound audio
+                    task = asyncio.create_task(submit_motion(data))
+                    motion_tasks.add(task)
+                    task.add_done_callback(motion_done)
                     continue
 
                 if data.get("event") == "stop":
@@ -971,6 +983,7 @@ Please analyze this motion against Sindh Police policies and operational realiti
 
                 if rtype == 'input_audio_buffer.speech_started':
                     print("🎤 Speech detected - interruption")
+                    await run_db(ai_turn.flush, meeting_id)
                     await openai_ws.send(json.dumps({"type": "response.cancel"}))
                     await websocket.send_json({"event": "clear"})
                     # Reset tracking
@@ -987,6 +1000,7 @@ Please analyze this motion against Sindh Police policies and operational realiti
 
                 # Reset tracking when response starts
                 if rtype == "response.created":
+                    await run_db(ai_turn.flush, meeting_id)
                     current_response_text = ""
                     suppress_audio = False
                     # Also reset function call buffers
@@ -1009,15 +1023,14 @@ Please analyze this motion against Sindh Police policies and operational realiti
                     # Forward transcript to frontend only if not filtered
                     if transcript_delta and meeting_id and not suppress_audio:
                         print(f"🚀 SENDING to frontend: transcript event [Sindh Police AI]: {transcript_delta[:50]}")
-                        await websocket.send_json({
+                        await meeting_registry.publish(meeting_id, {
                             "event": "transcript",
                             "speaker": "Sindh Police AI",
                             "text": transcript_delta
                         })
                         print(f"✅ SENT to frontend successfully")
-                        # Store transcript entry in meeting session
-                        if meeting_id:
-                            add_transcript_entry(meeting_id, "Sindh Police AI", transcript_delta)
+                        # Accumulate for a single transcript entry per AI turn
+                        ai_turn.append(transcript_delta)
                 
                 # Handle user speech transcript from conversation items
                 # OpenAI Realtime API provides user transcripts through multiple events
@@ -1027,9 +1040,9 @@ Please analyze this motion against Sindh Police policies and operational realiti
                     user_transcript = response.get("transcript", "")
                     if user_transcript and meeting_id:
                         print(f"📝 User transcript (completed): {user_transcript[:100]}...")
-                        add_transcript_entry(meeting_id, "User", user_transcript)
+                        await run_db(add_transcript_entry, meeting_id, "User", user_transcript)
                         print(f"🚀 SENDING to frontend: transcript event [User]: {user_transcript[:50]}")
-                        await websocket.send_json({
+                        await meeting_registry.publish(meeting_id, {
                             "event": "transcript",
                             "speaker": "User",
                             "text": user_transcript
@@ -1043,7 +1056,7 @@ Please analyze this motion against Sindh Police policies and operational realiti
                         user_transcript_buffer += delta
                         # Optionally send incremental updates to frontend
                         if meeting_id:
-                            await websocket.send_json({
+                            await meeting_registry.publish(meeting_id, {
                                 "event": "transcript",
                                 "speaker": "User",
                                 "text": delta,
@@ -1058,8 +1071,8 @@ Please analyze this motion against Sindh Police policies and operational realiti
                     
                     if final_transcript and meeting_id:
                         print(f"📝 User transcript (done): {final_transcript[:100]}...")
-                        add_transcript_entry(meeting_id, "User", final_transcript)
-                        await websocket.send_json({
+                        await run_db(add_transcript_entry, meeting_id, "User", final_transcript)
+                        await meeting_registry.publish(meeting_id, {
                             "event": "transcript",
                             "speaker": "User",
                             "text": final_transcript
@@ -1081,8 +1094,8 @@ Please analyze this motion against Sindh Police policies and operational realiti
                                 transcript_text = content_item.get("transcript", "")
                                 if transcript_text and meeting_id:
                                     print(f"📝 User transcript (item.created): {transcript_text[:100]}...")
-                                    add_transcript_entry(meeting_id, "User", transcript_text)
-                                    await websocket.send_json({
+                                    await run_db(add_transcript_entry, meeting_id, "User", transcript_text)
+                                    await meeting_registry.publish(meeting_id, {
                                         "event": "transcript",
                                         "speaker": "User",
                                         "text": transcript_text
@@ -1093,8 +1106,8 @@ Please analyze this motion against Sindh Police policies and operational realiti
                                 # Only store if it's not a voting item (those are handled separately)
                                 if text_content and meeting_id and "VOTING ITEM SUBMITTED" not in text_content:
                                     print(f"📝 User text input: {text_content[:100]}...")
-                                    add_transcript_entry(meeting_id, "User", text_content)
-                                    await websocket.send_json({
+                                    await run_db(add_transcript_entry, meeting_id, "User", text_content)
+                                    await meeting_registry.publish(meeting_id, {
                                         "event": "transcript",
                                         "speaker": "User",
                                         "text": text_content
@@ -1105,8 +1118,9 @@ Please analyze this motion against Sindh Police policies and operational realiti
                     print("🎤 User speech committed to buffer - waiting for transcription...")
                     # The transcript will come through conversation.item events above
                 
-                # Reset tracking when response is done
+                # Store the AI turn and reset tracking when response is done
                 if rtype == "response.done":
+                    await run_db(ai_turn.flush, meeting_id)
                     current_response_text = ""
                     suppress_audio = False
 
@@ -1119,24 +1133,30 @@ Please analyze this motion against Sindh Police policies and operational realiti
                     mulaw_bytes = base64.b64decode(mulaw_b64)
 
                     try:
-                        pcm = audioop.ulaw2lin(mulaw_bytes, 2)
+                        pcm = bytes(outbound_codec.decode(mulaw_bytes))
                     except Exception:
                         pcm = mulaw_bytes
                     
-                    agent_pcm_buffer.write(pcm)
-                    pcm_b64 = base64.b64encode(pcm).decode('utf-8')
-
-                    out = {
-                        "event": "media",
-                        "media": {
-                            "payload": pcm_b64,
-                            "format": "raw_pcm",
-                            "sampleRate": 8000,
-                            "channels": 1,
-                            "bitDepth": 16
+                    if agent_sink:
+                        await agent_sink.write(pcm)
+                    
+                    if binary_audio:
+                        # Raw 8 kHz 16-bit mono PCM, no JSON/base64 round trip
+                        await websocket.send_bytes(pcm)
+                    else:
+                        pcm_b64 = base64.b64encode(pcm).decode('utf-8')
+
+                        out = {
+                            "event": "media",
+                            "media": {
+                                "payload": pcm_b64,
+                                "format": "raw_pcm",
+                                "sampleRate": 8000,
+                                "channels": 1,
+                                "bitDepth": 16
+                            }
                         }
-                    }
-                    await websocket.send_json(out)
+                        await websocket.send_json(out)
 
                 # Handle function call arguments (accumulate deltas)
                 if rtype == "response.function_call_arguments.delta":
@@ -1183,15 +1203,15 @@ Please analyze this motion against Sindh Police policies and operational realiti
                     # Log the result for debugging
                     print(f"📊 Function result for {func_name}: {json.dumps(result, indent=2)[:500]}")
                     
-                    # Send result back to frontend
+                    # Send result to everyone following the meeting
                     outgoing = {
                         "event": "function_result", 
                         "name": func_name,
                         "arguments": arguments_str,
                         "result": result
                     }
-                    await websocket.send_json(outgoing)
-                    print(f"📤 Sent function_result to frontend for {func_name}")
+                    await meeting_registry.publish(meeting_id, outgoing)
+                    print(f"📤 Sent function_result to meeting {meeting_id} for {func_name}")
                     
                     # Send function result back to OpenAI for continuation
                     function_output = {
@@ -1222,14 +1242,62 @@ Please analyze this motion against Sindh Police policies and operational realiti
         finally:
             if not send_task.done():
                 send_task.cancel()
+            for task in list(motion_tasks):
+                task.cancel()
+            await run_db(ai_turn.flush, meeting_id)
+            for sink in (user_sink, agent_sink):
+                if sink:
+                    with suppress(Exception):
+                        await sink.close()
+            if meeting:
+                meeting_registry.detach_call(meeting, call_id)
+                meeting_registry.unsubscribe(meeting, websocket)
+            if call_id:
+                await run_db(state.update_record, CALL_RECORD, call_id, live=False, ended_at=time.time())
             await websocket.close()
 
 
+@app.websocket("/ws/meeting/{meeting_id}")
+async def meeting_events(websocket: WebSocket, meeting_id: str, token: str = None):
+    """Read-only stream of one live meeting's transcript, motions and votes"""
+    await websocket.accept()
+    
+    try:
+        verify_jwt_token(token or "")
+    except HTTPException as e:
+        await websocket.close(code=1008, reason=e.detail)
+        return
+    
+    meeting = await meeting_registry.get(meeting_id)
+    if not meeting:
+        await websocket.close(code=1008, reason="Meeting is not active")
+        return
+    
+    try:
+        meeting_registry.subscribe(meeting, websocket)
+    except MeetingLimitError as e:
+        await websocket.close(code=1013, reason=str(e))
+        return
+    
+    try:
+        status = await run_db(get_meeting_status, meeting_id)
+        await websocket.send_json({"event": "subscribed", **status})
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+    except WebSocketDisconnect:
+        pass
+    finally:
+        meeting_registry.unsubscribe(meeting, websocket)
+
+
 async def handle_function_call(func_name: str, func_args: dict, meeting_id: str) -> dict:
     """Handle function calls from the AI"""
     
     if func_name == "cast_vote":
-        return cast_vote(
+        return await run_db(
+            cast_vote,
             meeting_id=meeting_id or "ADHOC",
             motion_description=func_args.get("motion_description", ""),
             vote=func_args.get("vote", "ABSTAIN"),
@@ -1247,13 +1315,18 @@ async def handle_function_call(func_name: str, func_args: dict, meeting_id: str)
         }
     
     elif func_name == "cite_regulation":
-        # RAG feature removed - return without context
+        document = func_args.get("document_name", "")
+        section = func_args.get("section", "")
+        relevance = func_args.get("relevance", "")
+        query = " ".join(part for part in (document, section, relevance) if part)
+        result = await request_regulatory_context(query, top_k=3)
         return {
             "success": True,
-            "document": func_args.get("document_name", ""),
-            "section": func_args.get("section", ""),
-            "relevance": func_args.get("relevance", ""),
-            "context": "RAG feature has been removed."
+            "document": document,
+            "section": section,
+            "relevance": relevance,
+            "context": result.get("context") or "No matching passage found in the knowledge base.",
+            "sources": result.get("sources", [])
         }
     
     return {"success": False, "error": f"Unknown function: {func_name}"}
@@ -1262,8 +1335,18 @@ async def handle_function_call(func_name: str, func_args: dict, meeting_id: str)
 async def initialize_session(openai_ws, call_id: str, meeting_id: str = None):
     """Initialize the OpenAI session with Sindh Police context"""
     
-    # RAG feature removed - no regulatory context retrieval
+    # Ground the session in the documents most relevant to the agenda; never hold up the call for it
+    meeting = await run_db(get_meeting_session, meeting_id, include_records=False) if meeting_id else None
+    agenda = (meeting or {}).get("agenda", "")
     regulatory_context = ""
+    try:
+        result = await asyncio.wait_for(
+            request_regulatory_context(agenda or SESSION_CONTEXT_QUERY, top_k=3),
+            timeout=SESSION_CONTEXT_TIMEOUT_SECONDS
+        )
+        regulatory_context = result.get("context", "")
+    except asyncio.TimeoutError:
+        print("⚠️ Session context retrieval timed out; starting without it")
     
     # Build system message with context
     system_message = build_system_message(
@@ -1333,7 +1416,7 @@ async def health_check():
     return {
         "status": "healthy",
         "service": "Sindh Police AI Meeting Member",
-        "active_meeting": active_meeting_id,
+        "active_meetings": len(await meeting_registry.active_meetings()),
         "timestamp": dt.now(timezone.utc).isoformat()
     }
 
@@ -1347,9 +1430,23 @@ async def system_status(request: Request):
     return {
         "status": "online",
         "ai_ready": True,
-        "active_meeting": active_meeting_id,
-        "total_meetings": len(meeting_sessions),
-        "total_votes": len(vote_history)
+        "active_meetings": await meeting_registry.active_meetings(),
+        **(await run_db(get_state_counts))
+    }
+
+
+@app.get("/api/admin/cache/stats")
+async def api_cache_stats(request: Request):
+    """Get hit/miss counters for the meeting notes, DOCX and retrieval caches (admin only)"""
+    token = get_token_from_request(request)
+    user_data = verify_jwt_token(token)
+    
+    if user_data.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    return {
+        "success": True,
+        "caches": [notes_cache.stats(), docx_cache.stats(), retrieval_cache.stats()]
     }
 
 
@@ -1357,9 +1454,6 @@ async def system_status(request: Request):
 # DOCUMENT MANAGEMENT ENDPOINTS
 # =============================================================================
 
-# In-memory document tracking (for listing purposes)
-uploaded_documents = []
-
 @app.get("/admin", response_class=HTMLResponse)
 async def admin_page():
     """Serve the Document Management page"""
@@ -1370,7 +1464,7 @@ async def admin_page():
 
 @app.post("/api/documents/upload")
 async def upload_documents(request: Request, files: List[UploadFile] = File(...)):
-    """Upload and process documents into Pinecone vector database"""
+    """Upload and process documents into the vector index"""
     token = get_token_from_request(request)
     user_data = verify_jwt_token(token)
     
@@ -1379,98 +1473,58 @@ async def upload_documents(request: Request, files: List[UploadFile] = File(...)
         raise HTTPException(status_code=403, detail="Admin or Secretary access required")
     
     try:
-        # Import document processing libraries
-        from pypdf import PdfReader
-        from docx import Document
-        from langchain_text_splitters import RecursiveCharacterTextSplitter
-        from langchain_openai import OpenAIEmbeddings
-        from pinecone import Pinecone
-        
         # Initialize
-        pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
-        index = pc.Index(os.getenv("INDEX_NAME", "sindh-police-docs"))
-        embeddings = OpenAIEmbeddings(
-            model="text-embedding-3-small",
-            openai_api_key=os.getenv("OPENAI_API_KEY")
-        )
-        
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
-            length_function=len
-        )
+        index = await asyncio.to_thread(get_vector_index)
+        embeddings = get_embeddings()
         
         total_chunks = 0
         processed_docs = []
-        
-        for file in files:
-            content = await file.read()
-            filename = file.filename
-            text = ""
-            
-            # Extract text based on file type
-            if filename.endswith('.pdf'):
-                pdf_reader = PdfReader(io.BytesIO(content))
-                for page in pdf_reader.pages:
-                    text += page.extract_text() or ""
-            elif filename.endswith('.docx'):
-                doc = Document(io.BytesIO(content))
-                for para in doc.paragraphs:
-                    text += para.text + "\n"
-            else:
-                continue
-            
-            if not text.strip():
-                continue
-            
-            # Split into chunks
-            chunks = text_splitter.split_text(text)
+        failed_docs = []
+        spooled = []
+        try:
+            for file in files:
+                if is_supported(file.filename):
+                    spooled.append((await spool_upload(file), file.filename))
             
-            # Generate embeddings and upsert to Pinecone
-            vectors = []
-            for i, chunk in enumerate(chunks):
-                # Create unique ID
-                chunk_id = hashlib.md5(f"{filename}_{i}_{chunk[:50]}".encode()).hexdigest()
+            # Files are extracted/chunked in parallel worker processes; each one is
+            # embedded and upserted as soon as its chunks are ready
+            async for filename, chunks, error in extract_files(spooled):
+                if error:
+                    print(f"❌ Failed to extract {filename}: {error}")
+                    failed_docs.append({"name": filename, "error": error})
+                    continue
                 
-                # Generate embedding
-                embedding = embeddings.embed_query(chunk)
+                # Incremental sync: only new chunks are embedded/upserted, removed chunks deleted
+                try:
+                    sync = await ingest_chunks(index, filename, chunks, user_data["username"], embeddings)
+                finally:
+                    chunks.close()
+                if not sync["chunks"]:
+                    continue
                 
-                vectors.append({
-                    "id": chunk_id,
-                    "values": embedding,
-                    "metadata": {
-                        "text": chunk,
-                        "source": filename,
-                        "chunk_index": i,
-                        "uploaded_at": dt.now(timezone.utc).isoformat(),
-                        "uploaded_by": user_data["username"]
-                    }
-                })
-            
-            # Batch upsert (Pinecone limit is 100)
-            for i in range(0, len(vectors), 100):
-                batch = vectors[i:i+100]
-                index.upsert(vectors=batch)
-            
-            total_chunks += len(chunks)
-            
-            # Track document
-            doc_info = {
-                "name": filename,
-                "chunks": len(chunks),
-                "uploaded_at": dt.now().strftime("%Y-%m-%d %H:%M"),
-                "uploaded_by": user_data["username"]
-            }
-            processed_docs.append(doc_info)
-            uploaded_documents.append(doc_info)
-            
-            print(f"✅ Processed {filename}: {len(chunks)} chunks")
+                total_chunks += sync["chunks"]
+                
+                # Track document
+                doc_info = {
+                    "name": filename,
+                    "chunks": sync["chunks"],
+                    "uploaded_at": dt.now().strftime("%Y-%m-%d %H:%M"),
+                    "uploaded_by": user_data["username"]
+                }
+                processed_docs.append(doc_info)
+                
+                print(f"✅ Processed {filename}: {sync['chunks']} chunks "
+                      f"({sync['upserted']} new, {sync['deleted']} removed, {sync['unchanged']} unchanged)")
+        finally:
+            for path, _ in spooled:
+                os.remove(path)
         
         return {
             "success": True,
             "documents_processed": len(processed_docs),
             "chunks_created": total_chunks,
-            "documents": processed_docs
+            "documents": processed_docs,
+            "failed": failed_docs
         }
         
     except Exception as e:
@@ -1480,114 +1534,54 @@ async def upload_documents(request: Request, files: List[UploadFile] = File(...)
 
 @app.get("/api/documents/list")
 async def list_documents(request: Request):
-    """List all documents in the knowledge base by querying Pinecone directly"""
-    global uploaded_documents
-    
+    """List all documents in the knowledge base from the local document registry"""
     token = get_token_from_request(request)
     user_data = verify_jwt_token(token)
     
     if user_data.get("role") not in ["secretary", "admin"]:
         raise HTTPException(status_code=403, detail="Admin or Secretary access required")
     
+    documents = await run_db(get_all_documents)
+    documents_list = [{
+        "name": doc["name"],
+        "chunks": doc["chunk_count"],
+        "content_hash": doc["content_hash"],
+        "uploaded_at": doc["uploaded_at"][:16].replace("T", " "),
+        "uploaded_by": doc["uploaded_by"] or "Unknown"
+    } for doc in documents]
+    
+    return {
+        "success": True,
+        "total_documents": len(documents_list),
+        "total_chunks": sum(doc["chunks"] for doc in documents_list),
+        "documents": documents_list
+    }
+
+
+@app.post("/api/admin/documents/reconcile")
+async def reconcile_document_registry(request: Request, prune: bool = False):
+    """Compare the document registry against the vector index (admin only)"""
+    token = get_token_from_request(request)
+    user_data = verify_jwt_token(token)
+    
+    if user_data.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
     try:
-        from pinecone import Pinecone
-        
-        pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
-        index = pc.Index(os.getenv("INDEX_NAME", "sindh-police-docs"))
-        
-        # Get index stats
-        stats = index.describe_index_stats()
-        total_vectors = stats.total_vector_count
-        
-        # Query Pinecone to discover unique documents from metadata
-        document_map = {}
-        
-        if total_vectors > 0:
-            try:
-                embedding_dim = 1536  # text-embedding-3-small dimension
-                dummy_vector = [0.0] * embedding_dim
-                
-                # Sample vectors to discover unique document sources
-                sample_size = min(1000, total_vectors)
-                query_result = index.query(
-                    vector=dummy_vector,
-                    top_k=sample_size,
-                    include_metadata=True
-                )
-                
-                # Extract unique document sources from metadata
-                unique_sources = set()
-                for match in query_result.matches:
-                    metadata = match.metadata or {}
-                    source = metadata.get("source")
-                    if source:
-                        unique_sources.add(source)
-                
-                # For each unique document, get accurate chunk count and metadata
-                for doc_name in unique_sources:
-                    try:
-                        # Query with filter to count chunks for this document
-                        count_query = index.query(
-                            vector=dummy_vector,
-                            top_k=10000,  # Max allowed by Pinecone
-                            filter={"source": doc_name},
-                            include_metadata=True
-                        )
-                        
-                        if count_query.matches:
-                            chunk_count = len(count_query.matches)
-                            # Get metadata from first match
-                            first_match = count_query.matches[0]
-                            metadata = first_match.metadata or {}
-                            
-                            document_map[doc_name] = {
-                                "name": doc_name,
-                                "chunks": chunk_count,
-                                "uploaded_at": metadata.get("uploaded_at", "Unknown"),
-                                "uploaded_by": metadata.get("uploaded_by", "Unknown")
-                            }
-                    except Exception as e:
-                        print(f"⚠️ Error querying for {doc_name}: {e}")
-            except Exception as e:
-                print(f"⚠️ Error querying Pinecone: {e}")
-        
-        # Convert to list and sort by name
-        documents_list = list(document_map.values())
-        documents_list.sort(key=lambda x: x["name"])
-        
-        # Also update the in-memory list for consistency
-        uploaded_documents = documents_list
-        
-        return {
-            "success": True,
-            "total_documents": len(documents_list),
-            "total_chunks": total_vectors,
-            "documents": documents_list
-        }
-        
+        index = await asyncio.to_thread(get_vector_index)
+        report = await reconcile_documents(index, prune=prune)
+        missing = sum(len(ids) for ids in report["missing"].values())
+        print(f"🔍 Registry reconciliation: {missing} missing, "
+              f"{len(report['orphaned'] or [])} orphaned vectors (prune={prune})")
+        return {"success": True, **report}
     except Exception as e:
-        print(f"❌ Document list error: {e}")
-        import traceback
-        traceback.print_exc()
-        # Fallback to in-memory list
-        return {
-            "success": True,
-            "total_documents": len(uploaded_documents),
-            "total_chunks": 0,
-            "documents": [{
-                "name": doc["name"],
-                "chunks": doc.get("chunks", 0),
-                "uploaded_at": doc.get("uploaded_at", "Unknown"),
-                "uploaded_by": doc.get("uploaded_by", "Unknown")
-            } for doc in uploaded_documents]
-        }
+        print(f"❌ Registry reconciliation error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.delete("/api/documents/delete/{document_name:path}")
 async def delete_document(document_name: str, request: Request):
-    """Delete all chunks for a specific document from Pinecone"""
-    global uploaded_documents
-    
+    """Delete all chunks for a specific document from the vector index"""
     token = get_token_from_request(request)
     user_data = verify_jwt_token(token)
     
@@ -1595,22 +1589,10 @@ async def delete_document(document_name: str, request: Request):
         raise HTTPException(status_code=403, detail="Admin or Secretary access required")
     
     try:
-        from pinecone import Pinecone
-        
-        pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
-        index = pc.Index(os.getenv("INDEX_NAME", "sindh-police-docs"))
-        
-        # Get chunk count before deletion for reporting
-        doc_info = next((doc for doc in uploaded_documents if doc["name"] == document_name), None)
-        chunk_count = doc_info.get("chunks", 0) if doc_info else 0
-        
-        # Delete all vectors with this source using metadata filter
-        index.delete(
-            filter={"source": document_name}
-        )
+        index = await asyncio.to_thread(get_vector_index)
         
-        # Remove from uploaded_documents list
-        uploaded_documents = [doc for doc in uploaded_documents if doc["name"] != document_name]
+        # Delete by the vector IDs recorded in the registry, then drop the registry entry
+        chunk_count = await delete_document_vectors(index, document_name)
         
         print(f"🗑️ Deleted document '{document_name}': {chunk_count} chunks removed")
         
@@ -1642,7 +1624,7 @@ async def vote_from_recording(request: Request, audio: UploadFile = File(...)):
     """
     Process a voice recording:
     1. Transcribe using OpenAI Whisper
-    2. Get regulatory context from Pinecone
+    2. Get regulatory context from the vector index
     3. Analyze and cast vote using OpenAI
     """
     token = get_token_from_request(request)
@@ -1729,7 +1711,11 @@ async def vote_from_recording(request: Request, audio: UploadFile = File(...)):
         if not transcription:
             raise HTTPException(status_code=400, detail="Could not transcribe audio")
         
-        # Step 2: Analyze and vote using OpenAI (RAG feature removed)
+        # Step 2: Retrieve regulatory context for the motion
+        context_result = await request_regulatory_context(transcription, top_k=3)
+        regulatory_context = context_result.get("context", "")
+        
+        # Step 3: Analyze and vote using OpenAI
         print("🤖 Analyzing motion and casting vote...")
         
         analysis_prompt = f"""You are the Sindh Police AI Meeting Member. Analyze the following motion/proposal and cast your vote.
@@ -1737,6 +1723,9 @@ async def vote_from_recording(request: Request, audio: UploadFile = File(...)):
 MOTION/PROPOSAL (transcribed from voice recording):
 {transcription}
 
+RELEVANT POLICY CONTEXT:
+{regulatory_context if regulatory_context else 'No specific context found.'}
+
 Based on Sindh Police policies and operational realities, cast your vote on this motion.
 
 You must respond in the following JSON format ONLY (no other text):
@@ -1781,7 +1770,8 @@ Respond with valid JSON only."""
         
         # Store the vote
         from tools import cast_vote as store_vote
-        store_vote(
+        await run_db(
+            store_vote,
             meeting_id="RECORDING-" + dt.now().strftime('%Y%m%d%H%M%S'),
             motion_description=transcription[:200],
             vote=vote_data.get("vote", "ABSTAIN"),
@@ -1794,7 +1784,7 @@ Respond with valid JSON only."""
             "success": True,
             "transcription": transcription,
             "vote": vote_data,
-            "regulatory_context_used": True
+            "regulatory_context_used": bool(regulatory_context)
         }
         
     except json.JSONDecodeError as e:
@@ -1815,25 +1805,117 @@ async def meetings_page():
         return f.read()
 
 
+def meeting_history_filters(status: str = None, date_from: str = None, date_to: str = None,
+                            has_votes: bool = None) -> dict:
+    """Query parameters of the meeting history endpoints as get_meetings_page filters (dates are inclusive)"""
+    if status and status not in ("active", "ended"):
+        raise HTTPException(status_code=400, detail="status must be 'active' or 'ended'")
+    try:
+        created_from = date.fromisoformat(date_from).isoformat() if date_from else None
+        created_before = (date.fromisoformat(date_to) + timedelta(days=1)).isoformat() if date_to else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="date_from and date_to must be YYYY-MM-DD")
+    return {"status": status, "created_from": created_from, "created_before": created_before, "has_votes": has_votes}
+
+
+def encode_meetings_cursor(after: tuple) -> str:
+    return base64.urlsafe_b64encode(json.dumps(after).encode()).decode().rstrip("=") if after else None
+
+
+def decode_meetings_cursor(cursor: str) -> tuple:
+    try:
+        created_at, meeting_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return str(created_at), str(meeting_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @app.get("/api/meetings")
-async def api_list_meetings(request: Request):
+async def api_list_meetings(request: Request, limit: int = MEETINGS_PAGE_SIZE, cursor: str = None,
+                            status: str = None, date_from: str = None, date_to: str = None,
+                            has_votes: bool = None):
+    """One page of meeting history, newest first; pass next_cursor back as cursor for the next page"""
+    token = get_token_from_request(request)
+    verify_jwt_token(token)
+    filters = meeting_history_filters(status, date_from, date_to, has_votes)
+    after = decode_meetings_cursor(cursor) if cursor else None
+    limit = max(1, min(limit, MEETINGS_PAGE_SIZE_MAX))
+    meetings, next_after = await run_db(get_meetings_page, limit, after, **filters)
+    return {"meetings": meetings, "next_cursor": encode_meetings_cursor(next_after)}
+
+
+@app.get("/api/meetings/count")
+async def api_count_meetings(request: Request, status: str = None, date_from: str = None,
+                             date_to: str = None, has_votes: bool = None):
+    """Number of meetings matching the history filters"""
     token = get_token_from_request(request)
     verify_jwt_token(token)
-    return {"meetings": get_all_meetings()}
+    filters = meeting_history_filters(status, date_from, date_to, has_votes)
+    return {"count": await run_db(count_meetings, **filters)}
 
 
 @app.get("/api/meetings/{meeting_id}/minutes")
-async def api_get_minutes(meeting_id: str, request: Request):
+async def api_get_minutes(meeting_id: str, request: Request, transcript: bool = True):
+    """
+    Meeting minutes with the first MINUTES_TRANSCRIPT_PAGE transcript entries
+    (none with transcript=false), the transcript's size and speakers; stream
+    the rest from /transcript?after_id=transcript_next_after_id
+    """
     token = get_token_from_request(request)
     verify_jwt_token(token)
-    minutes = db_get_meeting_minutes(meeting_id)
+    limit = MINUTES_TRANSCRIPT_PAGE if transcript else 0
+    minutes = await run_db(db_get_meeting_minutes, meeting_id, transcript_limit=limit)
     if not minutes:
         raise HTTPException(status_code=404, detail="Meeting not found")
     return minutes
 
 
+async def stream_transcript(meeting_id: str, after_id: int, limit: int, **bounds):
+    """NDJSON lines of transcript entries, read TRANSCRIPT_STREAM_BATCH rows at a time"""
+    sent = 0
+    while limit is None or sent < limit:
+        batch_size = TRANSCRIPT_STREAM_BATCH if limit is None else min(TRANSCRIPT_STREAM_BATCH, limit - sent)
+        rows = await run_db(get_transcript_page, meeting_id, after_id, batch_size, **bounds)
+        if rows:
+            yield "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+            after_id = rows[-1]["id"]
+            sent += len(rows)
+        if len(rows) < batch_size:
+            break
+
+
+@app.get("/api/meetings/{meeting_id}/transcript")
+async def api_stream_transcript(meeting_id: str, request: Request, after_id: int = 0, before_id: int = None,
+                                since: str = None, until: str = None, limit: int = None):
+    """
+    Stream a meeting's transcript as NDJSON, one entry per line, in order.
+
+    Each entry carries its ``id``; resume with ``after_id`` set to the last
+    one received. ``before_id`` and ``since``/``until`` (ISO timestamps)
+    select a range, ``limit`` caps the number of entries.
+    """
+    token = get_token_from_request(request)
+    verify_jwt_token(token)
+    if not await run_db(meeting_exists, meeting_id):
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    if limit is not None and limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be positive")
+    return StreamingResponse(
+        stream_transcript(meeting_id, after_id, limit, before_id=before_id, since=since, until=until),
+        media_type="application/x-ndjson"
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
     print("🚀 Starting Sindh Police AI Meeting Member...")
     print(f"📍 Server running at http://localhost:{PORT}")
-    uvicorn.run(app, host="0.0.0.0", port=PORT)
+    if WORKERS > 1 and STATE_BACKEND != "sqlite":
+        print("⚠️ WORKERS > 1 needs STATE_BACKEND=sqlite; starting a single worker")
+    if WORKERS > 1 and STATE_BACKEND == "sqlite":
+        # Any worker serves HTTP for any meeting. Observers on /ws/meeting only see events
+        # from their own worker, so put a proxy routing WebSockets by meeting_id in front
+        # (separate instances) when observers are used
+        uvicorn.run("main:app", host="0.0.0.0", port=PORT, workers=WORKERS)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=PORT)
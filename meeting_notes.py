@@ -0,0 +1,616 @@
+"""
+Sindh Police AI Meeting Member - Meeting Notes Generation
+Builds the notes prompt and runs notes generation as background jobs
+"""
+
+import os
+import uuid
+import socket
+import asyncio
+import traceback
+from contextlib import suppress
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+from dotenv import load_dotenv
+from openai import AsyncOpenAI
+
+from database import update_meeting_notes, run_db
+from tools import get_meeting_session, update_meeting_session, get_transcript, get_vote_history
+from minutes_writer import minutes_writer
+from state_store import get_state_store, STATE_RETENTION_SECONDS
+from content_cache import content_key, notes_cache
+
+load_dotenv(override=True)
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+NOTES_MODEL = "gpt-4o"
+# Bump when the notes prompt/template changes so cached notes are not reused
+NOTES_PROMPT_VERSION = "2"
+NOTES_SYSTEM_PROMPT = "You are a professional meeting secretary. Generate clear, well-formatted meeting notes from transcripts."
+
+# Long transcripts are summarized in chunks (map) and the partial summaries
+# are folded into the notes template (reduce)
+SUMMARY_MODEL = os.getenv("NOTES_SUMMARY_MODEL", "gpt-4o-mini")
+NOTES_SINGLE_PASS_TOKENS = int(os.getenv("NOTES_SINGLE_PASS_TOKENS", 24000))
+NOTES_CHUNK_TOKENS = int(os.getenv("NOTES_CHUNK_TOKENS", 6000))
+NOTES_CHUNK_MINUTES = int(os.getenv("NOTES_CHUNK_MINUTES", 20))
+NOTES_MAX_PARALLEL = int(os.getenv("NOTES_MAX_PARALLEL", 4))
+SUMMARY_SYSTEM_PROMPT = "You are a professional meeting secretary. Summarize meeting transcript segments faithfully and concisely."
+
+# Rolling summary maintained while a meeting is live
+ROLLING_SUMMARY_EVERY_ENTRIES = int(os.getenv("ROLLING_SUMMARY_EVERY_ENTRIES", 40))
+ROLLING_SUMMARY_EVERY_MINUTES = float(os.getenv("ROLLING_SUMMARY_EVERY_MINUTES", 10))
+ROLLING_SUMMARY_POLL_SECONDS = 15
+# Only the worker holding a meeting's lease summarizes it; the lease is renewed
+# on every poll and must outlast the slowest summary update
+ROLLING_SUMMARY_LEASE_SECONDS = float(os.getenv("ROLLING_SUMMARY_LEASE_SECONDS", 180))
+SUMMARIZER_LEASE_RECORD = "summarizer_lease"
+# Identifies this worker process as a lease owner
+WORKER_ID = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+_client = None
+
+# Notes jobs running in this worker; their public records are kept in the
+# state store so any worker can answer a poll
+notes_jobs = {}
+NOTES_JOB_RECORD = "notes_job"
+
+# Rolling summarizer task per active meeting
+rolling_summary_tasks = {}
+
+
+def get_client() -> AsyncOpenAI:
+    """Lazily create the shared async OpenAI client."""
+    global _client
+    if _client is None:
+        _client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+    return _client
+
+
+def format_meeting_date(start_time: str) -> str:
+    """Format an ISO start time as a Karachi-local display date."""
+    if not start_time:
+        return ""
+    try:
+        dt_obj = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
+        dt_obj = dt_obj.astimezone(ZoneInfo("Asia/Karachi"))
+        return dt_obj.strftime("%B %d, %Y at %I:%M %p")
+    except ValueError:
+        return start_time
+
+
+def format_transcript(transcript: list) -> str:
+    """Render transcript entries as '[timestamp] speaker: text' lines."""
+    return "".join(
+        f"[{entry.get('timestamp', '')}] {entry.get('speaker', 'Unknown')}: {entry.get('text', '')}\n"
+        for entry in transcript
+    )
+
+
+def format_votes(votes: list) -> str:
+    """Render vote records for the notes prompt."""
+    if not votes:
+        return ""
+    votes_text = "\n\nVOTES CAST:\n"
+    for vote in votes:
+        votes_text += f"- Motion: {vote.get('motion', vote.get('motion_description', 'N/A'))}\n"
+        votes_text += f"  Vote: {vote.get('vote', 'N/A')}\n"
+        votes_text += f"  Reasoning: {vote.get('reasoning', 'N/A')}\n\n"
+    return votes_text
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for English/Urdu transcripts (~4 characters per token)."""
+    return (len(text) + 3) // 4
+
+
+def build_notes_prompt(meeting_id: str, meeting_info: dict, transcript_text: str, votes_text: str,
+                       summarized: bool = False) -> str:
+    """
+    Build the meeting notes prompt.
+
+    Args:
+        meeting_id: Meeting ID
+        meeting_info: Meeting session data (start_time, status, ...)
+        transcript_text: Formatted transcript, or partial summaries when ``summarized``
+        votes_text: Formatted votes
+        summarized: Whether transcript_text holds chronological segment summaries
+
+    Returns:
+        Prompt text for the notes completion
+    """
+    meeting_date = format_meeting_date(meeting_info.get("start_time", ""))
+    status = meeting_info.get('status', 'Unknown')
+    source = "chronological summaries of the meeting transcript" if summarized else "transcript"
+    heading = "TRANSCRIPT SUMMARIES" if summarized else "TRANSCRIPT"
+
+    return f"""You are a professional meeting secretary for the Sindh Police Department Meeting.
+
+Generate comprehensive, well-formatted meeting notes from the following {source}.
+
+MEETING INFORMATION:
+- Meeting ID: {meeting_id}
+- Date: {meeting_date}
+- Status: {status}
+
+{heading}:
+{transcript_text}
+
+{votes_text}
+
+Please generate professional meeting notes in the following format:
+
+# SINDH POLICE DEPARTMENT MEETING NOTES
+
+**Meeting ID:** {meeting_id}
+**Date:** {meeting_date}
+**Status:** {status}
+
+## Meeting Summary
+[Provide a concise 2-3 sentence summary of the meeting]
+
+## Discussion Points
+[Organize the discussion into clear topics/agenda items]
+
+## User Insights and Discussion Summary
+[Provide a comprehensive summary of the board members' (users') insights, perspectives, concerns, and key points raised during the discussion. Focus on:
+- Main concerns and viewpoints expressed by board members
+- Different perspectives or opinions shared
+- Important insights or observations made
+- Questions raised and clarifications sought
+- Areas of agreement or disagreement among members
+- Any suggestions or recommendations put forward by board members]
+
+## Key Decisions
+[List any decisions made during the meeting]
+
+## Votes Cast
+[Include all votes with motion, vote (FOR/AGAINST/ABSTAIN), and reasoning]
+
+## Action Items
+[Extract any action items or follow-ups mentioned]
+
+## Attendees
+[Based on speakers in transcript, list attendees]
+
+## Next Steps
+[Any next steps or future agenda items mentioned]
+
+---
+
+*Generated automatically by Sindh Police AI Meeting Member System*
+
+Make the notes professional, clear, and well-organized. Use proper formatting with markdown."""
+
+
+def _parse_timestamp(entry: dict):
+    try:
+        return datetime.fromisoformat(entry.get("timestamp", ""))
+    except (TypeError, ValueError):
+        return None
+
+
+def split_transcript(transcript: list, max_tokens: int = NOTES_CHUNK_TOKENS,
+                     window_minutes: int = NOTES_CHUNK_MINUTES) -> list:
+    """
+    Split transcript entries into consecutive chunks.
+
+    A chunk is closed when adding the next entry would exceed ``max_tokens``
+    or when the entry falls outside the chunk's ``window_minutes`` time window.
+
+    Args:
+        transcript: Transcript entries in chronological order
+        max_tokens: Token budget per chunk
+        window_minutes: Maximum time span of a chunk
+
+    Returns:
+        List of formatted transcript chunks
+    """
+    chunks = []
+    lines = []
+    tokens = 0
+    window_start = None
+
+    for entry in transcript:
+        line = format_transcript([entry])
+        line_tokens = estimate_tokens(line)
+        ts = _parse_timestamp(entry)
+        outside_window = (
+            ts is not None and window_start is not None
+            and (ts - window_start).total_seconds() > window_minutes * 60
+        )
+        if lines and (tokens + line_tokens > max_tokens or outside_window):
+            chunks.append("".join(lines))
+            lines, tokens, window_start = [], 0, None
+        if window_start is None:
+            window_start = ts
+        lines.append(line)
+        tokens += line_tokens
+
+    if lines:
+        chunks.append("".join(lines))
+    return chunks
+
+
+async def _summarize(text: str, instruction: str, semaphore: asyncio.Semaphore) -> str:
+    """Summarize one piece of text, bounded by the shared semaphore."""
+    async with semaphore:
+        response = await get_client().chat.completions.create(
+            model=SUMMARY_MODEL,
+            messages=[
+                {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+                {"role": "user", "content": f"{instruction}\n\n{text}"}
+            ],
+            temperature=0.3,
+            max_tokens=800
+        )
+    return response.choices[0].message.content.strip()
+
+
+async def summarize_transcript(transcript: list, max_parallel: int = NOTES_MAX_PARALLEL) -> str:
+    """
+    Map-reduce a long transcript into chronological partial summaries.
+
+    Chunks are summarized concurrently (at most ``max_parallel`` requests in
+    flight). If the combined summaries are still over the single-pass budget
+    they are summarized again in groups until they fit.
+
+    Args:
+        transcript: Transcript entries
+        max_parallel: Maximum concurrent summarization requests
+
+    Returns:
+        Partial summaries joined in chronological order
+    """
+    semaphore = asyncio.Semaphore(max_parallel)
+    chunks = split_transcript(transcript)
+    instruction = (
+        "Summarize this segment of a Sindh Police Department meeting transcript. "
+        "Keep speakers, concerns raised, decisions, votes, action items and any names, "
+        "numbers or policy references. Use concise bullet points."
+    )
+    summaries = await asyncio.gather(*(_summarize(chunk, instruction, semaphore) for chunk in chunks))
+
+    level = 1
+    combined = "\n\n".join(f"### Part {i + 1}\n{s}" for i, s in enumerate(summaries))
+    while estimate_tokens(combined) > NOTES_SINGLE_PASS_TOKENS and len(summaries) > 1:
+        level += 1
+        groups = []
+        group, group_tokens = [], 0
+        for summary in summaries:
+            summary_tokens = estimate_tokens(summary)
+            if group and group_tokens + summary_tokens > NOTES_CHUNK_TOKENS:
+                groups.append(group)
+                group, group_tokens = [], 0
+            group.append(summary)
+            group_tokens += summary_tokens
+        groups.append(group)
+        if len(groups) == len(summaries):
+            # Each summary already fills a group on its own; pair them up to make progress
+            groups = [summaries[i:i + 2] for i in range(0, len(summaries), 2)]
+        summaries = await asyncio.gather(*(
+            _summarize("\n\n".join(g), "Merge these consecutive meeting summaries into one, keeping all decisions, votes and action items.", semaphore)
+            for g in groups
+        ))
+        combined = "\n\n".join(f"### Part {i + 1}\n{s}" for i, s in enumerate(summaries))
+
+    print(f"🧩 Summarized transcript in {len(chunks)} chunks ({level} level(s))")
+    return combined
+
+
+async def generate_meeting_notes(meeting_id: str, meeting_info: dict, transcript: list, votes: list) -> str:
+    """
+    Generate meeting notes with the async OpenAI client.
+
+    When the live rolling summary is available only the transcript tail
+    after it is sent. Short transcripts go into the notes prompt directly;
+    longer ones are summarized chunk by chunk first.
+
+    Args:
+        meeting_id: Meeting ID
+        meeting_info: Meeting session data
+        transcript: Transcript entries
+        votes: Vote records
+
+    Returns:
+        Markdown meeting notes
+    """
+    # Entries already folded into the live rolling summary only need the summary
+    rolling_summary = meeting_info.get("rolling_summary", "")
+    summary_upto = meeting_info.get("summary_upto", 0) if rolling_summary else 0
+    tail = transcript[summary_upto:]
+
+    transcript_text = format_transcript(tail)
+    summarized = bool(rolling_summary) or estimate_tokens(transcript_text) > NOTES_SINGLE_PASS_TOKENS
+    if estimate_tokens(transcript_text) > NOTES_SINGLE_PASS_TOKENS:
+        transcript_text = await summarize_transcript(tail)
+    if rolling_summary:
+        transcript_text = (
+            f"### Summary of the meeting so far\n{rolling_summary}\n\n"
+            f"### Remainder of the meeting\n{transcript_text or '(no further discussion)'}"
+        )
+
+    notes_prompt = build_notes_prompt(
+        meeting_id, meeting_info, transcript_text, format_votes(votes), summarized=summarized
+    )
+    response = await get_client().chat.completions.create(
+        model=NOTES_MODEL,
+        messages=[
+            {"role": "system", "content": NOTES_SYSTEM_PROMPT},
+            {"role": "user", "content": notes_prompt}
+        ],
+        temperature=0.7,
+        max_tokens=2000
+    )
+    return response.choices[0].message.content.strip()
+
+
+def notes_cache_key(meeting_id: str, meeting_info: dict, transcript: list, votes: list) -> str:
+    """
+    Content hash of everything that determines the generated notes.
+
+    Args:
+        meeting_id: Meeting ID
+        meeting_info: Meeting session data
+        transcript: Transcript entries
+        votes: Vote records
+
+    Returns:
+        Cache key for notes_cache
+    """
+    return content_key(
+        meeting_id,
+        meeting_info.get("start_time", ""),
+        meeting_info.get("status", ""),
+        [(e.get("timestamp"), e.get("speaker"), e.get("text")) for e in transcript],
+        votes,
+        NOTES_PROMPT_VERSION,
+        NOTES_MODEL,
+    )
+
+
+def _public_job(job: dict) -> dict:
+    return {k: v for k, v in job.items() if not k.startswith("_")}
+
+
+async def _save_job(job: dict):
+    await run_db(get_state_store().put_record, NOTES_JOB_RECORD, job["job_id"], _public_job(job))
+
+
+async def _run_notes_job(job: dict, meeting_info: dict, transcript: list = None, votes: list = None):
+    """
+    Generate notes for a job (or reuse cached notes) and persist them to the meetings table.
+
+    Without a transcript the meeting just ended: this worker's queued minutes
+    are written first, then the transcript and votes are read.
+    """
+    job["status"] = "running"
+    await _save_job(job)
+    try:
+        if transcript is None:
+            if not await asyncio.to_thread(minutes_writer.flush):
+                raise RuntimeError("Meeting minutes are still being written; generate the notes again shortly")
+            transcript = await run_db(get_transcript, job["meeting_id"])
+            votes = await run_db(get_vote_history, job["meeting_id"])
+            if not transcript:
+                raise ValueError("No transcript found for this meeting")
+        cache_key = notes_cache_key(job["meeting_id"], meeting_info, transcript, votes)
+        cached = await run_db(notes_cache.get, cache_key)
+        if cached is not None:
+            notes = cached.decode("utf-8")
+            job["cached"] = True
+        else:
+            notes = await generate_meeting_notes(job["meeting_id"], meeting_info, transcript, votes)
+            await run_db(notes_cache.put, cache_key, notes.encode("utf-8"))
+            job["cached"] = False
+        await run_db(update_meeting_notes, job["meeting_id"], notes)
+        job["notes"] = notes
+        job["status"] = "completed"
+        print(f"✅ Meeting notes generated for {job['meeting_id']} (job {job['job_id']})")
+    except Exception as e:
+        job["status"] = "failed"
+        job["error"] = str(e)
+        print(f"⚠️ Error generating meeting notes: {e}")
+        traceback.print_exc()
+    finally:
+        job["completed_at"] = datetime.now(timezone.utc).isoformat()
+        try:
+            await _save_job(job)
+        finally:
+            # Polls are answered from the state store from here on
+            notes_jobs.pop(job["job_id"], None)
+
+
+async def update_rolling_summary(meeting_id: str) -> bool:
+    """
+    Fold transcript entries added since the last update into the meeting's
+    rolling summary.
+
+    Args:
+        meeting_id: Active meeting ID
+
+    Returns:
+        True if the summary was updated
+    """
+    session = await run_db(get_meeting_session, meeting_id, include_records=False)
+    if not session:
+        return False
+
+    upto = session.get("summary_upto", 0)
+    new_entries = await run_db(get_transcript, meeting_id, start=upto)
+    if not new_entries:
+        return False
+
+    new_text = format_transcript(new_entries)
+    if estimate_tokens(new_text) > NOTES_CHUNK_TOKENS:
+        new_text = await summarize_transcript(new_entries)
+
+    previous = session.get("rolling_summary", "")
+    instruction = (
+        "You maintain a running summary of a live Sindh Police Department meeting. "
+        "Update the summary below with the new transcript lines. Keep it chronological, keep every "
+        "decision, vote, action item, name, number and policy reference, and drop small talk. "
+        "Return only the updated summary as concise bullet points.\n\n"
+        f"CURRENT SUMMARY:\n{previous or '(empty - the meeting just started)'}\n\nNEW TRANSCRIPT:"
+    )
+    summary = await _summarize(new_text, instruction, asyncio.Semaphore(1))
+
+    await run_db(
+        update_meeting_session,
+        meeting_id,
+        rolling_summary=summary,
+        summary_upto=upto + len(new_entries),
+        summary_updated_at=datetime.now(ZoneInfo("Asia/Karachi")).isoformat()
+    )
+    print(f"🧾 Rolling summary updated for {meeting_id} ({upto + len(new_entries)} entries)")
+    return True
+
+
+async def _run_rolling_summarizer(meeting_id: str):
+    """
+    Update the rolling summary every N new entries or M minutes while the meeting is active.
+
+    Every worker that knows the meeting (e.g. all of them after recovering
+    it) runs this loop, but only the one holding the meeting's lease in the
+    state store summarizes; the others take over if it stops renewing it.
+    """
+    store = get_state_store()
+    try:
+        await _summarize_while_active(meeting_id, store)
+    finally:
+        with suppress(Exception):
+            await run_db(store.release_lease, SUMMARIZER_LEASE_RECORD, meeting_id, WORKER_ID)
+
+
+async def _summarize_while_active(meeting_id: str, store):
+    last_update = asyncio.get_running_loop().time()
+    while True:
+        await asyncio.sleep(ROLLING_SUMMARY_POLL_SECONDS)
+        session = await run_db(get_meeting_session, meeting_id, include_records=False)
+        if not session or session.get("status") != "active":
+            return
+        if not await run_db(store.acquire_lease, SUMMARIZER_LEASE_RECORD, meeting_id, WORKER_ID,
+                            ROLLING_SUMMARY_LEASE_SECONDS):
+            continue
+
+        pending = len(await run_db(get_transcript, meeting_id, start=session.get("summary_upto", 0)))
+        elapsed = asyncio.get_running_loop().time() - last_update
+        if pending >= ROLLING_SUMMARY_EVERY_ENTRIES or (
+            pending > 0 and elapsed >= ROLLING_SUMMARY_EVERY_MINUTES * 60
+        ):
+            try:
+                await update_rolling_summary(meeting_id)
+            except Exception as e:
+                print(f"⚠️ Rolling summary update failed for {meeting_id}: {e}")
+            last_update = asyncio.get_running_loop().time()
+
+
+def start_rolling_summarizer(meeting_id: str):
+    """Start the background rolling summarizer for a meeting (no-op if already running)."""
+    task = rolling_summary_tasks.get(meeting_id)
+    if task and not task.done():
+        return
+    rolling_summary_tasks[meeting_id] = asyncio.create_task(_run_rolling_summarizer(meeting_id))
+
+
+def stop_rolling_summarizer(meeting_id: str):
+    """Stop the rolling summarizer for a meeting."""
+    task = rolling_summary_tasks.pop(meeting_id, None)
+    if task and not task.done():
+        task.cancel()
+
+
+async def start_notes_job(meeting_id: str, meeting_info: dict, transcript: list = None,
+                          votes: list = None) -> dict:
+    """
+    Start notes generation in the background.
+
+    The transcript and votes are snapshotted so the job is not affected by
+    later changes to the live session. Without them (a meeting that just
+    ended) the job flushes the minutes writer and reads them itself, so the
+    caller doesn't wait.
+
+    Args:
+        meeting_id: Meeting ID
+        meeting_info: Meeting session data
+        transcript: Transcript entries, or None to read them in the job
+        votes: Vote records (read with the transcript when it is None)
+
+    Returns:
+        The job record (status "pending")
+    """
+    job = {
+        "job_id": str(uuid.uuid4()),
+        "meeting_id": meeting_id,
+        "status": "pending",
+        "notes": None,
+        "error": None,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "completed_at": None,
+    }
+    notes_jobs[job["job_id"]] = job
+    await _save_job(job)
+
+    info = {k: v for k, v in meeting_info.items() if k not in ("transcript", "votes", "motions")}
+    if transcript is not None:
+        transcript, votes = list(transcript), list(votes or [])
+    job["_task"] = asyncio.create_task(_run_notes_job(job, info, transcript, votes))
+    return job
+
+
+def prune_notes_jobs(store, max_age_seconds: int = STATE_RETENTION_SECONDS, now: datetime = None) -> list:
+    """
+    Remove notes job records older than the retention window from the state store.
+
+    Finished jobs age from when they completed; a job that never finished
+    (its worker stopped) ages from when it was created.
+
+    Args:
+        store: State store holding NOTES_JOB_RECORD records
+        max_age_seconds: Retention window
+        now: Current time (defaults to now, UTC)
+
+    Returns:
+        List of removed job IDs
+    """
+    cutoff = ((now or datetime.now(timezone.utc)).timestamp()) - max_age_seconds
+    stale = [
+        job_id for job_id, job in store.list_records(NOTES_JOB_RECORD).items()
+        if job_id not in notes_jobs
+        and datetime.fromisoformat(job.get("completed_at") or job["created_at"]).timestamp() < cutoff
+    ]
+    if stale:
+        store.delete_records(NOTES_JOB_RECORD, stale)
+    return stale
+
+
+async def get_notes_job(job_id: str) -> dict:
+    """
+    Get the public view of a notes job.
+
+    Args:
+        job_id: Job ID returned by start_notes_job
+
+    Returns:
+        Job record without internal fields, or None if unknown
+    """
+    job = notes_jobs.get(job_id)
+    if not job:
+        # Started by another worker
+        return await run_db(get_state_store().get_record, NOTES_JOB_RECORD, job_id)
+    return _public_job(job)
+
+
+__all__ = [
+    'estimate_tokens',
+    'split_transcript',
+    'summarize_transcript',
+    'build_notes_prompt',
+    'generate_meeting_notes',
+    'update_rolling_summary',
+    'start_rolling_summarizer',
+    'stop_rolling_summarizer',
+    'start_notes_job',
+    'prune_notes_jobs',
+    'get_notes_job',
+]
@@ -0,0 +1,217 @@
+"""
+Sindh Police AI Meeting Member - Meeting Registry
+Live meetings keyed by meeting ID: a lock per meeting for state changes, the
+WebSockets subscribed to each meeting's events in this worker, and limits on
+concurrent meetings, voice sessions and subscribers
+"""
+
+import os
+import time
+import asyncio
+from contextlib import suppress
+from dotenv import load_dotenv
+
+from tools import get_meeting_session, list_active_meetings
+from database import run_db
+from state_store import MeetingLimitError
+
+load_dotenv(override=True)
+
+MAX_ACTIVE_MEETINGS = int(os.getenv("MAX_ACTIVE_MEETINGS", 50))
+MAX_VOICE_SESSIONS_PER_MEETING = int(os.getenv("MAX_VOICE_SESSIONS_PER_MEETING", 1))
+MAX_SUBSCRIBERS_PER_MEETING = int(os.getenv("MAX_SUBSCRIBERS_PER_MEETING", 25))
+# Events waiting to be sent to one subscriber; a viewer that falls this far behind is closed
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("SUBSCRIBER_QUEUE_SIZE", 256))
+
+
+class Subscriber:
+    """
+    One WebSocket receiving a meeting's events, with its own outbound queue
+    and sender task so a slow socket only ever delays itself.
+
+    A viewer (read-only /ws/meeting socket) that lets its queue fill up is
+    closed; the socket of a voice call in the meeting is never dropped, and
+    publishing waits for room in its queue instead.
+    """
+
+    def __init__(self, meeting_id: str, websocket, viewer: bool = True,
+                 queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.meeting_id = meeting_id
+        self.websocket = websocket
+        self.viewer = viewer
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.task = asyncio.create_task(self._send_events())
+
+    async def _send_events(self):
+        while True:
+            event = await self.queue.get()
+            try:
+                await self.websocket.send_json(event)
+            except Exception as e:
+                print(f"⚠️ Stopped sending {self.meeting_id} events to a {'viewer' if self.viewer else 'call'}: "
+                      f"{type(e).__name__}")
+                return
+
+    def stop(self):
+        self.task.cancel()
+
+    async def evict(self):
+        """Stop sending and close the socket (a viewer that fell behind)."""
+        self.stop()
+        with suppress(Exception):
+            await self.websocket.close(code=1013, reason="Too slow to receive meeting events")
+
+
+class LiveMeeting:
+    """This worker's runtime state for one live meeting (the session itself is in the state store)."""
+
+    def __init__(self, meeting_id: str, started_by: str = None):
+        self.meeting_id = meeting_id
+        self.started_by = started_by
+        self.opened_at = time.time()
+        self.lock = asyncio.Lock()
+        self.subscribers = {}  # websocket -> Subscriber
+        self.voice_sessions = set()
+        self.closed = False
+
+    def describe(self) -> dict:
+        return {
+            "meeting_id": self.meeting_id,
+            "started_by": self.started_by,
+            "voice_sessions": len(self.voice_sessions),
+            "subscribers": len(self.subscribers),
+        }
+
+
+class MeetingRegistry:
+    """
+    Live meetings by ID.
+
+    Whether a meeting is live is decided by the shared state store (read
+    off the event loop through run_db), so any worker can serve any meeting;
+    locks and subscribers are per worker.
+    State changes to a meeting (adding motions, ending it) are serialized
+    with ``meeting.lock``; other meetings are never blocked. Events are
+    fanned out only to the WebSockets subscribed to the same meeting.
+    """
+
+    def __init__(self, max_meetings: int = MAX_ACTIVE_MEETINGS,
+                 max_voice_sessions: int = MAX_VOICE_SESSIONS_PER_MEETING,
+                 max_subscribers: int = MAX_SUBSCRIBERS_PER_MEETING):
+        self.max_meetings = max_meetings
+        self.max_voice_sessions = max_voice_sessions
+        self.max_subscribers = max_subscribers
+        self._meetings = {}
+        self._evictions = set()
+
+    async def get(self, meeting_id: str) -> LiveMeeting:
+        """The live meeting with this ID (started by any worker), or None."""
+        if not meeting_id:
+            return None
+        session = await run_db(get_meeting_session, meeting_id, include_records=False)
+        if not session or session["status"] != "active":
+            # Ended, possibly by another worker
+            self.close(meeting_id)
+            return None
+        meeting = self._meetings.get(meeting_id)
+        if meeting is None:
+            meeting = self._meetings[meeting_id] = LiveMeeting(meeting_id, session.get("started_by"))
+        return meeting
+
+    def close(self, meeting_id: str) -> LiveMeeting:
+        """Unregister a meeting; callers should hold its lock."""
+        meeting = self._meetings.pop(meeting_id, None)
+        if meeting:
+            meeting.closed = True
+        return meeting
+
+    async def active_meetings(self) -> list:
+        """Live meetings on all workers, with this worker's voice sessions and subscribers."""
+        meetings = []
+        for session in await run_db(list_active_meetings):
+            meeting = self._meetings.get(session["meeting_id"]) or LiveMeeting(session["meeting_id"], session.get("started_by"))
+            meetings.append(meeting.describe())
+        return meetings
+
+    # ------------------------------------------------------------ voice calls
+
+    def attach_call(self, meeting: LiveMeeting, call_id: str):
+        """Count a voice session against the meeting's limit."""
+        if call_id not in meeting.voice_sessions and len(meeting.voice_sessions) >= self.max_voice_sessions:
+            raise MeetingLimitError(f"Meeting {meeting.meeting_id} already has {self.max_voice_sessions} voice session(s)")
+        meeting.voice_sessions.add(call_id)
+
+    def detach_call(self, meeting: LiveMeeting, call_id: str):
+        meeting.voice_sessions.discard(call_id)
+
+    # ---------------------------------------------------------------- fan-out
+
+    def subscribe(self, meeting: LiveMeeting, websocket, viewer: bool = True):
+        """
+        Deliver the meeting's events to this WebSocket.
+
+        Args:
+            meeting: Live meeting
+            websocket: Socket to send events to
+            viewer: False for the socket of a voice call in the meeting, which
+                is never dropped for being slow
+        """
+        if websocket in meeting.subscribers:
+            return
+        if len(meeting.subscribers) >= self.max_subscribers:
+            raise MeetingLimitError(f"Meeting {meeting.meeting_id} already has {self.max_subscribers} subscribers")
+        meeting.subscribers[websocket] = Subscriber(meeting.meeting_id, websocket, viewer)
+
+    def unsubscribe(self, meeting: LiveMeeting, websocket):
+        subscriber = meeting.subscribers.pop(websocket, None)
+        if subscriber:
+            subscriber.stop()
+
+    async def publish(self, meeting_id: str, event: dict) -> int:
+        """
+        Queue an event for every WebSocket subscribed to a meeting.
+
+        Each subscriber's sender task sends it in order. A viewer whose queue
+        is full is closed and dropped so one slow client can't hold up the
+        meeting; for a voice call's own socket this waits for room instead.
+
+        Args:
+            meeting_id: Meeting the event belongs to
+            event: JSON-serializable event
+
+        Returns:
+            Number of subscribers the event was queued for
+        """
+        meeting = self._meetings.get(meeting_id)
+        if not meeting or not meeting.subscribers:
+            return 0
+        queued = 0
+        for websocket, subscriber in list(meeting.subscribers.items()):
+            if subscriber.task.done():
+                # The socket failed; its handler unsubscribes it when it closes
+                continue
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                if subscriber.viewer:
+                    meeting.subscribers.pop(websocket, None)
+                    print(f"⚠️ Closed a viewer of {meeting_id}: {subscriber.queue.maxsize} events behind")
+                    task = asyncio.create_task(subscriber.evict())
+                    self._evictions.add(task)
+                    task.add_done_callback(self._evictions.discard)
+                    continue
+                await subscriber.queue.put(event)
+            queued += 1
+        return queued
+
+
+meeting_registry = MeetingRegistry()
+
+
+__all__ = [
+    'MeetingLimitError',
+    'Subscriber',
+    'LiveMeeting',
+    'MeetingRegistry',
+    'meeting_registry',
+]
@@ -0,0 +1,195 @@
+"""
+Sindh Police AI Meeting Member - Minutes Writer
+Writes live meeting events (start, transcript, motions, votes, end) to the
+meetings database while the meeting runs, and recovers meetings that were
+still active when the server stopped
+"""
+
+import os
+import time
+import queue
+import sqlite3
+import threading
+from dotenv import load_dotenv
+
+from database import write_minutes_events, get_active_meetings, get_meeting_minutes
+
+load_dotenv(override=True)
+
+# A batch is written when it is this old or this large, whichever comes first
+MINUTES_FLUSH_SECONDS = float(os.getenv("MINUTES_FLUSH_SECONDS", 1.0))
+MINUTES_FLUSH_BATCH = int(os.getenv("MINUTES_FLUSH_BATCH", 200))
+
+_STOP = object()
+
+
+class MinutesWriter:
+    """
+    Background thread that drains a queue of meeting events into SQLite.
+
+    ``enqueue`` never touches the database, so request handlers and the
+    audio loop don't wait on disk. Events are written in order, in batched
+    transactions; an event that can't be written (e.g. a vote for a meeting
+    that was never recorded) is logged and skipped without losing the rest
+    of its batch.
+    """
+
+    def __init__(self, flush_seconds: float = MINUTES_FLUSH_SECONDS, batch_size: int = MINUTES_FLUSH_BATCH):
+        self.flush_seconds = flush_seconds
+        self.batch_size = batch_size
+        self.stats = {"events": 0, "batches": 0, "dropped": 0}
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="minutes-writer", daemon=True)
+                self._thread.start()
+
+    def enqueue(self, kind: str, params: dict):
+        """
+        Queue one event for writing.
+
+        Args:
+            kind: Event kind (a key of database.MINUTES_EVENT_SQL)
+            params: The event's named SQL parameters
+        """
+        self.start()
+        self._queue.put((kind, dict(params)))
+
+    def write_now(self, kind: str, params: dict):
+        """
+        Write one event before returning, after what is already queued.
+
+        Used for meeting_started, so the meeting row exists before any
+        worker can queue rows that reference it. If the write fails the
+        event is queued instead.
+
+        Args:
+            kind: Event kind (a key of database.MINUTES_EVENT_SQL)
+            params: The event's named SQL parameters
+        """
+        self.flush()
+        try:
+            write_minutes_events([(kind, dict(params))])
+        except sqlite3.Error as e:
+            print(f"⚠️ Writing {kind} for {params.get('meeting_id')} failed ({e}), queued instead")
+            self.enqueue(kind, params)
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """
+        Write everything queued so far now.
+
+        Returns:
+            True once the events are written, False on timeout
+        """
+        self.start()
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def stop(self, timeout: float = 10.0):
+        """Write what is queued and stop the thread."""
+        with self._lock:
+            thread = self._thread
+        if thread and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch, waiters = [], []
+            item = self._queue.get()
+            deadline = time.monotonic() + self.flush_seconds
+            while True:
+                if item is _STOP:
+                    stopping = True
+                    break
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            if batch:
+                self._write(batch)
+            for waiter in waiters:
+                waiter.set()
+
+    def _write(self, batch: list):
+        try:
+            write_minutes_events(batch)
+        except sqlite3.Error as e:
+            print(f"⚠️ Minutes batch of {len(batch)} failed ({e}), writing events one by one")
+            for event in batch:
+                try:
+                    write_minutes_events([event])
+                except sqlite3.Error as e:
+                    self.stats["dropped"] += 1
+                    print(f"⚠️ Dropped {event[0]} event for {event[1].get('meeting_id')}: {e}")
+        self.stats["events"] += len(batch)
+        self.stats["batches"] += 1
+
+
+minutes_writer = MinutesWriter()
+
+
+def recover_active_meetings(store) -> list:
+    """
+    Restore meetings the database still has as active into the state store.
+
+    After a restart with the in-memory state store, meetings that were
+    running come back with their transcript, motions and votes so they can
+    be continued or ended normally. Meetings the store already knows about
+    (e.g. SQLite state shared with another worker) are left alone.
+
+    Args:
+        store: State store to restore the meetings into
+
+    Returns:
+        List of recovered meeting IDs
+    """
+    recovered = []
+    for row in get_active_meetings():
+        meeting_id = row["meeting_id"]
+        if store.get_meeting(meeting_id):
+            continue
+        minutes = get_meeting_minutes(meeting_id)
+        try:
+            store.create_meeting({
+                "meeting_id": meeting_id,
+                "status": "active",
+                "start_time": row["start_time"],
+                "end_time": None,
+                "agenda": row["agenda"] or "",
+                "started_by": row["started_by"] or None
+            })
+        except ValueError:
+            # Another worker recovered it first
+            continue
+        for entry in minutes["transcript"]:
+            store.add_transcript_entry(meeting_id, entry)
+        for motion in minutes["motions"]:
+            store.add_motion({**motion, "meeting_id": meeting_id, "ai_vote": None})
+        for vote in minutes["votes"]:
+            store.add_vote({**vote, "meeting_id": meeting_id})
+        recovered.append(meeting_id)
+        print(f"♻️ Recovered active meeting {meeting_id}: {len(minutes['transcript'])} transcript entries, "
+              f"{len(minutes['motions'])} motions, {len(minutes['votes'])} votes")
+    return recovered
+
+
+__all__ = [
+    'MINUTES_FLUSH_SECONDS',
+    'MINUTES_FLUSH_BATCH',
+    'MinutesWriter',
+    'minutes_writer',
+    'recover_active_meetings',
+]
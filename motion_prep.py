@@ -0,0 +1,148 @@
+"""
+Sindh Police AI Meeting Member - Motion Pre-processing
+Starts regulatory context retrieval (and optionally a draft analysis) as soon
+as a motion is added, so the context is ready when the vote is triggered
+"""
+
+import os
+import asyncio
+from dotenv import load_dotenv
+
+from tools import get_motions, update_motion, request_regulatory_context
+from database import run_db
+from meeting_notes import get_client, SUMMARY_MODEL
+
+load_dotenv(override=True)
+
+MOTION_CONTEXT_TOP_K = int(os.getenv("MOTION_CONTEXT_TOP_K", 5))
+# How long a vote waits for a preparation that is still running
+MOTION_CONTEXT_WAIT_SECONDS = float(os.getenv("MOTION_CONTEXT_WAIT_SECONDS", 3.0))
+MOTION_DRAFT_ANALYSIS = os.getenv("MOTION_DRAFT_ANALYSIS", "false").lower() == "true"
+# Polling interval while another worker prepares the motion
+MOTION_CONTEXT_POLL_SECONDS = 0.1
+
+DRAFT_ANALYSIS_PROMPT = """Prepare a brief for a Sindh Police board member who must vote on the motion below.
+Using only the policy excerpts provided, list in at most 5 bullet points:
+the policies that apply, any conflicts or requirements, and the main operational risks.
+
+MOTION:
+{motion_text}
+
+POLICY EXCERPTS:
+{context}"""
+
+# (meeting_id, motion_id) -> preparation task; motion IDs are only unique within a meeting
+motion_prep_tasks = {}
+
+
+async def _draft_analysis(motion_text: str, context: str) -> str:
+    response = await get_client().chat.completions.create(
+        model=SUMMARY_MODEL,
+        messages=[
+            {"role": "system", "content": "You are a policy analyst for the Sindh Police. Be concise and factual."},
+            {"role": "user", "content": DRAFT_ANALYSIS_PROMPT.format(
+                motion_text=motion_text, context=context or "None found.")}
+        ],
+        temperature=0.2,
+        max_tokens=400
+    )
+    return response.choices[0].message.content.strip()
+
+
+async def _prepare_motion(motion: dict, pending: dict):
+    """Retrieve context for a motion and store it on the motion record."""
+    # Other workers wait on a pending motion instead of retrieving again
+    await run_db(update_motion, motion["meeting_id"], motion["motion_id"], **pending)
+    try:
+        result = await request_regulatory_context(motion["motion_text"], top_k=MOTION_CONTEXT_TOP_K)
+        prepared = {
+            "regulatory_context": result.get("context", ""),
+            "context_sources": result.get("sources", []),
+        }
+        if MOTION_DRAFT_ANALYSIS:
+            prepared["draft_analysis"] = await _draft_analysis(motion["motion_text"], prepared["regulatory_context"])
+        prepared["context_status"] = "ready"
+        print(f"📚 Context prepared for {motion['motion_id']} ({len(prepared['context_sources'])} sources)")
+    except Exception as e:
+        prepared = {"context_status": "failed"}
+        print(f"⚠️ Motion preparation failed for {motion['motion_id']}: {e}")
+    motion.update(prepared)
+    await run_db(update_motion, motion["meeting_id"], motion["motion_id"], **prepared)
+
+
+def start_motion_prep(motion: dict):
+    """
+    Start background preparation for a newly added motion.
+
+    Args:
+        motion: Motion record from tools.add_motion (updated in place)
+    """
+    pending = {"context_status": "pending", "regulatory_context": "", "context_sources": [], "draft_analysis": ""}
+    motion.update(pending)
+    key = (motion["meeting_id"], motion["motion_id"])
+    task = asyncio.create_task(_prepare_motion(motion, pending))
+    motion_prep_tasks[key] = task
+    task.add_done_callback(lambda _: motion_prep_tasks.pop(key, None))
+
+
+def find_motion(meeting_id: str, motion_id: str = None, motion_text: str = None) -> dict:
+    """Find a motion in a live session by ID, or the latest one with the same text."""
+    for motion in reversed(get_motions(meeting_id)):
+        if motion_id and motion["motion_id"] == motion_id:
+            return motion
+        if not motion_id and motion_text and motion["motion_text"].strip() == motion_text.strip():
+            return motion
+    return None
+
+
+async def get_motion_context(meeting_id: str, motion_text: str, motion_id: str = None,
+                             wait_seconds: float = MOTION_CONTEXT_WAIT_SECONDS) -> dict:
+    """
+    Get the prepared context for a motion that is being put to a vote.
+
+    Waits up to ``wait_seconds`` for a preparation still in flight (in this
+    worker, or in the worker that handled /api/motion/add), and retrieves
+    on the spot for motions that were never added through /api/motion/add.
+
+    Args:
+        meeting_id: Meeting ID
+        motion_text: Motion text
+        motion_id: Motion ID, if the client knows it
+
+    Returns:
+        Dict with regulatory_context, draft_analysis and status
+    """
+    motion = await run_db(find_motion, meeting_id, motion_id, motion_text)
+    if motion is None:
+        result = await request_regulatory_context(motion_text, top_k=MOTION_CONTEXT_TOP_K)
+        return {"regulatory_context": result.get("context", ""), "draft_analysis": "", "status": "on_demand"}
+
+    if "context_status" not in motion:
+        start_motion_prep(motion)
+
+    task = motion_prep_tasks.get((meeting_id, motion["motion_id"]))
+    if task and not task.done():
+        try:
+            await asyncio.wait_for(asyncio.shield(task), timeout=wait_seconds)
+        except asyncio.TimeoutError:
+            print(f"⚠️ Context for {motion['motion_id']} not ready after {wait_seconds}s; voting without it")
+    elif motion.get("context_status") == "pending" and not task:
+        deadline = asyncio.get_running_loop().time() + wait_seconds
+        while motion.get("context_status") == "pending" and asyncio.get_running_loop().time() < deadline:
+            await asyncio.sleep(MOTION_CONTEXT_POLL_SECONDS)
+            motion = await run_db(find_motion, meeting_id, motion["motion_id"]) or motion
+    motion = await run_db(find_motion, meeting_id, motion["motion_id"]) or motion
+
+    return {
+        "regulatory_context": motion.get("regulatory_context", ""),
+        "draft_analysis": motion.get("draft_analysis", ""),
+        "status": motion.get("context_status", "unknown"),
+    }
+
+
+__all__ = [
+    'start_motion_prep',
+    'find_motion',
+    'get_motion_context',
+    'motion_prep_tasks',
+]
@@ -0,0 +1,192 @@
+"""
+Sindh Police AI Meeting Member - Call Recording
+Streams call audio to WAV files on disk and prunes stale call records
+"""
+
+import os
+import time
+import struct
+import asyncio
+from dotenv import load_dotenv
+
+load_dotenv(override=True)
+
+RECORDINGS_DIR = os.getenv("RECORDINGS_DIR", os.path.join(os.path.dirname(__file__), "recordings"))
+RECORDING_FLUSH_BYTES = int(os.getenv("RECORDING_FLUSH_BYTES", 64 * 1024))
+RECORDING_RETENTION_SECONDS = int(os.getenv("RECORDING_RETENTION_SECONDS", 6 * 3600))
+RECORDING_SWEEP_INTERVAL_SECONDS = int(os.getenv("RECORDING_SWEEP_INTERVAL_SECONDS", 300))
+
+WAV_HEADER_SIZE = 44
+
+# Kind of the call records kept in the state store (call_id -> call record)
+CALL_RECORD = "call"
+
+
+def _wav_header(data_size: int, sample_rate: int, channels: int, sample_width: int) -> bytes:
+    """Build a canonical 44-byte PCM WAV header."""
+    byte_rate = sample_rate * channels * sample_width
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, 1, channels, sample_rate, byte_rate,
+        channels * sample_width, sample_width * 8,
+        b"data", data_size,
+    )
+
+
+class WavRecordingSink:
+    """
+    Append-only WAV writer for one side of a call.
+
+    Frames are collected in a small in-memory buffer and written to disk
+    from a worker thread once ``flush_bytes`` accumulate, so memory stays
+    bounded for the whole call. The RIFF header is patched on close.
+    """
+
+    def __init__(self, path: str, file, sample_rate: int, channels: int, sample_width: int,
+                 flush_bytes: int):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self.data_size = 0
+        self._file = file
+        self._buffer = bytearray()
+        self._flush_bytes = flush_bytes
+        self._lock = asyncio.Lock()
+        self._closed = False
+
+    @classmethod
+    async def create(cls, filename: str, sample_rate: int = 8000, channels: int = 1,
+                     sample_width: int = 2, directory: str = None,
+                     flush_bytes: int = RECORDING_FLUSH_BYTES) -> "WavRecordingSink":
+        """
+        Open a new WAV file in the recordings directory.
+
+        Args:
+            filename: File name inside the recordings directory
+            sample_rate: Samples per second
+            channels: Number of channels
+            sample_width: Bytes per sample
+            directory: Override for RECORDINGS_DIR
+            flush_bytes: Buffered bytes that trigger a disk write
+
+        Returns:
+            An open recording sink
+
+        Raises:
+            FileExistsError: A recording with this name already exists
+        """
+        directory = directory or RECORDINGS_DIR
+        path = os.path.join(directory, filename)
+
+        def _open():
+            os.makedirs(directory, exist_ok=True)
+            # "x" refuses to truncate an earlier recording under the same name
+            f = open(path, "xb")
+            f.write(_wav_header(0, sample_rate, channels, sample_width))
+            return f
+
+        file = await asyncio.to_thread(_open)
+        return cls(path, file, sample_rate, channels, sample_width, flush_bytes)
+
+    async def write(self, frame: bytes):
+        """Queue a PCM frame, flushing to disk when the buffer is full."""
+        if self._closed or not frame:
+            return
+        self._buffer += frame
+        if len(self._buffer) >= self._flush_bytes:
+            await self.flush()
+
+    async def flush(self):
+        """Write buffered frames to disk."""
+        async with self._lock:
+            if not self._buffer:
+                return
+            data = bytes(self._buffer)
+            self._buffer.clear()
+            await asyncio.to_thread(self._file.write, data)
+            self.data_size += len(data)
+
+    async def close(self):
+        """Flush remaining frames, patch the RIFF header and close the file."""
+        if self._closed:
+            return
+        await self.flush()
+        self._closed = True
+
+        def _finalize():
+            self._file.seek(0)
+            self._file.write(_wav_header(self.data_size, self.sample_rate, self.channels, self.sample_width))
+            self._file.close()
+
+        await asyncio.to_thread(_finalize)
+
+    async def discard(self):
+        """Close the file and delete it (the call never started)."""
+        await self.close()
+        await asyncio.to_thread(os.remove, self.path)
+
+    @property
+    def duration_seconds(self) -> float:
+        """Duration of the audio written so far (including buffered frames)."""
+        total = self.data_size + len(self._buffer)
+        return total / (self.sample_rate * self.channels * self.sample_width)
+
+
+def prune_call_recordings(store, max_age_seconds: int = RECORDING_RETENTION_SECONDS,
+                          now: float = None) -> list:
+    """
+    Remove stale call records from the state store.
+
+    Live calls are kept; ended calls and calls that never connected are
+    dropped once they are older than ``max_age_seconds``. WAV files on
+    disk are left in place.
+
+    Args:
+        store: State store holding CALL_RECORD records
+        max_age_seconds: Retention window
+        now: Current epoch time (defaults to time.time())
+
+    Returns:
+        List of removed call IDs
+    """
+    now = now or time.time()
+    stale = [
+        call_id for call_id, record in store.list_records(CALL_RECORD).items()
+        if not record.get("live")
+        and now - (record.get("ended_at") or record.get("start_time", now)) > max_age_seconds
+    ]
+    if stale:
+        store.delete_records(CALL_RECORD, stale)
+    return stale
+
+
+async def run_retention_sweeper(store, on_prune=None,
+                                interval_seconds: int = RECORDING_SWEEP_INTERVAL_SECONDS,
+                                max_age_seconds: int = RECORDING_RETENTION_SECONDS):
+    """
+    Periodically prune stale call records.
+
+    Args:
+        store: State store holding CALL_RECORD records
+        on_prune: Optional callback receiving the list of removed call IDs
+        interval_seconds: Delay between sweeps
+        max_age_seconds: Retention window
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        removed = await asyncio.to_thread(prune_call_recordings, store, max_age_seconds)
+        if removed:
+            if on_prune:
+                on_prune(removed)
+            print(f"🧹 Pruned {len(removed)} stale call recording entries")
+
+
+__all__ = [
+    'RECORDINGS_DIR',
+    'CALL_RECORD',
+    'WavRecordingSink',
+    'prune_call_recordings',
+    'run_retention_sweeper',
+]
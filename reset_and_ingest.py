@@ -1,74 +1,51 @@
 """
-Utility script to reset Pinecone index and re-ingest documents with correct metadata structure.
+Utility script to reset the vector index and re-ingest documents with correct metadata structure.
+The index is the local vector store, or Pinecone when VECTOR_BACKEND=pinecone.
 This script will:
-1. Delete all existing vectors from Pinecone
+1. Delete all existing vectors from the index
 2. Re-ingest all documents from the documents/ folder
 3. Use the correct metadata structure: source, text, chunk_index, uploaded_at
+
+Run with --incremental to skip the reset and only sync changed chunks
+(unchanged documents cost no embedding calls or upserts).
 """
 
 import os
 import sys
-import hashlib
-from datetime import datetime, timezone
+from datetime import datetime
 from dotenv import load_dotenv
-from docx import Document
-from pypdf import PdfReader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings
-from pinecone import Pinecone
+
+from ingestion import get_embeddings, get_text_splitter, get_vector_index, ingest_chunks_sync, VECTOR_BACKEND
+from database import init_db, clear_documents
+from document_extraction import iter_document_text, iter_chunks
 
 load_dotenv(override=True)
 
 # Configuration
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
-INDEX_NAME = os.getenv("INDEX_NAME", "sindh-police-docs")
 DOCS_FOLDER = "documents"
 
-def read_docx(file_path: str) -> str:
-    """Read text content from a DOCX file"""
-    try:
-        doc = Document(file_path)
-        text = ""
-        for para in doc.paragraphs:
-            text += para.text + "\n"
-        return text
-    except Exception as e:
-        print(f"❌ Error reading {file_path}: {e}")
-        return ""
-
-def read_pdf(file_path: str) -> str:
-    """Read text content from a PDF file"""
-    try:
-        pdf_reader = PdfReader(file_path)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() or ""
-        return text
-    except Exception as e:
-        print(f"❌ Error reading {file_path}: {e}")
-        return ""
-
-def reset_pinecone_index():
-    """Delete all vectors from Pinecone index"""
-    print("🔄 Resetting Pinecone index...")
+def reset_vector_index():
+    """Delete all vectors from the configured vector index"""
+    print(f"🔄 Resetting {VECTOR_BACKEND} vector index...")
     
     try:
-        pc = Pinecone(api_key=PINECONE_API_KEY)
-        index = pc.Index(INDEX_NAME)
+        index = get_vector_index()
         
-        # Delete all vectors by deleting with empty filter (deletes everything)
-        # Note: Pinecone delete with no filter deletes all vectors
+        # Delete all vectors (the local store buffers writes until persist())
         index.delete(delete_all=True)
+        if hasattr(index, "persist"):
+            index.persist()
+        clear_documents()
         
-        print("✅ Pinecone index reset complete (all vectors deleted)")
+        print("✅ Vector index reset complete (all vectors deleted)")
         return True
     except Exception as e:
         print(f"❌ Error resetting index: {e}")
         return False
 
 def ingest_documents(docs_folder: str = DOCS_FOLDER):
-    """Process all .docx and .pdf files in the docs folder and ingest to Pinecone with correct metadata"""
+    """Process all .docx and .pdf files in the docs folder and ingest to the vector index with correct metadata"""
     
     if not os.path.exists(docs_folder):
         print(f"❌ Docs folder '{docs_folder}' not found!")
@@ -86,19 +63,10 @@ def ingest_documents(docs_folder: str = DOCS_FOLDER):
     print(f"\n📚 Found {len(all_files)} documents to process ({len(docx_files)} DOCX, {len(pdf_files)} PDF)...")
     
     try:
-        # Initialize Pinecone and Embeddings
-        pc = Pinecone(api_key=PINECONE_API_KEY)
-        index = pc.Index(INDEX_NAME)
-        embeddings = OpenAIEmbeddings(
-            model="text-embedding-3-small",
-            openai_api_key=OPENAI_API_KEY
-        )
-        
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
-            length_function=len
-        )
+        # Initialize vector index and Embeddings
+        index = get_vector_index()
+        embeddings = get_embeddings()
+        text_splitter = get_text_splitter()
         
         total_chunks = 0
         processed_docs = []
@@ -107,65 +75,33 @@ def ingest_documents(docs_folder: str = DOCS_FOLDER):
             file_path = os.path.join(docs_folder, filename)
             print(f"\n📄 Processing: {filename}")
             
-            # Read document content based on file type
-            if filename.endswith('.docx'):
-                text = read_docx(file_path)
-            elif filename.endswith('.pdf'):
-                text = read_pdf(file_path)
-            else:
-                print(f"  ⚠️  Skipping {filename} (unsupported format)")
+            # Stream pages -> chunks -> embeddings; the document is never held in memory whole
+            try:
+                chunks = iter_chunks(iter_document_text(file_path, filename), text_splitter)
+                sync = ingest_chunks_sync(index, filename, chunks, "system_reset", embeddings)
+            except Exception as e:
+                print(f"  ❌ Error reading {file_path}: {e}")
                 continue
             
-            if not text.strip():
+            if not sync["chunks"]:
                 print(f"  ⚠️  Skipping {filename} (empty content)")
                 continue
             
-            # Split into chunks
-            chunks = text_splitter.split_text(text)
-            print(f"  📝 Split into {len(chunks)} chunks")
-            
-            # Generate embeddings and upsert to Pinecone
-            vectors = []
-            for i, chunk in enumerate(chunks):
-                if not chunk.strip():
-                    continue
-                
-                # Create unique ID
-                chunk_id = hashlib.md5(f"{filename}_{i}_{chunk[:50]}".encode()).hexdigest()
-                
-                # Generate embedding
-                embedding = embeddings.embed_query(chunk)
-                
-                vectors.append({
-                    "id": chunk_id,
-                    "values": embedding,
-                    "metadata": {
-                        "text": chunk,
-                        "source": filename,  # Use "source" for filtering/deletion
-                        "chunk_index": i,
-                        "uploaded_at": datetime.now(timezone.utc).isoformat(),
-                        "uploaded_by": "system_reset"
-                    }
-                })
+            print(f"  📝 Split into {sync['chunks']} chunks")
+            print(f"  ✅ Upserted {sync['upserted']} chunks, deleted {sync['deleted']}, unchanged {sync['unchanged']}")
             
-            # Batch upsert (Pinecone limit is 100)
-            for i in range(0, len(vectors), 100):
-                batch = vectors[i:i+100]
-                index.upsert(vectors=batch)
-                print(f"  ✅ Upserted batch {i//100 + 1} ({len(batch)} chunks)")
-            
-            total_chunks += len(chunks)
+            total_chunks += sync["chunks"]
             
             # Track document info
             doc_info = {
                 "name": filename,
-                "chunks": len(chunks),
+                "chunks": sync["chunks"],
                 "uploaded_at": datetime.now().strftime("%Y-%m-%d %H:%M"),
                 "uploaded_by": "system_reset"
             }
             processed_docs.append(doc_info)
             
-            print(f"  ✅ Completed: {filename} ({len(chunks)} chunks)")
+            print(f"  ✅ Completed: {filename} ({sync['chunks']} chunks)")
         
         print(f"\n{'='*60}")
         print(f"✅ Ingestion Complete!")
@@ -189,21 +125,27 @@ def ingest_documents(docs_folder: str = DOCS_FOLDER):
 def main():
     """Main function to reset and re-ingest documents"""
     print("="*60)
-    print("Sindh Police AI Meeting Member - Pinecone Reset & Re-Ingestion")
+    print("Sindh Police AI Meeting Member - Vector Index Reset & Re-Ingestion")
     print("="*60)
     
-    # Confirm action
-    print("\n⚠️  WARNING: This will delete ALL existing vectors from Pinecone!")
-    response = input("Are you sure you want to continue? (yes/no): ")
-    
-    if response.lower() not in ['yes', 'y']:
-        print("❌ Operation cancelled.")
-        return
+    incremental = "--incremental" in sys.argv[1:]
+    init_db()
     
-    # Step 1: Reset index
-    if not reset_pinecone_index():
-        print("❌ Failed to reset index. Aborting.")
-        return
+    if incremental:
+        print("\n🔁 Incremental mode: only changed chunks will be embedded and upserted")
+    else:
+        # Confirm action
+        print(f"\n⚠️  WARNING: This will delete ALL existing vectors from the {VECTOR_BACKEND} index!")
+        response = input("Are you sure you want to continue? (yes/no): ")
+        
+        if response.lower() not in ['yes', 'y']:
+            print("❌ Operation cancelled.")
+            return
+        
+        # Step 1: Reset index
+        if not reset_vector_index():
+            print("❌ Failed to reset index. Aborting.")
+            return
     
     # Step 2: Re-ingest documents
     if not ingest_documents():
@@ -0,0 +1,271 @@
+"""
+Sindh Police AI Meeting Member - Regulatory Context Retrieval
+Hybrid retrieval of policy chunks: vector search on the configured index
+(local store by default, Pinecone optionally) fused with BM25 over the
+same chunks, so exact section numbers and acronyms (FIR, SHO, CPLC) rank well
+"""
+
+import os
+import re
+import time
+import asyncio
+from dotenv import load_dotenv
+
+from ingestion import get_vector_index, embed_texts_cached
+from database import lexical_search, run_db
+from retrieval_cache import retrieval_cache
+
+load_dotenv(override=True)
+
+RAG_TOP_K = int(os.getenv("RAG_TOP_K", 5))
+# Largest top_k a client may ask /api/context/query for
+RAG_TOP_K_MAX = int(os.getenv("RAG_TOP_K_MAX", 50))
+RAG_MIN_SCORE = float(os.getenv("RAG_MIN_SCORE", 0.2))
+RAG_CONTEXT_CHARS = int(os.getenv("RAG_CONTEXT_CHARS", 6000))
+# Weight of the vector score in the fused ranking; BM25 gets 1 - HYBRID_ALPHA
+HYBRID_ALPHA = float(os.getenv("HYBRID_ALPHA", 0.5))
+HYBRID_CANDIDATES = 4  # each ranker contributes top_k * HYBRID_CANDIDATES candidates
+
+# Terms such as "154", "22-A" or "3.2" are kept together as FTS phrases
+TERM_PATTERN = re.compile(r"[0-9A-Za-z]+(?:[-./][0-9A-Za-z]+)*")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it",
+    "of", "on", "or", "that", "the", "this", "to", "was", "what", "when", "which",
+    "with", "about", "under", "does", "do", "how", "should",
+}
+
+
+async def embed_query(query: str) -> list:
+    """Embed a search query (served from the embedding cache when seen before)."""
+    return (await embed_texts_cached([query]))[0]
+
+
+async def search_vectors(vector: list, top_k: int = RAG_TOP_K, source: str = None) -> list:
+    """
+    Search the vector index with a query embedding.
+
+    Args:
+        vector: Query embedding
+        top_k: Number of chunks to return
+        source: Optionally restrict results to one document
+
+    Returns:
+        Matches as dicts with id, score, source, chunk_index and text
+    """
+    index = get_vector_index()
+    kwargs = {"vector": vector, "top_k": top_k, "include_metadata": True}
+    if source:
+        kwargs["filter"] = {"source": source}
+
+    # Pinecone is a network call and the local store's scan is CPU-bound; neither runs on the loop
+    result = await asyncio.to_thread(index.query, **kwargs)
+
+    matches = []
+    for match in result.matches:
+        if match.score < RAG_MIN_SCORE:
+            continue
+        metadata = match.metadata or {}
+        matches.append({
+            "id": match.id,
+            "score": round(float(match.score), 4),
+            "source": metadata.get("source", "Unknown"),
+            "chunk_index": metadata.get("chunk_index"),
+            "text": metadata.get("text", ""),
+        })
+    return matches
+
+
+def build_match_query(query: str) -> str:
+    """
+    Turn free text into an FTS5 MATCH expression (terms OR-ed, BM25 ranks them).
+
+    Args:
+        query: Free-text query
+
+    Returns:
+        MATCH expression, or "" when the query has no searchable terms
+    """
+    phrases = []
+    for term in TERM_PATTERN.findall(query):
+        parts = re.findall(r"[0-9A-Za-z]+", term.lower())
+        if len(parts) == 1 and parts[0] in STOPWORDS:
+            continue
+        phrase = '"' + " ".join(parts) + '"'
+        if phrase not in phrases:
+            phrases.append(phrase)
+    return " OR ".join(phrases)
+
+
+async def search_lexical(query: str, top_k: int = RAG_TOP_K, source: str = None) -> list:
+    """
+    BM25 search over the indexed chunks.
+
+    Args:
+        query: Free-text query
+        top_k: Number of chunks to return
+        source: Optionally restrict results to one document
+
+    Returns:
+        Matches as dicts with id, score, source, chunk_index and text
+    """
+    match_query = build_match_query(query)
+    if not match_query:
+        return []
+    rows = await run_db(lexical_search, match_query, top_k, source)
+    return [
+        {
+            "id": row["chunk_id"],
+            "score": round(float(row["score"]), 4),
+            "source": row["source"],
+            "chunk_index": row["chunk_index"],
+            "text": row["text"],
+        }
+        for row in rows
+    ]
+
+
+def _normalize_scores(matches: list) -> dict:
+    """Scale scores by the best one (min-max would zero the weakest candidate)."""
+    if not matches:
+        return {}
+    best = max(m["score"] for m in matches)
+    if best <= 0:
+        return {m["id"]: 0.0 for m in matches}
+    return {m["id"]: max(m["score"], 0.0) / best for m in matches}
+
+
+def fuse(vector_matches: list, lexical_matches: list, alpha: float = HYBRID_ALPHA,
+         top_k: int = RAG_TOP_K) -> list:
+    """
+    Combine vector and BM25 rankings with a weighted sum of max-normalized scores.
+
+    Args:
+        vector_matches: Matches from search_vectors()
+        lexical_matches: Matches from search_lexical()
+        alpha: Vector weight (0 = BM25 only, 1 = vector only)
+        top_k: Number of matches to return
+
+    Returns:
+        Fused matches, best first, with vector_score and lexical_score kept
+    """
+    vector_norm = _normalize_scores(vector_matches)
+    lexical_norm = _normalize_scores(lexical_matches)
+
+    candidates = {}
+    for match in vector_matches + lexical_matches:
+        candidates.setdefault(match["id"], dict(match))
+    vector_raw = {m["id"]: m["score"] for m in vector_matches}
+    lexical_raw = {m["id"]: m["score"] for m in lexical_matches}
+
+    fused = []
+    for chunk_id, match in candidates.items():
+        match["vector_score"] = vector_raw.get(chunk_id)
+        match["lexical_score"] = lexical_raw.get(chunk_id)
+        match["score"] = round(
+            alpha * vector_norm.get(chunk_id, 0.0) + (1 - alpha) * lexical_norm.get(chunk_id, 0.0), 4
+        )
+        fused.append(match)
+    fused.sort(key=lambda m: m["score"], reverse=True)
+    return fused[:top_k]
+
+
+def format_context(matches: list, max_chars: int = RAG_CONTEXT_CHARS) -> str:
+    """Render matches as a context block for prompts, citing the source document."""
+    parts = []
+    used = 0
+    for match in matches:
+        block = f"[{match['source']}]\n{match['text'].strip()}"
+        if parts and used + len(block) > max_chars:
+            break
+        parts.append(block)
+        used += len(block)
+    return "\n\n".join(parts)
+
+
+async def retrieve_context(query: str, top_k: int = RAG_TOP_K, source: str = None,
+                           alpha: float = HYBRID_ALPHA, use_cache: bool = True) -> dict:
+    """
+    Retrieve regulatory context for a query with hybrid vector + BM25 ranking.
+
+    Results are cached (retrieval_cache): an exact hit on the normalized
+    query skips all work, and a near-duplicate hit on the query embedding
+    skips both searches. The cache follows the corpus generation shared by
+    all workers, so documents changed on another worker are not served stale.
+
+    Args:
+        query: Topic or question
+        top_k: Number of chunks to return
+        source: Optionally restrict results to one document
+        alpha: Vector weight in the fused score (0 skips the embedding call)
+        use_cache: Consult and fill the retrieval cache
+
+    Returns:
+        Dict with the formatted context, matches, timings in milliseconds
+        and how the cache answered ("exact", "similar" or "miss")
+    """
+    options = (top_k, source, alpha)
+    generation = None
+    if use_cache:
+        generation = await run_db(retrieval_cache.sync_generation)
+        cached = retrieval_cache.get(query, options)
+        if cached is not None:
+            return {**cached, "cache": "exact", "timings_ms": {}}
+
+    candidates = top_k * HYBRID_CANDIDATES
+    timings = {}
+
+    async def lexical_side():
+        if alpha >= 1:
+            return []
+        started = time.perf_counter()
+        matches = await search_lexical(query, top_k=candidates, source=source)
+        timings["lexical"] = round((time.perf_counter() - started) * 1000, 2)
+        return matches
+
+    # BM25 runs while the query is embedded
+    lexical_task = asyncio.create_task(lexical_side())
+
+    vector = None
+    vector_matches = []
+    if alpha > 0:
+        started = time.perf_counter()
+        vector = await embed_query(query)
+        embedded = time.perf_counter()
+        timings["embed"] = round((embedded - started) * 1000, 2)
+
+        if use_cache:
+            cached = retrieval_cache.get_similar(query, options, vector)
+            if cached is not None:
+                lexical_task.cancel()
+                return {**cached, "cache": "similar", "timings_ms": timings}
+
+        vector_matches = await search_vectors(vector, top_k=candidates, source=source)
+        timings["search"] = round((time.perf_counter() - embedded) * 1000, 2)
+    elif use_cache:
+        retrieval_cache.note_miss()
+
+    lexical_matches = await lexical_task
+    matches = fuse(vector_matches, lexical_matches, alpha=alpha, top_k=top_k)
+
+    result = {
+        "context": format_context(matches),
+        "matches": matches,
+        "alpha": alpha,
+    }
+    if use_cache:
+        retrieval_cache.put(query, options, result, vector, generation)
+    return {**result, "cache": "miss", "timings_ms": timings}
+
+
+__all__ = [
+    'RAG_TOP_K',
+    'RAG_TOP_K_MAX',
+    'HYBRID_ALPHA',
+    'embed_query',
+    'search_vectors',
+    'build_match_query',
+    'search_lexical',
+    'fuse',
+    'format_context',
+    'retrieve_context',
+]
@@ -0,0 +1,212 @@
+"""
+Sindh Police AI Meeting Member - Retrieval Cache
+In-memory cache of regulatory context lookups with an exact tier (normalized
+query text) and a near-duplicate tier (query embedding similarity), TTL and
+LRU eviction, cleared whenever the document corpus changes (on every worker,
+through a generation record in the state store)
+"""
+
+import os
+import re
+import time
+import uuid
+import threading
+from collections import OrderedDict
+import numpy as np
+from dotenv import load_dotenv
+
+from state_store import get_state_store
+
+load_dotenv(override=True)
+
+RETRIEVAL_CACHE_ENTRIES = int(os.getenv("RETRIEVAL_CACHE_ENTRIES", 256))
+RETRIEVAL_CACHE_TTL_SECONDS = float(os.getenv("RETRIEVAL_CACHE_TTL_SECONDS", 900))
+# Cosine similarity above which two queries are treated as the same question
+RETRIEVAL_CACHE_SIMILARITY = float(os.getenv("RETRIEVAL_CACHE_SIMILARITY", 0.95))
+
+# State store record holding the corpus generation every worker's cache follows
+GENERATION_KIND = "retrieval_cache"
+GENERATION_KEY = "generation"
+
+_TERM = re.compile(r"\w+(?:[-./]\w+)*")
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return " ".join(_TERM.findall(query.lower()))
+
+
+class RetrievalCache:
+    """
+    Two-tier cache of retrieval results.
+
+    Entries are keyed by (normalized query, options) where options are the
+    parameters that change the result (top_k, source, alpha). The
+    near-duplicate tier only matches entries with identical options.
+
+    Entries belong to one corpus generation. ``sync_generation`` compares it
+    with the shared one in the state store and drops the entries when
+    another worker has changed the documents since.
+    """
+
+    def __init__(self, max_entries: int = RETRIEVAL_CACHE_ENTRIES,
+                 ttl_seconds: float = RETRIEVAL_CACHE_TTL_SECONDS,
+                 similarity: float = RETRIEVAL_CACHE_SIMILARITY):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity = similarity
+        self._entries = OrderedDict()  # key -> (expires_at, result, unit query vector or None)
+        self._lock = threading.Lock()
+        self._generation = ""
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _expire(self, now: float):
+        expired = [key for key, (expires_at, _, _) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+
+    def get(self, query: str, options: tuple):
+        """Exact-tier lookup on normalized query text; returns the cached result or None."""
+        key = (normalize_query(query), options)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+                return entry[1]
+            return None
+
+    def get_similar(self, query: str, options: tuple, vector: list):
+        """
+        Near-duplicate lookup by query embedding.
+
+        A hit is also stored under this query's exact key, so rephrasings
+        become exact hits next time.
+        """
+        q = np.asarray(vector, dtype=np.float32)
+        q /= (np.linalg.norm(q) or 1.0)
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            candidates = [
+                (key, entry) for key, entry in self._entries.items()
+                if key[1] == options and entry[2] is not None
+            ]
+            if candidates:
+                scores = np.stack([entry[2] for _, entry in candidates]) @ q
+                best = int(np.argmax(scores))
+                if scores[best] >= self.similarity:
+                    key, (expires_at, result, _) = candidates[best]
+                    self._entries.move_to_end(key)
+                    self._store((normalize_query(query), options), result, q, expires_at)
+                    self.similar_hits += 1
+                    return result
+            self.misses += 1
+            return None
+
+    def _store(self, key, result, unit_vector, expires_at):
+        self._entries[key] = (expires_at, result, unit_vector)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def put(self, query: str, options: tuple, result: dict, vector: list = None, generation: str = None):
+        """
+        Cache a result, with its query embedding for the near-duplicate tier.
+
+        Args:
+            query: Query the result answers
+            options: (top_k, source, alpha) used for the result
+            result: Retrieval result to cache
+            vector: Query embedding, if the query was embedded
+            generation: Generation from sync_generation before the lookup;
+                the result is dropped if the corpus changed since
+        """
+        unit_vector = None
+        if vector is not None:
+            unit_vector = np.asarray(vector, dtype=np.float32)
+            unit_vector /= (np.linalg.norm(unit_vector) or 1.0)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._store((normalize_query(query), options), result, unit_vector,
+                        time.monotonic() + self.ttl_seconds)
+
+    def note_miss(self):
+        """Count a miss for lookups that never reach the near-duplicate tier."""
+        with self._lock:
+            self.misses += 1
+
+    def clear(self, generation: str = None):
+        """Drop every entry (the corpus changed), optionally moving to a new generation."""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+            if generation is not None:
+                self._generation = generation
+
+    def sync_generation(self, store=None) -> str:
+        """
+        Follow the shared corpus generation, clearing the cache if it moved.
+
+        Blocking (it reads the state store); call it through run_db.
+
+        Args:
+            store: State store holding the generation (default: get_state_store())
+
+        Returns:
+            The current generation, to pass to put
+        """
+        record = (store or get_state_store()).get_record(GENERATION_KIND, GENERATION_KEY)
+        generation = record["generation"] if record else ""
+        with self._lock:
+            if generation != self._generation:
+                self._entries.clear()
+                self._generation = generation
+                self.invalidations += 1
+            return generation
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.exact_hits + self.similar_hits + self.misses
+            return {
+                "namespace": "retrieval",
+                "memory_entries": len(self._entries),
+                "memory_capacity": self.max_entries,
+                "exact_hits": self.exact_hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": round((self.exact_hits + self.similar_hits) / lookups, 3) if lookups else 0.0,
+            }
+
+
+retrieval_cache = RetrievalCache()
+
+
+def invalidate_retrieval_cache(store=None):
+    """
+    Forget cached lookups after documents are added, changed or removed.
+
+    Starts a new shared generation so every worker's cache drops its entries
+    on its next lookup. Blocking; call it through run_db.
+
+    Args:
+        store: State store holding the generation (default: get_state_store())
+    """
+    generation = uuid.uuid4().hex
+    (store or get_state_store()).put_record(GENERATION_KIND, GENERATION_KEY, {"generation": generation})
+    retrieval_cache.clear(generation)
+
+
+__all__ = [
+    'GENERATION_KIND',
+    'GENERATION_KEY',
+    'normalize_query',
+    'RetrievalCache',
+    'retrieval_cache',
+    'invalidate_retrieval_cache',
+]
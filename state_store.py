@@ -0,0 +1,548 @@
+"""
+Sindh Police AI Meeting Member - Shared State Store
+Live meeting state (sessions, transcripts, motions, votes) and small keyed
+records (voice calls, notes jobs) behind one interface, held in process
+memory or in an SQLite database in WAL mode that every uvicorn worker shares
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from contextlib import contextmanager
+from dotenv import load_dotenv
+
+from database import DATA_DIR
+
+load_dotenv(override=True)
+
+# "memory" (single worker) or "sqlite" (any number of workers on one host)
+STATE_BACKEND = os.getenv("STATE_BACKEND", "memory").lower()
+STATE_DB_PATH = os.getenv("STATE_DB_PATH", os.path.join(DATA_DIR, "state.db"))
+# Ended meetings (and their transcript, motions, votes) are dropped from the
+# state store this long after they end; the meetings database keeps the minutes
+STATE_RETENTION_SECONDS = int(os.getenv("STATE_RETENTION_SECONDS", 24 * 3600))
+
+# Meeting fields with their own column; anything else (rolling summary etc.) is kept as JSON
+MEETING_COLUMNS = ("meeting_id", "status", "start_time", "end_time", "agenda", "started_by")
+
+
+class MeetingLimitError(Exception):
+    """Raised when a meeting, voice session or subscriber limit is reached."""
+
+
+class MemoryStateStore:
+    """
+    Process-local state store.
+
+    Returns copies, like the SQLite store, so callers never rely on
+    mutating what they read; all changes go through the store methods.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._meetings = {}
+        self._transcripts = {}
+        self._motions = {}
+        self._votes = []
+        self._records = {}
+
+    # --------------------------------------------------------------- meetings
+
+    def create_meeting(self, meeting: dict, max_active: int = None):
+        with self._lock:
+            existing = self._meetings.get(meeting["meeting_id"])
+            if existing and existing["status"] == "active":
+                raise ValueError(f"Meeting {meeting['meeting_id']} is already active")
+            if max_active is not None:
+                active = sum(1 for m in self._meetings.values() if m["status"] == "active")
+                if active >= max_active:
+                    raise MeetingLimitError(f"This server is already hosting {max_active} meetings")
+            self._meetings[meeting["meeting_id"]] = dict(meeting)
+            self._transcripts[meeting["meeting_id"]] = []
+            self._motions[meeting["meeting_id"]] = []
+
+    def get_meeting(self, meeting_id: str, include_records: bool = False) -> dict:
+        with self._lock:
+            meeting = self._meetings.get(meeting_id)
+            if meeting is None:
+                return None
+            meeting = dict(meeting)
+            if include_records:
+                meeting["transcript"] = list(self._transcripts[meeting_id])
+                meeting["motions"] = [dict(m) for m in self._motions[meeting_id]]
+                meeting["votes"] = [dict(v) for v in self._votes if v["meeting_id"] == meeting_id]
+            return meeting
+
+    def update_meeting(self, meeting_id: str, **fields) -> bool:
+        with self._lock:
+            if meeting_id not in self._meetings:
+                return False
+            self._meetings[meeting_id].update(fields)
+            return True
+
+    def end_meeting(self, meeting_id: str, end_time: str) -> bool:
+        """Mark an active meeting ended; False if it was not active."""
+        with self._lock:
+            meeting = self._meetings.get(meeting_id)
+            if not meeting or meeting["status"] != "active":
+                return False
+            meeting.update(status="ended", end_time=end_time)
+            return True
+
+    def list_meetings(self, status: str = None) -> list:
+        with self._lock:
+            return [dict(m) for m in self._meetings.values() if status is None or m["status"] == status]
+
+    def count_meetings(self) -> int:
+        with self._lock:
+            return len(self._meetings)
+
+    def delete_ended_meetings(self, ended_before: str) -> list:
+        """
+        Drop meetings that ended before ``ended_before`` with their records,
+        and votes older than it that belong to no meeting in the store.
+        """
+        with self._lock:
+            stale = [meeting_id for meeting_id, m in self._meetings.items()
+                     if m["status"] == "ended" and (m["end_time"] or "") < ended_before]
+            for meeting_id in stale:
+                del self._meetings[meeting_id]
+                self._transcripts.pop(meeting_id, None)
+                self._motions.pop(meeting_id, None)
+            self._votes = [v for v in self._votes if v["meeting_id"] in self._meetings
+                           or (v.get("timestamp") or "") >= ended_before]
+            return stale
+
+    # ------------------------------------------------------------- transcript
+
+    def add_transcript_entry(self, meeting_id: str, entry: dict) -> bool:
+        with self._lock:
+            if meeting_id not in self._meetings:
+                return False
+            self._transcripts[meeting_id].append(dict(entry))
+            return True
+
+    def get_transcript(self, meeting_id: str, start: int = 0) -> list:
+        with self._lock:
+            return [dict(e) for e in self._transcripts.get(meeting_id, [])[start:]]
+
+    # --------------------------------------------------------- motions, votes
+
+    def add_motion(self, motion: dict) -> bool:
+        """Store a motion if its meeting is active."""
+        with self._lock:
+            meeting = self._meetings.get(motion["meeting_id"])
+            if not meeting or meeting["status"] != "active":
+                return False
+            self._motions[motion["meeting_id"]].append(dict(motion))
+            return True
+
+    def update_motion(self, meeting_id: str, motion_id: str, **fields) -> bool:
+        with self._lock:
+            for motion in reversed(self._motions.get(meeting_id, [])):
+                if motion["motion_id"] == motion_id:
+                    motion.update(fields)
+                    return True
+            return False
+
+    def get_motions(self, meeting_id: str) -> list:
+        with self._lock:
+            return [dict(m) for m in self._motions.get(meeting_id, [])]
+
+    def add_vote(self, vote: dict):
+        with self._lock:
+            self._votes.append(dict(vote))
+
+    def get_votes(self, meeting_id: str = None) -> list:
+        with self._lock:
+            return [dict(v) for v in self._votes if meeting_id is None or v["meeting_id"] == meeting_id]
+
+    def count_votes(self) -> int:
+        with self._lock:
+            return len(self._votes)
+
+    # ---------------------------------------------------------------- records
+
+    def put_record(self, kind: str, key: str, record: dict):
+        with self._lock:
+            self._records.setdefault(kind, {})[key] = dict(record)
+
+    def get_record(self, kind: str, key: str) -> dict:
+        with self._lock:
+            record = self._records.get(kind, {}).get(key)
+            return dict(record) if record is not None else None
+
+    def update_record(self, kind: str, key: str, **fields) -> bool:
+        with self._lock:
+            record = self._records.get(kind, {}).get(key)
+            if record is None:
+                return False
+            record.update(fields)
+            return True
+
+    def list_records(self, kind: str) -> dict:
+        with self._lock:
+            return {key: dict(record) for key, record in self._records.get(kind, {}).items()}
+
+    def delete_records(self, kind: str, keys: list):
+        with self._lock:
+            for key in keys:
+                self._records.get(kind, {}).pop(key, None)
+
+    def acquire_lease(self, kind: str, key: str, owner: str, ttl_seconds: float) -> bool:
+        """Take or renew a lease unless another owner holds an unexpired one."""
+        now = time.time()
+        with self._lock:
+            leases = self._records.setdefault(kind, {})
+            lease = leases.get(key)
+            if lease and lease["owner"] != owner and lease["expires_at"] > now:
+                return False
+            leases[key] = {"owner": owner, "expires_at": now + ttl_seconds}
+            return True
+
+    def release_lease(self, kind: str, key: str, owner: str):
+        with self._lock:
+            leases = self._records.get(kind, {})
+            if leases.get(key, {}).get("owner") == owner:
+                del leases[key]
+
+
+class SQLiteStateStore:
+    """
+    State store in an SQLite database (WAL mode) shared by every worker
+    process on the host.
+
+    Each thread keeps its own connection. Read-modify-write operations run
+    in BEGIN IMMEDIATE transactions so concurrent workers can't interleave
+    them (e.g. a motion added while another worker ends the meeting).
+    """
+
+    def __init__(self, path: str = STATE_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._connection().executescript("""
+            CREATE TABLE IF NOT EXISTS live_meetings (
+                meeting_id  TEXT PRIMARY KEY,
+                status      TEXT NOT NULL,
+                start_time  TEXT NOT NULL,
+                end_time    TEXT,
+                agenda      TEXT DEFAULT '',
+                started_by  TEXT,
+                extra       TEXT NOT NULL DEFAULT '{}'
+            );
+
+            CREATE TABLE IF NOT EXISTS live_transcript (
+                id          INTEGER PRIMARY KEY AUTOINCREMENT,
+                meeting_id  TEXT NOT NULL,
+                entry       TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_live_transcript_meeting ON live_transcript(meeting_id, id);
+
+            CREATE TABLE IF NOT EXISTS live_motions (
+                id          INTEGER PRIMARY KEY AUTOINCREMENT,
+                meeting_id  TEXT NOT NULL,
+                motion_id   TEXT NOT NULL,
+                record      TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_live_motions_meeting ON live_motions(meeting_id, motion_id);
+
+            CREATE TABLE IF NOT EXISTS live_votes (
+                id          INTEGER PRIMARY KEY AUTOINCREMENT,
+                meeting_id  TEXT NOT NULL,
+                record      TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_live_votes_meeting ON live_votes(meeting_id);
+
+            CREATE TABLE IF NOT EXISTS live_records (
+                kind        TEXT NOT NULL,
+                key         TEXT NOT NULL,
+                record      TEXT NOT NULL,
+                PRIMARY KEY (kind, key)
+            );
+        """)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @staticmethod
+    def _meeting_row(row) -> dict:
+        meeting = {column: row[column] for column in MEETING_COLUMNS}
+        meeting.update(json.loads(row["extra"]))
+        return meeting
+
+    # --------------------------------------------------------------- meetings
+
+    def create_meeting(self, meeting: dict, max_active: int = None):
+        columns = {column: meeting.get(column) for column in MEETING_COLUMNS}
+        extra = {k: v for k, v in meeting.items() if k not in MEETING_COLUMNS}
+        # BEGIN IMMEDIATE: the active count and the insert can't interleave with another worker's
+        with self._transaction() as conn:
+            row = conn.execute("SELECT status FROM live_meetings WHERE meeting_id = ?",
+                               (meeting["meeting_id"],)).fetchone()
+            if row and row["status"] == "active":
+                raise ValueError(f"Meeting {meeting['meeting_id']} is already active")
+            if max_active is not None:
+                active = conn.execute("SELECT COUNT(*) FROM live_meetings WHERE status = 'active'").fetchone()[0]
+                if active >= max_active:
+                    raise MeetingLimitError(f"This server is already hosting {max_active} meetings")
+            # Restarting an ended meeting ID starts it afresh
+            conn.execute("DELETE FROM live_transcript WHERE meeting_id = ?", (meeting["meeting_id"],))
+            conn.execute("DELETE FROM live_motions WHERE meeting_id = ?", (meeting["meeting_id"],))
+            conn.execute(
+                f"INSERT OR REPLACE INTO live_meetings ({', '.join(MEETING_COLUMNS)}, extra) "
+                f"VALUES ({', '.join('?' * len(MEETING_COLUMNS))}, ?)",
+                (*columns.values(), json.dumps(extra))
+            )
+
+    def get_meeting(self, meeting_id: str, include_records: bool = False) -> dict:
+        conn = self._connection()
+        row = conn.execute("SELECT * FROM live_meetings WHERE meeting_id = ?", (meeting_id,)).fetchone()
+        if row is None:
+            return None
+        meeting = self._meeting_row(row)
+        if include_records:
+            meeting["transcript"] = self.get_transcript(meeting_id)
+            meeting["motions"] = self.get_motions(meeting_id)
+            meeting["votes"] = self.get_votes(meeting_id)
+        return meeting
+
+    def update_meeting(self, meeting_id: str, **fields) -> bool:
+        with self._transaction() as conn:
+            row = conn.execute("SELECT * FROM live_meetings WHERE meeting_id = ?", (meeting_id,)).fetchone()
+            if row is None:
+                return False
+            meeting = self._meeting_row(row)
+            meeting.update(fields)
+            extra = {k: v for k, v in meeting.items() if k not in MEETING_COLUMNS}
+            conn.execute(
+                "UPDATE live_meetings SET status = ?, start_time = ?, end_time = ?, agenda = ?, "
+                "started_by = ?, extra = ? WHERE meeting_id = ?",
+                (meeting["status"], meeting["start_time"], meeting["end_time"], meeting["agenda"],
+                 meeting["started_by"], json.dumps(extra), meeting_id)
+            )
+            return True
+
+    def end_meeting(self, meeting_id: str, end_time: str) -> bool:
+        """Mark an active meeting ended; False if it was not active."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE live_meetings SET status = 'ended', end_time = ? WHERE meeting_id = ? AND status = 'active'",
+                (end_time, meeting_id)
+            )
+            return cursor.rowcount == 1
+
+    def list_meetings(self, status: str = None) -> list:
+        conn = self._connection()
+        if status is None:
+            rows = conn.execute("SELECT * FROM live_meetings").fetchall()
+        else:
+            rows = conn.execute("SELECT * FROM live_meetings WHERE status = ?", (status,)).fetchall()
+        return [self._meeting_row(row) for row in rows]
+
+    def count_meetings(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM live_meetings").fetchone()[0]
+
+    def delete_ended_meetings(self, ended_before: str) -> list:
+        """
+        Drop meetings that ended before ``ended_before`` with their records,
+        and votes older than it that belong to no meeting in the store.
+        """
+        with self._transaction() as conn:
+            stale = [row["meeting_id"] for row in conn.execute(
+                "SELECT meeting_id FROM live_meetings WHERE status = 'ended' AND end_time < ?", (ended_before,)
+            )]
+            params = [(meeting_id,) for meeting_id in stale]
+            for table in ("live_transcript", "live_motions", "live_votes", "live_meetings"):
+                conn.executemany(f"DELETE FROM {table} WHERE meeting_id = ?", params)
+            conn.execute(
+                "DELETE FROM live_votes WHERE json_extract(record, '$.timestamp') < ? "
+                "AND meeting_id NOT IN (SELECT meeting_id FROM live_meetings)", (ended_before,)
+            )
+            return stale
+
+    # ------------------------------------------------------------- transcript
+
+    def add_transcript_entry(self, meeting_id: str, entry: dict) -> bool:
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "INSERT INTO live_transcript (meeting_id, entry) "
+                "SELECT ?, ? WHERE EXISTS (SELECT 1 FROM live_meetings WHERE meeting_id = ?)",
+                (meeting_id, json.dumps(entry), meeting_id)
+            )
+            return cursor.rowcount == 1
+
+    def get_transcript(self, meeting_id: str, start: int = 0) -> list:
+        rows = self._connection().execute(
+            "SELECT entry FROM live_transcript WHERE meeting_id = ? ORDER BY id LIMIT -1 OFFSET ?",
+            (meeting_id, start)
+        ).fetchall()
+        return [json.loads(row["entry"]) for row in rows]
+
+    # --------------------------------------------------------- motions, votes
+
+    def add_motion(self, motion: dict) -> bool:
+        """Store a motion if its meeting is active."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "INSERT INTO live_motions (meeting_id, motion_id, record) SELECT ?, ?, ? "
+                "WHERE EXISTS (SELECT 1 FROM live_meetings WHERE meeting_id = ? AND status = 'active')",
+                (motion["meeting_id"], motion["motion_id"], json.dumps(motion), motion["meeting_id"])
+            )
+            return cursor.rowcount == 1
+
+    def update_motion(self, meeting_id: str, motion_id: str, **fields) -> bool:
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT id, record FROM live_motions WHERE meeting_id = ? AND motion_id = ? ORDER BY id DESC LIMIT 1",
+                (meeting_id, motion_id)
+            ).fetchone()
+            if row is None:
+                return False
+            motion = json.loads(row["record"])
+            motion.update(fields)
+            conn.execute("UPDATE live_motions SET record = ? WHERE id = ?", (json.dumps(motion), row["id"]))
+            return True
+
+    def get_motions(self, meeting_id: str) -> list:
+        rows = self._connection().execute(
+            "SELECT record FROM live_motions WHERE meeting_id = ? ORDER BY id", (meeting_id,)
+        ).fetchall()
+        return [json.loads(row["record"]) for row in rows]
+
+    def add_vote(self, vote: dict):
+        with self._transaction() as conn:
+            conn.execute("INSERT INTO live_votes (meeting_id, record) VALUES (?, ?)",
+                         (vote["meeting_id"], json.dumps(vote)))
+
+    def get_votes(self, meeting_id: str = None) -> list:
+        conn = self._connection()
+        if meeting_id is None:
+            rows = conn.execute("SELECT record FROM live_votes ORDER BY id").fetchall()
+        else:
+            rows = conn.execute("SELECT record FROM live_votes WHERE meeting_id = ? ORDER BY id",
+                                (meeting_id,)).fetchall()
+        return [json.loads(row["record"]) for row in rows]
+
+    def count_votes(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM live_votes").fetchone()[0]
+
+    # ---------------------------------------------------------------- records
+
+    def put_record(self, kind: str, key: str, record: dict):
+        with self._transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO live_records (kind, key, record) VALUES (?, ?, ?)",
+                         (kind, key, json.dumps(record)))
+
+    def get_record(self, kind: str, key: str) -> dict:
+        row = self._connection().execute(
+            "SELECT record FROM live_records WHERE kind = ? AND key = ?", (kind, key)
+        ).fetchone()
+        return json.loads(row["record"]) if row else None
+
+    def update_record(self, kind: str, key: str, **fields) -> bool:
+        with self._transaction() as conn:
+            row = conn.execute("SELECT record FROM live_records WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+            if row is None:
+                return False
+            record = json.loads(row["record"])
+            record.update(fields)
+            conn.execute("UPDATE live_records SET record = ? WHERE kind = ? AND key = ?",
+                         (json.dumps(record), kind, key))
+            return True
+
+    def list_records(self, kind: str) -> dict:
+        rows = self._connection().execute("SELECT key, record FROM live_records WHERE kind = ?", (kind,)).fetchall()
+        return {row["key"]: json.loads(row["record"]) for row in rows}
+
+    def delete_records(self, kind: str, keys: list):
+        with self._transaction() as conn:
+            conn.executemany("DELETE FROM live_records WHERE kind = ? AND key = ?", [(kind, key) for key in keys])
+
+    def acquire_lease(self, kind: str, key: str, owner: str, ttl_seconds: float) -> bool:
+        """Take or renew a lease unless another worker holds an unexpired one."""
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute("SELECT record FROM live_records WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+            if row:
+                lease = json.loads(row["record"])
+                if lease["owner"] != owner and lease["expires_at"] > now:
+                    return False
+            conn.execute("INSERT OR REPLACE INTO live_records (kind, key, record) VALUES (?, ?, ?)",
+                         (kind, key, json.dumps({"owner": owner, "expires_at": now + ttl_seconds})))
+            return True
+
+    def release_lease(self, kind: str, key: str, owner: str):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM live_records WHERE kind = ? AND key = ? AND json_extract(record, '$.owner') = ?",
+                         (kind, key, owner))
+
+
+def prune_ended_meetings(store, max_age_seconds: int = STATE_RETENTION_SECONDS, now: float = None) -> list:
+    """
+    Remove meetings that ended more than ``max_age_seconds`` ago from the
+    state store, with their transcript, motions and votes.
+
+    Meeting and vote timestamps are ISO strings in Asia/Karachi time, so the
+    cutoff is compared as a string in the same zone.
+
+    Args:
+        store: State store to prune
+        max_age_seconds: Retention window
+        now: Current epoch time (defaults to time.time())
+
+    Returns:
+        List of removed meeting IDs
+    """
+    cutoff = datetime.fromtimestamp((now or time.time()) - max_age_seconds, ZoneInfo("Asia/Karachi"))
+    return store.delete_ended_meetings(cutoff.isoformat())
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_state_store():
+    """Process-wide state store selected by STATE_BACKEND."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if STATE_BACKEND == "sqlite":
+                    _store = SQLiteStateStore()
+                    print(f"✅ Shared state store: SQLite ({STATE_DB_PATH})")
+                else:
+                    _store = MemoryStateStore()
+    return _store
+
+
+__all__ = [
+    'STATE_BACKEND',
+    'STATE_RETENTION_SECONDS',
+    'MeetingLimitError',
+    'MemoryStateStore',
+    'SQLiteStateStore',
+    'prune_ended_meetings',
+    'get_state_store',
+]
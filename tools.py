@@ -9,25 +9,36 @@ from datetime import datetime
 from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
 
+from retrieval import retrieve_context, RAG_TOP_K, HYBRID_ALPHA
+from state_store import get_state_store
+from minutes_writer import minutes_writer
+
 load_dotenv(override=True)
 
 
-# In-memory storage for meeting data
-meeting_sessions = {}
-vote_history = []
-transcript_buffer = []
+# Meeting sessions, transcripts, motions and votes live in the state store
+# (process memory, or SQLite shared by all workers - see STATE_BACKEND).
+# Every change is also queued to minutes_writer, which writes it to the
+# meetings database while the meeting runs.
+state = get_state_store()
 
 
-def start_meeting_session(meeting_id: str, agenda: str = "") -> dict:
+def start_meeting_session(meeting_id: str, agenda: str = "", started_by: str = None,
+                          max_active: int = None) -> dict:
     """
     Start a new board meeting session.
     
     Args:
         meeting_id: Unique identifier for the meeting
         agenda: Optional agenda items for the meeting
+        started_by: Username of whoever started it
+        max_active: Refuse to start it when this many meetings are already active
         
     Returns:
         Meeting session details
+
+    Raises:
+        MeetingLimitError: max_active meetings are already active
     """
     karachi_tz = ZoneInfo("Asia/Karachi")
     now = datetime.now(karachi_tz)
@@ -36,13 +47,17 @@ def start_meeting_session(meeting_id: str, agenda: str = "") -> dict:
         "meeting_id": meeting_id,
         "status": "active",
         "start_time": now.isoformat(),
+        "end_time": None,
         "agenda": agenda,
-        "transcript": [],
-        "votes": [],
-        "motions": []
+        "started_by": started_by
     }
     
-    meeting_sessions[meeting_id] = session
+    try:
+        state.create_meeting(session, max_active=max_active)
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
+    # Written before returning, so the meeting row exists before any worker queues rows for it
+    minutes_writer.write_now("meeting_started", {**session, "started_by": started_by or ""})
     print(f"✅ Meeting session started: {meeting_id}")
     
     return {
@@ -62,15 +77,12 @@ def end_meeting_session(meeting_id: str) -> dict:
     Returns:
         Meeting summary
     """
-    if meeting_id not in meeting_sessions:
-        return {"success": False, "error": "Meeting session not found"}
-    
     karachi_tz = ZoneInfo("Asia/Karachi")
     now = datetime.now(karachi_tz)
     
-    session = meeting_sessions[meeting_id]
-    session["status"] = "ended"
-    session["end_time"] = now.isoformat()
+    if not state.end_meeting(meeting_id, now.isoformat()):
+        return {"success": False, "error": "Meeting session not found or already ended"}
+    session = state.get_meeting(meeting_id, include_records=True)
     
     # Calculate duration
     start = datetime.fromisoformat(session["start_time"])
@@ -84,6 +96,7 @@ def end_meeting_session(meeting_id: str) -> dict:
         "motions_discussed": len(session["motions"]),
         "end_time": now.isoformat()
     }
+    minutes_writer.enqueue("meeting_ended", summary)
     
     print(f"✅ Meeting session ended: {meeting_id}")
     return summary
@@ -131,11 +144,8 @@ def cast_vote(
     }
     
     # Store vote
-    vote_history.append(vote_record)
-    
-    # Add to meeting session if active
-    if meeting_id in meeting_sessions:
-        meeting_sessions[meeting_id]["votes"].append(vote_record)
+    state.add_vote(vote_record)
+    minutes_writer.enqueue("vote", vote_record)
     
     print(f"✅ Vote cast: {vote.upper()} on '{motion_description[:50]}...'")
     
@@ -170,8 +180,9 @@ def add_motion(meeting_id: str, motion_text: str, proposed_by: str = "Secretary"
         "ai_vote": None
     }
     
-    if meeting_id in meeting_sessions:
-        meeting_sessions[meeting_id]["motions"].append(motion_record)
+    if not state.add_motion(motion_record):
+        return {"success": False, "error": f"Meeting {meeting_id} is not active"}
+    minutes_writer.enqueue("motion", motion_record)
     
     print(f"📋 Motion added: {motion_text[:50]}...")
     
@@ -191,19 +202,21 @@ def get_meeting_status(meeting_id: str) -> dict:
     Returns:
         Meeting status and statistics
     """
-    if meeting_id not in meeting_sessions:
+    session = state.get_meeting(meeting_id)
+    if not session:
         return {"success": False, "error": "Meeting not found"}
-    
-    session = meeting_sessions[meeting_id]
+    motions = state.get_motions(meeting_id)
     
     return {
         "success": True,
         "meeting_id": meeting_id,
         "status": session["status"],
         "start_time": session["start_time"],
-        "votes_cast": len(session["votes"]),
-        "motions_pending": len([m for m in session["motions"] if m["status"] == "pending"]),
-        "motions_voted": len([m for m in session["motions"] if m["status"] != "pending"])
+        "votes_cast": len(state.get_votes(meeting_id)),
+        "motions_pending": len([m for m in motions if m["status"] == "pending"]),
+        "motions_voted": len([m for m in motions if m["status"] != "pending"]),
+        "rolling_summary": session.get("rolling_summary", ""),
+        "summary_updated_at": session.get("summary_updated_at")
     }
 
 
@@ -217,12 +230,10 @@ def get_vote_history(meeting_id: str = None) -> list:
     Returns:
         List of vote records
     """
-    if meeting_id:
-        return [v for v in vote_history if v["meeting_id"] == meeting_id]
-    return vote_history
+    return state.get_votes(meeting_id)
 
 
-def add_transcript_entry(meeting_id: str, speaker: str, text: str) -> dict:
+def add_transcript_entry(meeting_id: str, speaker: str, text: str, timestamp: str = None) -> dict:
     """
     Add a transcript entry to the meeting record.
     
@@ -230,56 +241,170 @@ def add_transcript_entry(meeting_id: str, speaker: str, text: str) -> dict:
         meeting_id: Current meeting ID
         speaker: Who is speaking
         text: What was said
+        timestamp: Optional ISO timestamp (defaults to now)
         
     Returns:
         Transcript entry
     """
-    karachi_tz = ZoneInfo("Asia/Karachi")
-    now = datetime.now(karachi_tz)
+    if timestamp is None:
+        karachi_tz = ZoneInfo("Asia/Karachi")
+        timestamp = datetime.now(karachi_tz).isoformat()
     
     entry = {
-        "timestamp": now.isoformat(),
+        "timestamp": timestamp,
         "speaker": speaker,
         "text": text
     }
     
-    if meeting_id in meeting_sessions:
-        meeting_sessions[meeting_id]["transcript"].append(entry)
-    
-    transcript_buffer.append(entry)
+    if state.add_transcript_entry(meeting_id, entry):
+        minutes_writer.enqueue("transcript", {**entry, "meeting_id": meeting_id})
     
     return {"success": True, "entry": entry}
 
 
-def get_transcript(meeting_id: str) -> list:
+class TranscriptAccumulator:
+    """
+    Collects streamed transcript deltas for one speaker turn and stores
+    them as a single transcript entry when the turn is flushed.
     """
-    Get the full transcript for a meeting.
+    
+    def __init__(self, speaker: str):
+        self.speaker = speaker
+        self._parts = []
+        self._started_at = None
+    
+    def append(self, delta: str):
+        """Add a transcript delta to the current turn."""
+        if not delta:
+            return
+        if self._started_at is None:
+            self._started_at = datetime.now(ZoneInfo("Asia/Karachi")).isoformat()
+        self._parts.append(delta)
+    
+    def flush(self, meeting_id: str) -> dict:
+        """
+        Store the accumulated turn as one transcript entry and reset.
+        
+        Args:
+            meeting_id: Meeting the turn belongs to
+            
+        Returns:
+            Transcript entry result, or None if there was nothing to store
+        """
+        text = "".join(self._parts).strip()
+        started_at = self._started_at
+        self._parts = []
+        self._started_at = None
+        
+        if not text or not meeting_id:
+            return None
+        return add_transcript_entry(meeting_id, self.speaker, text, timestamp=started_at)
+
+
+def get_transcript(meeting_id: str, start: int = 0) -> list:
+    """
+    Get the transcript for a meeting.
     
     Args:
         meeting_id: Meeting ID
+        start: Index of the first entry to return
         
     Returns:
         List of transcript entries
     """
-    if meeting_id in meeting_sessions:
-        return meeting_sessions[meeting_id]["transcript"]
-    return []
+    return state.get_transcript(meeting_id, start)
+
+
+def get_meeting_session(meeting_id: str, include_records: bool = True) -> dict:
+    """
+    Get a snapshot of a meeting session.
+    
+    Args:
+        meeting_id: Meeting ID
+        include_records: Include the transcript, votes and motions
+        
+    Returns:
+        Session dict, or None if the meeting is unknown
+    """
+    return state.get_meeting(meeting_id, include_records=include_records)
+
+
+def update_meeting_session(meeting_id: str, **fields) -> bool:
+    """Set fields on a meeting session (e.g. the rolling summary)."""
+    return state.update_meeting(meeting_id, **fields)
 
 
-def request_regulatory_context(query: str) -> dict:
+def list_active_meetings() -> list:
+    """Sessions of all meetings currently active on any worker."""
+    return state.list_meetings(status="active")
+
+
+def get_motions(meeting_id: str) -> list:
+    """Motions raised in a meeting, oldest first."""
+    return state.get_motions(meeting_id)
+
+
+def update_motion(meeting_id: str, motion_id: str, **fields) -> bool:
+    """Set fields on a motion record (e.g. its prepared regulatory context)."""
+    updated = state.update_motion(meeting_id, motion_id, **fields)
+    if updated and "status" in fields:
+        minutes_writer.enqueue("motion_status", {
+            "meeting_id": meeting_id, "motion_id": motion_id, "status": fields["status"]
+        })
+    return updated
+
+
+def get_state_counts() -> dict:
+    """Totals for the system status endpoint."""
+    return {"total_meetings": state.count_meetings(), "total_votes": state.count_votes()}
+
+
+async def request_regulatory_context(query: str, top_k: int = RAG_TOP_K, source: str = None,
+                                     alpha: float = HYBRID_ALPHA) -> dict:
     """
     Request regulatory context for a specific topic or question.
     
     Args:
         query: The topic or question to search for
+        top_k: Number of document chunks to retrieve
+        source: Optionally restrict the search to one document
+        alpha: Vector weight in the hybrid ranking (0 = BM25 only, 1 = vector only)
         
     Returns:
-        Empty context (RAG feature removed)
+        Formatted context with the cited sources and retrieval timings
     """
+    try:
+        result = await retrieve_context(query, top_k=top_k, source=source, alpha=alpha)
+    except Exception as e:
+        print(f"⚠️ Regulatory context retrieval failed: {e}")
+        return {
+            "success": False,
+            "query": query,
+            "context": "",
+            "error": str(e)
+        }
+    
+    timings = ", ".join(f"{step} {ms}ms" for step, ms in result["timings_ms"].items())
+    print(f"📚 Retrieved {len(result['matches'])} chunks for '{query[:60]}' "
+          f"(cache {result['cache']}{', ' + timings if timings else ''})")
+    
     return {
         "success": True,
         "query": query,
-        "context": "RAG feature has been removed."
+        "context": result["context"],
+        "sources": [
+            {
+                "source": m["source"],
+                "chunk_index": m["chunk_index"],
+                "score": m["score"],
+                "vector_score": m["vector_score"],
+                "lexical_score": m["lexical_score"]
+            }
+            for m in result["matches"]
+        ],
+        "alpha": result["alpha"],
+        "cache": result["cache"],
+        "timings_ms": result["timings_ms"]
     }
 
 
@@ -292,8 +417,13 @@ __all__ = [
     'get_meeting_status',
     'get_vote_history',
     'add_transcript_entry',
+    'TranscriptAccumulator',
     'get_transcript',
-    'request_regulatory_context',
-    'meeting_sessions',
-    'vote_history'
+    'get_meeting_session',
+    'update_meeting_session',
+    'list_active_meetings',
+    'get_motions',
+    'update_motion',
+    'get_state_counts',
+    'request_regulatory_context'
 ]
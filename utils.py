@@ -2,13 +2,15 @@
 Sindh Police AI Meeting Member - Utility Functions
 """
 
+import re
 import uuid
-import io
+import numpy as np
 from pydub import AudioSegment
-import audioop
 from datetime import timezone, timedelta
 import datetime
 
+from audio_codec import ulaw_to_pcm16
+
 
 try:
     import pyaudio
@@ -23,12 +25,20 @@ else:
 CHANNELS = 1
 RATE = 8000
 
+# Call IDs end up in recording file names, so only these are accepted from clients
+CALL_ID_PATTERN = re.compile(r"[A-Za-z0-9-]{1,64}")
+
 
 def generate_call_id():
     """Generate a unique call/session ID."""
     return str(uuid.uuid4())
 
 
+def is_valid_call_id(call_id) -> bool:
+    """True if ``call_id`` is safe to use in a file name (see CALL_ID_PATTERN)."""
+    return isinstance(call_id, str) and CALL_ID_PATTERN.fullmatch(call_id) is not None
+
+
 def get_total_duration_ms(events):
     """Return total duration in milliseconds based on recorded events."""
     if not events:
@@ -39,31 +49,54 @@ def get_total_duration_ms(events):
     return total
 
 
-def merge_timeline_events(events, total_duration_ms):
+def mix_timeline_pcm(events, total_duration_ms):
     """
-    Create a full-length AudioSegment by overlaying each audio chunk at its proper offset.
-    The events list is sorted by timestamp before overlay.
+    Mix (offset_seconds, ulaw_bytes) events into one int16 sample array.
+    Each chunk is decoded and added at its sample offset with saturating
+    arithmetic, so the cost is linear in the amount of audio.
     """
-    base = AudioSegment.silent(duration=total_duration_ms, frame_rate=RATE)
+    total_samples = int(total_duration_ms * RATE / 1000)
+    mix = np.zeros(total_samples, dtype=np.int16)
+    scratch = np.empty(CHUNK, dtype=np.int32)
     sorted_events = sorted(events, key=lambda x: x[0])
-    
+
     for offset, audio_data in sorted_events:
         try:
-            pcm_audio = audioop.ulaw2lin(audio_data, 2)
-            seg = AudioSegment.from_raw(
-                io.BytesIO(pcm_audio), 
-                frame_rate=RATE, 
-                channels=1, 
-                sample_width=2
-            )
-            base = base.overlay(seg, position=int(offset * 1000))
+            samples = ulaw_to_pcm16(audio_data)
+            # Same ms -> sample rounding as AudioSegment.overlay(position=...)
+            start = int(int(offset * 1000) * RATE / 1000)
+            end = min(start + samples.size, total_samples)
+            if end <= start:
+                continue
+            if end - start > scratch.size:
+                scratch = np.empty(end - start, dtype=np.int32)
+            acc = scratch[:end - start]
+            np.add(mix[start:end], samples[:end - start], out=acc, dtype=np.int32)
+            np.clip(acc, -32768, 32767, out=acc)
+            mix[start:end] = acc
         except Exception as e:
             print(f"Error overlaying chunk at {offset:.2f} sec: {e}")
-    return base
+    return mix
+
+
+def merge_timeline_events(events, total_duration_ms):
+    """
+    Create a full-length AudioSegment by mixing each audio chunk at its proper offset.
+    The events list is sorted by timestamp before mixing.
+    """
+    mix = mix_timeline_pcm(events, total_duration_ms)
+    return AudioSegment(
+        data=mix.tobytes(),
+        sample_width=2,
+        frame_rate=RATE,
+        channels=1
+    )
 
 
 def make_filenames(call_id):
     """Generate recording filenames for a call/session."""
+    if not is_valid_call_id(call_id):
+        raise ValueError(f"Invalid call ID: {call_id!r}")
     return (
         f"call_{call_id}_incoming.wav",
         f"call_{call_id}_outgoing.wav",
@@ -0,0 +1,383 @@
+"""
+Sindh Police AI Meeting Member - Local Vector Store
+In-process vector index: a memory-mapped float32 matrix plus a JSON sidecar
+with IDs and chunk metadata, searched by cosine similarity in NumPy with
+optional IVF partitioning for large corpora. Exposes the subset of the
+Pinecone Index API used by ingestion so either backend can be plugged in.
+"""
+
+import os
+import json
+import threading
+from contextlib import contextmanager
+from types import SimpleNamespace
+import numpy as np
+from dotenv import load_dotenv
+
+from database import DATA_DIR
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+load_dotenv(override=True)
+
+VECTOR_STORE_DIR = os.getenv("VECTOR_STORE_DIR", os.path.join(DATA_DIR, "vector_store"))
+# Build IVF partitions once the corpus reaches this many vectors (0 disables IVF)
+LOCAL_IVF_MIN_VECTORS = int(os.getenv("LOCAL_IVF_MIN_VECTORS", 20000))
+LOCAL_IVF_NPROBE = int(os.getenv("LOCAL_IVF_NPROBE", 8))
+LOCAL_IVF_ITERATIONS = 10
+LOCAL_IVF_TRAIN_SAMPLE = 20000
+
+VECTORS_FILE = "vectors.npy"
+METADATA_FILE = "metadata.json"
+IVF_FILE = "ivf.npz"
+LOCK_FILE = "persist.lock"
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _matches_filter(metadata: dict, filter: dict) -> bool:
+    for key, condition in filter.items():
+        value = metadata.get(key)
+        if isinstance(condition, dict):
+            if "$eq" in condition and value != condition["$eq"]:
+                return False
+            if "$in" in condition and value not in condition["$in"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+def _source_rows(filter: dict, by_source: dict):
+    """Rows for the filter's ``source`` condition from the source index, or None if it has none."""
+    condition = filter.get("source")
+    if isinstance(condition, dict):
+        if "$eq" in condition:
+            sources = [condition["$eq"]]
+        elif "$in" in condition:
+            sources = list(condition["$in"])
+        else:
+            return None
+    elif condition is not None:
+        sources = [condition]
+    else:
+        return None
+    rows = [by_source[source] for source in sources if source in by_source]
+    if not rows:
+        return np.empty(0, dtype=np.int64)
+    return np.unique(np.concatenate(rows))
+
+
+def build_ivf(matrix: np.ndarray, n_lists: int, iterations: int = LOCAL_IVF_ITERATIONS, seed: int = 0):
+    """
+    Partition unit vectors with spherical k-means.
+
+    Args:
+        matrix: (N, D) L2-normalized vectors
+        n_lists: Number of partitions
+        iterations: k-means iterations over the training sample
+
+    Returns:
+        (centroids, assignments) - (n_lists, D) float32 and (N,) int32
+    """
+    rng = np.random.default_rng(seed)
+    n = matrix.shape[0]
+    sample = matrix[np.sort(rng.choice(n, size=min(n, LOCAL_IVF_TRAIN_SAMPLE), replace=False))]
+    centroids = sample[rng.choice(sample.shape[0], size=n_lists, replace=False)].copy()
+
+    for _ in range(iterations):
+        labels = np.argmax(sample @ centroids.T, axis=1)
+        for k in range(n_lists):
+            members = sample[labels == k]
+            if len(members):
+                centroids[k] = members.sum(axis=0)
+        centroids = _normalize(centroids).astype(np.float32)
+
+    assignments = np.empty(n, dtype=np.int32)
+    for start in range(0, n, 8192):
+        assignments[start:start + 8192] = np.argmax(matrix[start:start + 8192] @ centroids.T, axis=1)
+    return centroids, assignments
+
+
+class LocalVectorStore:
+    """
+    File-backed cosine-similarity index.
+
+    Writes (upsert/delete) are buffered in memory and applied by persist(),
+    which rewrites the matrix and sidecar atomically. Readers memory-map
+    the matrix and reload automatically when another process persists.
+    Persists from several processes (uvicorn workers, reset_and_ingest.py)
+    are serialized with a lock file, and each starts from the files the
+    previous one wrote, so no process overwrites another's vectors.
+    """
+
+    def __init__(self, directory: str = VECTOR_STORE_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.RLock()
+        self._pending_upserts = {}
+        self._pending_deletes = set()
+        self._loaded_mtime = None
+        self._load()
+
+    # ------------------------------------------------------------------ files
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _current_mtime(self):
+        # Each persist replaces the sidecar, so a new inode or size also marks a change
+        try:
+            stat = os.stat(self._path(METADATA_FILE))
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_ino, stat.st_size
+
+    @contextmanager
+    def _process_lock(self):
+        """Exclusive lock shared by every process using this directory (thread lock only without fcntl)."""
+        if fcntl is None:
+            yield
+            return
+        with open(self._path(LOCK_FILE), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _load(self):
+        mtime = self._current_mtime()
+        self._ids = []
+        self._metadata = []
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._centroids = None
+        self._lists = None
+        if mtime is not None:
+            with open(self._path(METADATA_FILE), "r", encoding="utf-8") as f:
+                sidecar = json.load(f)
+            self._ids = sidecar["ids"]
+            self._metadata = sidecar["metadata"]
+            if self._ids:
+                self._matrix = np.load(self._path(VECTORS_FILE), mmap_mode="r")
+            if sidecar.get("ivf") and os.path.exists(self._path(IVF_FILE)):
+                ivf = np.load(self._path(IVF_FILE))
+                self._centroids = ivf["centroids"]
+                assignments = ivf["assignments"]
+                order = np.argsort(assignments, kind="stable")
+                bounds = np.searchsorted(assignments[order], np.arange(len(self._centroids) + 1))
+                self._lists = [order[bounds[k]:bounds[k + 1]] for k in range(len(self._centroids))]
+        self._positions = {vector_id: i for i, vector_id in enumerate(self._ids)}
+        # Retrieval filters by document, so filtered queries start from that document's rows
+        by_source = {}
+        for i, metadata in enumerate(self._metadata):
+            by_source.setdefault(metadata.get("source"), []).append(i)
+        self._by_source = {source: np.array(rows, dtype=np.int64) for source, rows in by_source.items()}
+        self._loaded_mtime = mtime
+
+    def _refresh(self):
+        """Pick up changes persisted by another process (e.g. reset_and_ingest.py)."""
+        if self._current_mtime() != self._loaded_mtime:
+            with self._lock:
+                if self._current_mtime() != self._loaded_mtime:
+                    self._load()
+
+    # ----------------------------------------------------------------- writes
+
+    def upsert(self, vectors: list):
+        """Buffer vectors given as {"id", "values", "metadata"} dicts."""
+        with self._lock:
+            for vector in vectors:
+                self._pending_deletes.discard(vector["id"])
+                self._pending_upserts[vector["id"]] = (vector["values"], vector.get("metadata") or {})
+
+    def delete(self, ids: list = None, filter: dict = None, delete_all: bool = False):
+        """Buffer deletion by ID, by metadata filter, or of everything."""
+        with self._lock:
+            if delete_all:
+                self._pending_upserts.clear()
+                self._pending_deletes.update(self._ids)
+                return
+            targets = set(ids or [])
+            if filter:
+                rows = _source_rows(filter, self._by_source)
+                if rows is None:
+                    rows = range(len(self._ids))
+                targets.update(
+                    self._ids[i] for i in rows if _matches_filter(self._metadata[i], filter)
+                )
+                targets.update(
+                    vector_id for vector_id, (_, metadata) in self._pending_upserts.items()
+                    if _matches_filter(metadata, filter)
+                )
+            for vector_id in targets:
+                self._pending_upserts.pop(vector_id, None)
+                # Kept even if not loaded yet: another process may have added it
+                self._pending_deletes.add(vector_id)
+
+    def persist(self):
+        """Apply buffered writes: rewrite the matrix, sidecar and IVF partitions."""
+        with self._lock:
+            if not self._pending_upserts and not self._pending_deletes:
+                self._refresh()
+                return
+            with self._process_lock():
+                self._persist_locked()
+
+    def _persist_locked(self):
+        # Start from what is on disk now, whatever another process wrote since our last load
+        self._load()
+        replaced = self._pending_deletes | set(self._pending_upserts)
+        keep = np.array([i for i, vector_id in enumerate(self._ids) if vector_id not in replaced], dtype=np.int64)
+        new_ids = list(self._pending_upserts)
+        new_rows = None
+        if new_ids:
+            new_rows = _normalize(np.asarray(
+                [self._pending_upserts[vector_id][0] for vector_id in new_ids], dtype=np.float32
+            ))
+
+        dimension = new_rows.shape[1] if new_rows is not None else self._matrix.shape[1]
+        ids = [self._ids[i] for i in keep] + new_ids
+        metadata = [self._metadata[i] for i in keep] + [self._pending_upserts[v][1] for v in new_ids]
+
+        tmp_vectors = self._path(VECTORS_FILE + ".tmp")
+        if ids:
+            out = np.lib.format.open_memmap(tmp_vectors, mode="w+", dtype=np.float32, shape=(len(ids), dimension))
+            for start in range(0, len(keep), 8192):
+                rows = keep[start:start + 8192]
+                out[start:start + len(rows)] = self._matrix[rows]
+            if new_rows is not None:
+                out[len(keep):] = new_rows
+            out.flush()
+
+            use_ivf = LOCAL_IVF_MIN_VECTORS and len(ids) >= LOCAL_IVF_MIN_VECTORS
+            if use_ivf:
+                centroids, assignments = build_ivf(out, int(np.sqrt(len(ids))))
+                np.savez(self._path(IVF_FILE + ".tmp.npz"), centroids=centroids, assignments=assignments)
+            del out
+        else:
+            use_ivf = False
+
+        tmp_metadata = self._path(METADATA_FILE + ".tmp")
+        with open(tmp_metadata, "w", encoding="utf-8") as f:
+            json.dump({"dimension": dimension, "ids": ids, "metadata": metadata, "ivf": bool(use_ivf)}, f)
+
+        # Matrix and IVF first, sidecar last: readers reload on the sidecar's mtime
+        if ids:
+            os.replace(tmp_vectors, self._path(VECTORS_FILE))
+        if use_ivf:
+            os.replace(self._path(IVF_FILE + ".tmp.npz"), self._path(IVF_FILE))
+        os.replace(tmp_metadata, self._path(METADATA_FILE))
+
+        self._pending_upserts.clear()
+        self._pending_deletes.clear()
+        self._load()
+        print(f"💾 Local vector store saved: {len(ids)} vectors{' (IVF)' if use_ivf else ''}")
+
+    # ------------------------------------------------------------------ reads
+
+    def query(self, vector: list, top_k: int = 5, filter: dict = None,
+              include_metadata: bool = True, nprobe: int = LOCAL_IVF_NPROBE, **_):
+        """
+        Cosine-similarity search over persisted vectors.
+
+        Args:
+            vector: Query embedding
+            top_k: Number of matches to return
+            filter: Optional metadata equality filter, e.g. {"source": name}
+            include_metadata: Return chunk metadata with each match
+            nprobe: IVF partitions to scan when partitions exist
+
+        Returns:
+            Object with a ``matches`` list of (id, score, metadata)
+        """
+        self._refresh()
+        with self._lock:
+            matrix, ids, metadata = self._matrix, self._ids, self._metadata
+            centroids, lists, by_source = self._centroids, self._lists, self._by_source
+        if not ids:
+            return SimpleNamespace(matches=[])
+
+        q = np.asarray(vector, dtype=np.float32)
+        q = q / (np.linalg.norm(q) or 1.0)
+
+        if centroids is not None and not filter:
+            probe = np.argsort(centroids @ q)[::-1][:nprobe]
+            candidates = np.sort(np.concatenate([lists[k] for k in probe]))
+        elif filter:
+            candidates = _source_rows(filter, by_source)
+            if candidates is None:
+                candidates = np.array([i for i, m in enumerate(metadata) if _matches_filter(m, filter)], dtype=np.int64)
+            elif len(filter) > 1:
+                candidates = np.array([i for i in candidates if _matches_filter(metadata[i], filter)], dtype=np.int64)
+        else:
+            candidates = None
+
+        if candidates is None:
+            scores = matrix @ q
+            rows = np.arange(len(ids))
+        else:
+            if not len(candidates):
+                return SimpleNamespace(matches=[])
+            scores = matrix[candidates] @ q
+            rows = candidates
+
+        k = min(top_k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return SimpleNamespace(matches=[
+            SimpleNamespace(
+                id=ids[rows[i]],
+                score=float(scores[i]),
+                metadata=metadata[rows[i]] if include_metadata else None
+            )
+            for i in best
+        ])
+
+    def fetch(self, ids: list):
+        """Persisted vectors (id -> metadata only) for the IDs that exist."""
+        self._refresh()
+        with self._lock:
+            return SimpleNamespace(vectors={
+                vector_id: SimpleNamespace(id=vector_id, metadata=self._metadata[self._positions[vector_id]])
+                for vector_id in ids if vector_id in self._positions
+            })
+
+    def list(self, page_size: int = 1000):
+        """Yield pages of persisted vector IDs."""
+        self._refresh()
+        ids = list(self._ids)
+        for i in range(0, len(ids), page_size):
+            yield ids[i:i + page_size]
+
+    def describe_index_stats(self):
+        self._refresh()
+        return SimpleNamespace(total_vector_count=len(self._ids), dimension=self._matrix.shape[1] if self._ids else 0)
+
+
+_store: LocalVectorStore = None
+_store_lock = threading.Lock()
+
+
+def get_local_store() -> LocalVectorStore:
+    """Process-wide local vector store (loaded on first use)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = LocalVectorStore()
+    return _store
+
+
+__all__ = [
+    'LocalVectorStore',
+    'get_local_store',
+    'build_ivf',
+]